@@ -1,10 +1,25 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
 from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import Group
+from django.core.exceptions import ValidationError
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.template.defaultfilters import filesizeformat
 from django.utils.safestring import mark_safe
 
+from .admin_filters import TopAuthorListFilter, TopPostListFilter
+from .images import rendition_url
 from .models import Category, Comment, Location, Post
+from .moderation import (
+    delete_comments,
+    delete_posts,
+    move_posts,
+    set_published,
+)
+from .search import get_search_backend
 
 admin.site.site_header = "Панель администратора Блога"
 admin.site.site_title = "Администрирование блога"
@@ -17,6 +32,32 @@ User = get_user_model()
 admin.site.unregister(User)
 
 
+class PublishActionsMixin:
+    """
+    Действия публикации и снятия с публикации выбранных объектов.
+
+    Выполняются пачками UPDATE (см. moderation.set_published) и работают
+    с выбором «все N объектов» без загрузки объектов.
+    """
+    actions = ("publish", "unpublish")
+
+    @admin.action(description="Опубликовать выбранные")
+    def publish(self, request, queryset):
+        changed = set_published(queryset, True)
+        self.message_user(request, f"Опубликовано: {changed}.")
+
+    @admin.action(description="Снять с публикации выбранные")
+    def unpublish(self, request, queryset):
+        changed = set_published(queryset, False)
+        self.message_user(request, f"Снято с публикации: {changed}.")
+
+
+class PostActionForm(ActionForm):
+    category = forms.ModelChoiceField(
+        Category.objects.all(), required=False, label="Категория"
+    )
+
+
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
     list_display = (
@@ -29,18 +70,50 @@ class UserAdmin(BaseUserAdmin):
         "comments_count",
     )
     list_display_links = ("username", "email")
+    actions = ("delete_authored_posts", "delete_authored_comments")
+
+    def get_queryset(self, request):
+        # Количества считаются подзапросами в том же SELECT: два JOIN
+        # с GROUP BY перемножили бы строки постов и комментариев.
+        return super().get_queryset(request).annotate(
+            posts_total=self._count_by_author(Post),
+            comments_total=self._count_by_author(Comment),
+        )
 
-    @admin.display(description="Кол-во постов")
+    @staticmethod
+    def _count_by_author(model):
+        rows = (
+            model.objects.filter(author=OuterRef("pk"))
+            .order_by()
+            .values("author")
+            .annotate(total=Count("pk"))
+            .values("total")
+        )
+        return Coalesce(Subquery(rows), 0)
+
+    @admin.display(description="Кол-во постов", ordering="posts_total")
     def posts_count(self, obj):
-        return obj.posts.count() if hasattr(obj, "posts") else 0
+        return obj.posts_total
 
-    @admin.display(description="Кол-во комментариев")
+    @admin.display(
+        description="Кол-во комментариев", ordering="comments_total"
+    )
     def comments_count(self, obj):
-        return obj.comments.count() if hasattr(obj, "comments") else 0
+        return obj.comments_total
+
+    @admin.action(description="Удалить посты выбранных пользователей")
+    def delete_authored_posts(self, request, queryset):
+        deleted = delete_posts(Post.objects.filter(author__in=queryset))
+        self.message_user(request, f"Удалено постов: {deleted}.")
+
+    @admin.action(description="Удалить комментарии выбранных пользователей")
+    def delete_authored_comments(self, request, queryset):
+        deleted = delete_comments(Comment.objects.filter(author__in=queryset))
+        self.message_user(request, f"Удалено комментариев: {deleted}.")
 
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(PublishActionsMixin, admin.ModelAdmin):
     list_display = ("title", "short_description", "is_published")
     list_editable = ("is_published",)
     search_fields = ("title",)
@@ -52,7 +125,7 @@ class CategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(Location)
-class LocationAdmin(admin.ModelAdmin):
+class LocationAdmin(PublishActionsMixin, admin.ModelAdmin):
     list_display = ("name", "is_published")
     list_editable = ("is_published",)
     search_fields = ("name",)
@@ -60,7 +133,7 @@ class LocationAdmin(admin.ModelAdmin):
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(PublishActionsMixin, admin.ModelAdmin):
     list_display = (
         "title",
         "pub_date",
@@ -72,12 +145,61 @@ class PostAdmin(admin.ModelAdmin):
         "display_image",
     )
     list_editable = ("is_published",)
-    search_fields = ("title", "text")
-    list_filter = ("category", "location", "author")
+    # Заголовок и текст ищутся по индексу (см. get_search_results).
+    search_fields = ("author__username", "category__title")
+    actions = (
+        *PublishActionsMixin.actions,
+        "move_to_category",
+        "purge_comments",
+    )
+    action_form = PostActionForm
+    list_filter = ("category", "location", TopAuthorListFilter)
+    autocomplete_fields = ("author", "category", "location")
     date_hierarchy = "pub_date"
     list_display_links = ("title",)
     list_select_related = ("author", "location", "category")
 
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Ищет посты по автору и категории, а по заголовку и тексту —
+        через поисковый индекс, без совпадений в комментариях и без
+        ограничения количества результатов.
+        """
+        results, may_have_duplicates = super().get_search_results(
+            request, queryset, search_term
+        )
+        if search_term:
+            post_ids = get_search_backend().search_posts(
+                search_term, limit=None, with_comments=False
+            )
+            results |= queryset.filter(pk__in=post_ids)
+        return results, may_have_duplicates
+
+    @admin.action(description="Перенести выбранные в категорию")
+    def move_to_category(self, request, queryset):
+        try:
+            category = PostActionForm.base_fields["category"].clean(
+                request.POST.get("category")
+            )
+        except ValidationError:
+            category = None
+        if category is None:
+            self.message_user(
+                request,
+                "Выберите категорию для переноса постов.",
+                messages.WARNING,
+            )
+            return
+        moved = move_posts(queryset, category)
+        self.message_user(
+            request, f"Перенесено в «{category}» постов: {moved}."
+        )
+
+    @admin.action(description="Удалить комментарии выбранных постов")
+    def purge_comments(self, request, queryset):
+        deleted = delete_comments(Comment.objects.filter(post__in=queryset))
+        self.message_user(request, f"Удалено комментариев: {deleted}.")
+
     @admin.display(description="Краткий текст")
     def safe_short_text(self, obj):
         if not obj.text:
@@ -86,11 +208,25 @@ class PostAdmin(admin.ModelAdmin):
 
     @admin.display(description="Изображение")
     def display_image(self, obj):
-        if obj.image and obj.image.storage.exists(obj.image.name):
-            return mark_safe(
-                f"<img src='{obj.image.url}' width='80' height='60'>"
+        # Сведения о файле сохранены при загрузке (Post.image_meta),
+        # поэтому обращаться к хранилищу для каждой строки не нужно.
+        if not obj.image or not obj.image_meta:
+            return "Нет изображения"
+        meta = obj.image_meta
+        rendition = obj.image_renditions.get("admin")
+        if rendition:
+            src, width, height = (
+                rendition_url(obj, "admin"),
+                rendition["width"],
+                rendition["height"],
             )
-        return "Нет изображения"
+        else:
+            src, width, height = obj.image.url, 80, 60
+        return mark_safe(
+            f"<img src='{src}' width='{width}' height='{height}'"
+            f" title='{meta['width']}×{meta['height']},"
+            f" {filesizeformat(meta['size'])}'>"
+        )
 
 
 @admin.register(Comment)
@@ -102,9 +238,27 @@ class CommentAdmin(admin.ModelAdmin):
         "created_at",
     )
     search_fields = ("text",)
-    list_filter = ("post",)
+    list_filter = (TopPostListFilter, TopAuthorListFilter)
+    autocomplete_fields = ("author",)
+    raw_id_fields = ("post",)
     list_select_related = ("author", "post")
     date_hierarchy = "created_at"
+    actions = ("delete_selected_comments",)
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        comment_ids = get_search_backend().search_comments(
+            search_term, limit=None
+        )
+        return queryset.filter(pk__in=comment_ids), False
+
+    @admin.action(
+        description="Удалить выбранные комментарии без подтверждения"
+    )
+    def delete_selected_comments(self, request, queryset):
+        deleted = delete_comments(queryset)
+        self.message_user(request, f"Удалено комментариев: {deleted}.")
 
     @admin.display(description="Текст")
     def short_text(self, obj):
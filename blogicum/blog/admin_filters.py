@@ -0,0 +1,128 @@
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Count
+
+from .constants import ADMIN_FILTER_CACHE_TIMEOUT, ADMIN_FILTER_TOP_N
+from .models import Post
+
+User = get_user_model()
+
+
+class TopRelatedListFilter(admin.SimpleListFilter):
+    """
+    Фильтр по связанному объекту без загрузки всей связанной таблицы.
+
+    В списке выбора — только ADMIN_FILTER_TOP_N самых активных объектов
+    (список кэшируется) и выбранный сейчас объект. Любой другой объект
+    выбирается полем поиска под списком по ключу lookup_field.
+    """
+    template = "admin/blog/top_related_filter.html"
+    # Поле фильтруемой модели и поле связанной модели, по которому
+    # задаётся значение фильтра.
+    field_name = None
+    lookup_field = "pk"
+    search_placeholder = ""
+
+    def __init__(self, request, params, model, model_admin):
+        super().__init__(request, params, model, model_admin)
+        self.preserved_params = [
+            (name, value)
+            for name, values in request.GET.lists()
+            if name not in (self.parameter_name, "p")
+            for value in values
+        ]
+
+    def top_choices(self, model_admin):
+        """
+        Возвращает самые активные связанные объекты.
+
+        Returns:
+            list: Пары (значение lookup_field, подпись)
+        """
+        raise NotImplementedError
+
+    def selected_label(self, value):
+        """Возвращает подпись выбранного объекта или None."""
+        raise NotImplementedError
+
+    def lookups(self, request, model_admin):
+        key = (
+            f"blog:admin:top:{model_admin.model._meta.label_lower}:"
+            f"{self.parameter_name}"
+        )
+        choices = cache.get(key)
+        if choices is None:
+            choices = list(self.top_choices(model_admin))
+            cache.set(key, choices, ADMIN_FILTER_CACHE_TIMEOUT)
+        value = self.value()
+        if value and value not in {str(choice) for choice, _ in choices}:
+            label = self.selected_label(value)
+            if label is not None:
+                choices = [(value, label), *choices]
+        return choices
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if not value:
+            return queryset
+        return queryset.filter(
+            **{f"{self.field_name}__{self.lookup_field}": value}
+        )
+
+
+class TopAuthorListFilter(TopRelatedListFilter):
+    """Фильтр по автору: авторы с наибольшим числом записей."""
+    title = "автору"
+    parameter_name = "author"
+    field_name = "author"
+    lookup_field = "username"
+    search_placeholder = "Имя пользователя"
+
+    def top_choices(self, model_admin):
+        related_name = model_admin.model._meta.get_field(
+            self.field_name
+        ).remote_field.related_name
+        return [
+            (username, username)
+            for username in User.objects.annotate(total=Count(related_name))
+            .filter(total__gt=0)
+            .order_by("-total", "username")
+            .values_list("username", flat=True)[:ADMIN_FILTER_TOP_N]
+        ]
+
+    def selected_label(self, value):
+        if User.objects.filter(username=value).exists():
+            return value
+        return None
+
+
+class TopPostListFilter(TopRelatedListFilter):
+    """Фильтр по посту: посты с наибольшим числом комментариев."""
+    title = "публикации"
+    parameter_name = "post"
+    field_name = "post"
+    search_placeholder = "ID публикации"
+
+    def top_choices(self, model_admin):
+        # Количество комментариев хранится в Post.comment_count.
+        return [
+            (str(pk), title)
+            for pk, title in Post.objects.filter(comment_count__gt=0)
+            .order_by("-comment_count", "-pk")
+            .values_list("pk", "title")[:ADMIN_FILTER_TOP_N]
+        ]
+
+    def selected_label(self, value):
+        if not value.isdigit():
+            return None
+        return (
+            Post.objects.filter(pk=value)
+            .values_list("title", flat=True)
+            .first()
+        )
+
+    def queryset(self, request, queryset):
+        if self.value() and not self.value().isdigit():
+            return queryset.none()
+        return super().queryset(request, queryset)
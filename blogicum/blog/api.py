@@ -0,0 +1,282 @@
+"""
+JSON API лент, постов и комментариев только для чтения.
+
+Выборки совпадают с выборками HTML-страниц (index, category_posts,
+profile, post_detail), но сериализуются из values() без создания
+объектов моделей. Поддерживаются курсорная пагинация (?after=,
+?before=, ?limit=, см. services.get_cursor_page) и выбор полей
+ответа (?fields=id,title,author).
+"""
+from functools import wraps
+
+from django.contrib.auth import get_user_model
+from django.db.models import Case, F, When
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_safe
+
+from .cache import (
+    cache_anonymous_page,
+    category_posts_scopes,
+    index_scopes,
+    profile_scopes,
+)
+from .conditional import author_exists, category_exists, feed_condition
+from .constants import API_MAX_PAGE_SIZE, POSTS_CURSOR_FIELD, POSTS_LIMIT
+from .models import Category, Comment, Post
+from .services import get_cursor_page, get_query_prefix
+
+User = get_user_model()
+
+# Поля ответа и соответствующие им выражения values().
+POST_FIELDS = {
+    "id": "id",
+    "title": "title",
+    "text": "text",
+    "excerpt": "excerpt",
+    "word_count": "word_count",
+    "reading_time": "reading_time",
+    "pub_date": "pub_date",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+    "author": "author__username",
+    "category": "category__slug",
+    "category_title": "category__title",
+    "location": "location_name",
+    "comment_count": "comment_count",
+    "image": "image",
+}
+POST_LIST_FIELDS = (
+    "id", "title", "excerpt", "pub_date", "author", "category",
+    "location", "comment_count", "image",
+)
+POST_DETAIL_FIELDS = (
+    "id", "title", "text", "pub_date", "updated_at", "author", "category",
+    "category_title", "location", "comment_count", "image",
+)
+COMMENT_FIELDS = {
+    "id": "id",
+    "text": "text",
+    "created_at": "created_at",
+    "author": "author__username",
+    "post": "post_id",
+}
+COMMENT_LIST_FIELDS = tuple(COMMENT_FIELDS)
+
+
+class ApiError(Exception):
+    """Ошибка запроса к API, которая возвращается клиенту в JSON."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def api_view(view):
+    """
+    Оформляет представление API: только GET и HEAD, ошибки в JSON.
+
+    Args:
+        view: Представление, возвращающее JsonResponse
+
+    Returns:
+        function: Представление
+    """
+    @require_safe
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except Http404:
+            error = ApiError("Не найдено.", status=404)
+        except ApiError as exc:
+            error = exc
+        return JsonResponse({"error": str(error)}, status=error.status)
+    return wrapper
+
+
+def parse_fields(request, available, default):
+    """
+    Разбирает список полей ответа из параметра fields.
+
+    Args:
+        request: HTTP запрос
+        available: Допустимые поля
+        default: Поля ответа без параметра fields
+
+    Returns:
+        tuple: Имена полей
+
+    Raises:
+        ApiError: Если запрошены неизвестные поля
+    """
+    raw = request.GET.get("fields")
+    if not raw:
+        return tuple(default)
+    fields = tuple(dict.fromkeys(
+        name.strip() for name in raw.split(",") if name.strip()
+    ))
+    unknown = [name for name in fields if name not in available]
+    if unknown or not fields:
+        raise ApiError(f"Неизвестные поля: {', '.join(unknown) or raw}.")
+    return fields
+
+
+def parse_limit(request):
+    """
+    Возвращает размер страницы из параметра limit.
+
+    Raises:
+        ApiError: Если значение не число от 1 до API_MAX_PAGE_SIZE
+    """
+    raw = request.GET.get("limit")
+    if raw is None:
+        return POSTS_LIMIT
+    if not raw.isdigit() or not 1 <= int(raw) <= API_MAX_PAGE_SIZE:
+        raise ApiError(
+            f"Параметр limit должен быть числом от 1 до {API_MAX_PAGE_SIZE}."
+        )
+    return int(raw)
+
+
+def _post_values(queryset, fields):
+    """Готовит выборку постов к values() для переданных полей ответа."""
+    if "location" in fields:
+        # Как и в шаблонах, неопубликованное местоположение не выводится.
+        queryset = queryset.annotate(
+            location_name=Case(
+                When(location__is_published=True, then=F("location__name"))
+            )
+        )
+    return queryset
+
+
+def _serializer(request, mapping, fields):
+    image_storage = Post._meta.get_field("image").storage
+
+    def serialize(row):
+        item = {name: row[mapping[name]] for name in fields}
+        if item.get("image"):
+            item["image"] = request.build_absolute_uri(
+                image_storage.url(item["image"])
+            )
+        elif "image" in item:
+            item["image"] = None
+        return item
+    return serialize
+
+
+def _page_url(request, prefix, param, cursor):
+    if cursor is None:
+        return None
+    return request.build_absolute_uri(
+        f"{request.path}?{prefix}{param}={cursor}"
+    )
+
+
+def paginated_response(request, queryset, mapping, fields, cursor_field,
+                       descending=True):
+    """
+    Возвращает страницу выборки в JSON с курсорами соседних страниц.
+
+    Args:
+        request: HTTP запрос
+        queryset: QuerySet объектов
+        mapping: Соответствие полей ответа выражениям values()
+        fields: Поля ответа
+        cursor_field: Поле даты, по которому упорядочена выборка
+        descending: Порядок от новых к старым (см. get_cursor_page)
+
+    Returns:
+        JsonResponse: Объекты страницы и ссылки next и previous
+    """
+    lookups = {"id", cursor_field, *(mapping[name] for name in fields)}
+    page = get_cursor_page(
+        request, queryset.values(*lookups), parse_limit(request),
+        cursor_field, descending,
+    )
+    serialize = _serializer(request, mapping, fields)
+    prefix = get_query_prefix(request)
+    return JsonResponse({
+        "results": [serialize(row) for row in page],
+        "next": _page_url(request, prefix, "after", page.next_cursor),
+        "previous": _page_url(
+            request, prefix, "before", page.previous_cursor
+        ),
+    })
+
+
+def _post_list_response(request, queryset):
+    fields = parse_fields(request, POST_FIELDS, POST_LIST_FIELDS)
+    return paginated_response(
+        request, _post_values(queryset, fields), POST_FIELDS, fields,
+        POSTS_CURSOR_FIELD,
+    )
+
+
+@api_view
+@feed_condition()
+@cache_anonymous_page(index_scopes)
+def post_list(request):
+    """Опубликованные посты главной ленты."""
+    return _post_list_response(
+        request, Post.objects.filter_posts_by_publication()
+    )
+
+
+@api_view
+@feed_condition(category_exists)
+@cache_anonymous_page(category_posts_scopes)
+def category_post_list(request, category_slug):
+    """Опубликованные посты опубликованной категории."""
+    category = get_object_or_404(
+        Category, is_published=True, slug=category_slug
+    )
+    return _post_list_response(
+        request, category.posts.filter_posts_by_publication()
+    )
+
+
+@api_view
+@feed_condition(author_exists)
+@cache_anonymous_page(profile_scopes)
+def profile_post_list(request, username):
+    """
+    Посты автора: все для самого автора и персонала,
+    для остальных — только опубликованные.
+    """
+    author = get_object_or_404(User, username=username)
+    posts = author.posts.all()
+    if request.user != author and not request.user.is_staff:
+        posts = posts.filter_posts_by_publication()
+    return _post_list_response(request, posts)
+
+
+@api_view
+def post_detail(request, post_id):
+    """Пост, доступный текущему пользователю (см. visible_to)."""
+    fields = parse_fields(request, POST_FIELDS, POST_DETAIL_FIELDS)
+    row = (
+        _post_values(Post.objects.visible_to(request.user), fields)
+        .filter(pk=post_id)
+        .values(*{POST_FIELDS[name] for name in fields})
+        .first()
+    )
+    if row is None:
+        raise Http404
+    return JsonResponse(_serializer(request, POST_FIELDS, fields)(row))
+
+
+@api_view
+def post_comments(request, post_id):
+    """
+    Комментарии поста, доступного текущему пользователю, в порядке
+    добавления, как на странице поста.
+    """
+    if not Post.objects.visible_to(request.user).filter(pk=post_id).exists():
+        raise Http404
+    fields = parse_fields(request, COMMENT_FIELDS, COMMENT_LIST_FIELDS)
+    return paginated_response(
+        request, Comment.objects.filter(post_id=post_id), COMMENT_FIELDS,
+        fields, "created_at", descending=False,
+    )
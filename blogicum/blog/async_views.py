@@ -0,0 +1,188 @@
+"""
+Асинхронные варианты представлений чтения для запуска под ASGI.
+
+Представления index, category_posts, profile и post_detail повторяют
+views.py, но обращаются к БД через асинхронный API ORM (aget, acount,
+async for), а к кэшу — через асинхронный API кэша, поэтому под ASGI
+запрос не переключается между потоками на каждом шаге. Включаются
+настройкой BLOG_ASYNC_VIEWS (см. urls.py): под WSGI каждое асинхронное
+представление запускается в собственном цикле событий, поэтому там
+выгоднее синхронные представления.
+"""
+import asyncio
+from functools import wraps
+
+from django.contrib.auth import get_user_model
+from django.shortcuts import aget_object_or_404, render
+
+from .cache import (
+    afeed_state,
+    cache_anonymous_page,
+    category_posts_scopes,
+    index_scopes,
+    profile_scopes,
+)
+from .conditional import (
+    author_exists,
+    category_exists,
+    feed_condition,
+    post_detail_condition,
+)
+from .constants import COMMENTS_LIMIT, POSTS_CURSOR_FIELD, POSTS_LIMIT
+from .forms import CommentForm
+from .models import Category, Comment, Post
+from .rendering import aget_text_html
+from .services import (
+    acached_count,
+    aget_paginated_page,
+    aget_visible_post,
+    aplanner_count,
+    get_requested_page_slice,
+)
+
+User = get_user_model()
+
+
+def resolve_user(view):
+    """
+    Загружает пользователя запроса асинхронно.
+
+    Декораторы кэша и условных запросов, а также шаблоны обращаются
+    к request.user синхронно; без предварительной загрузки это был бы
+    синхронный запрос к БД в асинхронном контексте.
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        request.user = await request.auser()
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+async def _render_feed(request, posts, template, context, count_name,
+                       scopes):
+    page_obj = await aget_paginated_page(
+        request,
+        posts.for_feed(),
+        POSTS_LIMIT,
+        cursor_field=POSTS_CURSOR_FIELD,
+        count=acached_count(
+            count_name,
+            scopes,
+            aplanner_count,
+            await afeed_state(request),
+        ),
+    )
+    return render(request, template, {**context, "page_obj": page_obj})
+
+
+@resolve_user
+@feed_condition()
+@cache_anonymous_page(index_scopes)
+async def index(request):
+    """Асинхронный вариант views.index."""
+    return await _render_feed(
+        request,
+        Post.objects.filter_posts_by_publication(),
+        "blog/index.html",
+        {},
+        "index",
+        index_scopes(),
+    )
+
+
+@resolve_user
+@feed_condition(category_exists)
+@cache_anonymous_page(category_posts_scopes)
+async def category_posts(request, category_slug):
+    """Асинхронный вариант views.category_posts."""
+    category = await aget_object_or_404(
+        Category, is_published=True, slug=category_slug
+    )
+    return await _render_feed(
+        request,
+        category.posts.filter_posts_by_publication(),
+        "blog/category.html",
+        {"category": category},
+        f"category:{category_slug}",
+        category_posts_scopes(category_slug),
+    )
+
+
+@resolve_user
+@feed_condition(author_exists)
+@cache_anonymous_page(profile_scopes)
+async def profile(request, username):
+    """Асинхронный вариант views.profile."""
+    author = await aget_object_or_404(User, username=username)
+    posts = author.posts.all()
+    shows_all = request.user == author or request.user.is_staff
+    if not shows_all:
+        posts = posts.filter_posts_by_publication()
+    return await _render_feed(
+        request,
+        posts,
+        "blog/profile.html",
+        {"profile": author},
+        f"profile:{username}:{'all' if shows_all else 'published'}",
+        profile_scopes(username),
+    )
+
+
+def _post_comments(post_id):
+    return Comment.objects.filter(post_id=post_id).select_related("author")
+
+
+def prefetch_post_and_comments(view):
+    """
+    Загружает пост и запрошенную страницу его комментариев одновременно.
+
+    Количество комментариев, нужное для пагинации, хранится в посте,
+    поэтому страница выбирается по номеру из запроса, не дожидаясь
+    поста. Пост запоминается в запросе (см. get_visible_post), и
+    валидаторы условного GET не обращаются к БД повторно. Если пост
+    недоступен, комментарии отбрасываются вместе с ответом 404.
+    """
+    @wraps(view)
+    async def wrapper(request, post_id):
+        async def load_comments():
+            page = get_requested_page_slice(
+                request, _post_comments(post_id), COMMENTS_LIMIT
+            )
+            return [comment async for comment in page]
+
+        _, request._blog_comments = await asyncio.gather(
+            aget_visible_post(request, post_id), load_comments()
+        )
+        return await view(request, post_id)
+    return wrapper
+
+
+@resolve_user
+@prefetch_post_and_comments
+@post_detail_condition
+async def post_detail(request, post_id):
+    """Асинхронный вариант views.post_detail."""
+    post = await aget_visible_post(request, post_id)
+    comments = await aget_paginated_page(
+        request,
+        _post_comments(post_id),
+        per_page=COMMENTS_LIMIT,
+        count=_stored_comment_count(post),
+        prefetched=request._blog_comments,
+    )
+    # HTML устаревшей версии рендерера перестраивается до рендеринга
+    # шаблона: в нём обращение к БД было бы синхронным.
+    await asyncio.gather(
+        aget_text_html(post), *map(aget_text_html, comments)
+    )
+    return render(
+        request,
+        "blog/detail.html",
+        {"post": post, "form": CommentForm(), "page_obj": comments},
+    )
+
+
+def _stored_comment_count(post):
+    async def count(comments):
+        return post.comment_count
+    return count
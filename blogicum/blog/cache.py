@@ -0,0 +1,354 @@
+import hashlib
+import math
+import time
+from functools import wraps
+from inspect import iscoroutinefunction
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db.models import Count, Max, Min, Sum
+from django.utils import timezone
+
+from .constants import (
+    CACHE_DELETE_BATCH_SIZE,
+    PAGE_CACHE_TIMEOUT,
+    PUBLISH_POLL_INTERVAL,
+    SCOPE_VERSION_TIMEOUT,
+)
+from .models import Post
+
+# Имя фрагмента {% cache %} в шаблоне includes/post_card.html.
+POST_CARD_FRAGMENT = "post_card"
+POST_CARD_VERSION_FIELDS = ("pk", "updated_at", "comment_count")
+
+# Области кэша страниц: главная лента, лента категории и профиль автора.
+FEED_SCOPE = "feed"
+
+
+def category_scope(slug):
+    return f"category:{slug}"
+
+
+def author_scope(username):
+    return f"author:{username}"
+
+
+def index_scopes():
+    return (FEED_SCOPE,)
+
+
+def category_posts_scopes(category_slug):
+    return (category_scope(category_slug),)
+
+
+def profile_scopes(username):
+    return (author_scope(username),)
+
+
+def post_card_key(post_id, updated_at, comment_count):
+    """
+    Возвращает ключ кэша карточки поста.
+
+    Совпадает с ключом, который строит тег {% cache %} в шаблоне
+    includes/post_card.html для тех же значений.
+
+    Args:
+        post_id: ID поста
+        updated_at: Время последнего изменения поста
+        comment_count: Количество комментариев поста
+
+    Returns:
+        str: Ключ фрагмента в кэше
+    """
+    return make_template_fragment_key(
+        POST_CARD_FRAGMENT, [post_id, updated_at, comment_count]
+    )
+
+
+def drop_post_cards(posts):
+    """
+    Удаляет из кэша закэшированные карточки постов.
+
+    Работает с любым бэкендом кэша: ключи вычисляются по текущим
+    значениям версии поста, поэтому поиск ключей по шаблону не нужен.
+
+    Args:
+        posts: QuerySet постов, карточки которых нужно удалить
+    """
+    versions = posts.order_by().values_list(*POST_CARD_VERSION_FIELDS)
+    keys = []
+    for version in versions.iterator(chunk_size=CACHE_DELETE_BATCH_SIZE):
+        keys.append(post_card_key(*version))
+        if len(keys) == CACHE_DELETE_BATCH_SIZE:
+            cache.delete_many(keys)
+            keys = []
+    if keys:
+        cache.delete_many(keys)
+
+
+def _scope_version_key(scope):
+    return f"blog:scope:{scope}"
+
+
+def get_scope_versions(scopes):
+    """
+    Возвращает текущие версии областей кэша страниц.
+
+    Версия — время последнего изменения области в наносекундах.
+    Отсутствующая версия (например, вытесненная из кэша) создаётся
+    из текущего времени, поэтому никогда не совпадает с прежней;
+    если кэш не хранит значения (DummyCache), версия каждый раз новая.
+    Версии хранятся SCOPE_VERSION_TIMEOUT секунд, поэтому ключи,
+    созданные для несуществующих категорий и авторов, не копятся.
+
+    Args:
+        scopes: Имена областей
+
+    Returns:
+        list: Версии в порядке переданных областей
+    """
+    keys = [_scope_version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            version = time.time_ns()
+            cache.add(key, version, SCOPE_VERSION_TIMEOUT)
+            versions[key] = cache.get(key, version)
+    return [versions[key] for key in keys]
+
+
+async def aget_scope_versions(scopes):
+    """Асинхронный вариант get_scope_versions()."""
+    keys = [_scope_version_key(scope) for scope in scopes]
+    versions = await cache.aget_many(keys)
+    for key in keys:
+        if key not in versions:
+            version = time.time_ns()
+            await cache.aadd(key, version, SCOPE_VERSION_TIMEOUT)
+            versions[key] = await cache.aget(key, version)
+    return [versions[key] for key in keys]
+
+
+def bump_scopes(*scopes):
+    """
+    Сбрасывает закэшированные страницы переданных областей.
+
+    Args:
+        scopes: Имена областей
+    """
+    version = time.time_ns()
+    cache.set_many(
+        {_scope_version_key(scope): version for scope in scopes},
+        SCOPE_VERSION_TIMEOUT,
+    )
+
+
+def post_scopes(posts):
+    """
+    Возвращает области кэша страниц, в которых выводятся посты.
+
+    Args:
+        posts: QuerySet постов
+
+    Returns:
+        set: Имена областей
+    """
+    scopes = {FEED_SCOPE}
+    rows = (
+        posts.order_by()
+        .values_list("category__slug", "author__username")
+        .distinct()
+    )
+    for slug, username in rows:
+        if slug:
+            scopes.add(category_scope(slug))
+        scopes.add(author_scope(username))
+    return scopes
+
+
+def _feed_posts(user):
+    # Сотрудникам профили авторов выводят и чужие неопубликованные посты.
+    if user.is_staff:
+        return Post.objects.all()
+    return Post.objects.visible_to(user)
+
+
+def _feed_aggregates():
+    return {
+        "last_publication": Max("pub_date"),
+        "last_change": Max("updated_at"),
+        "post_count": Count("pk"),
+        "comment_count": Sum("comment_count"),
+    }
+
+
+def _feed_state(stats):
+    return (
+        stats["last_publication"],
+        stats["last_change"],
+        stats["post_count"],
+        stats["comment_count"] or 0,
+    )
+
+
+def feed_state(request):
+    """
+    Возвращает состояние постов, доступных пользователю запроса.
+
+    Состояние читается из БД одним агрегирующим запросом, поэтому
+    учитывает изменения, сделанные другими процессами: веб-процессами
+    с локальным кэшем (LocMemCache), командами publish_scheduled,
+    summarize_posts, rerender_texts, recount_comments и прямой записью
+    в БД. Изменение комментариев обновляет Post.updated_at и
+    Post.comment_count (см. signals.py), удаление поста уменьшает
+    количество постов. Из состояния строятся валидаторы условных
+    запросов лент (см. conditional.feed_condition) и ключи
+    закэшированных страниц и количеств. Вычисляется один раз на запрос.
+
+    Args:
+        request: HTTP запрос
+
+    Returns:
+        tuple: Наибольшие дата публикации и время изменения поста,
+            количество постов и сумма количеств их комментариев
+    """
+    if not hasattr(request, "_blog_feed_state"):
+        request._blog_feed_state = _feed_state(
+            _feed_posts(request.user).aggregate(**_feed_aggregates())
+        )
+    return request._blog_feed_state
+
+
+async def afeed_state(request):
+    """Асинхронный вариант feed_state()."""
+    if not hasattr(request, "_blog_feed_state"):
+        request._blog_feed_state = _feed_state(
+            await _feed_posts(request.user).aaggregate(**_feed_aggregates())
+        )
+    return request._blog_feed_state
+
+
+def feed_state_token(state):
+    """
+    Возвращает состояние постов (см. feed_state) в виде части ключа кэша.
+
+    Args:
+        state: Состояние постов
+
+    Returns:
+        str: Хеш состояния
+    """
+    return hashlib.md5("|".join(map(str, state)).encode()).hexdigest()
+
+
+def _pending_publications():
+    return Post.objects.scheduled() | Post.objects.due_for_publication()
+
+
+def _timeout_until(next_pub_date):
+    if next_pub_date is None:
+        return PAGE_CACHE_TIMEOUT
+    seconds = math.ceil((next_pub_date - timezone.now()).total_seconds())
+    if seconds <= 0:
+        # Время публикации наступило, но publish_scheduled ещё не
+        # вывел пост: команда делает это не реже PUBLISH_POLL_INTERVAL.
+        seconds = PUBLISH_POLL_INTERVAL
+    return min(PAGE_CACHE_TIMEOUT, seconds)
+
+
+def page_cache_timeout():
+    """
+    Возвращает время жизни закэшированной страницы ленты.
+
+    Время ограничено моментом ближайшей отложенной публикации, чтобы
+    пост появился в ленте вовремя без ручной очистки кэша.
+
+    Returns:
+        int: Время жизни в секундах
+    """
+    stats = _pending_publications().aggregate(next_pub_date=Min("pub_date"))
+    return _timeout_until(stats["next_pub_date"])
+
+
+async def apage_cache_timeout():
+    """Асинхронный вариант page_cache_timeout()."""
+    stats = await _pending_publications().aaggregate(
+        next_pub_date=Min("pub_date")
+    )
+    return _timeout_until(stats["next_pub_date"])
+
+
+def cache_anonymous_page(get_scopes):
+    """
+    Кэширует страницу целиком для анонимных GET-запросов.
+
+    Ключ страницы включает путь с параметрами запроса (номер страницы,
+    курсор), версии областей, которые сбрасываются сигналами
+    при изменении постов, комментариев, категорий и пользователей,
+    и состояние постов в БД (см. feed_state). Страница
+    хранится не дольше, чем до ближайшей отложенной публикации.
+    Асинхронные представления обслуживаются асинхронным API кэша.
+
+    Args:
+        get_scopes: Функция, возвращающая области страницы по аргументам
+            представления
+
+    Returns:
+        function: Декоратор представления
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            return _cache_async_page(view, get_scopes)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != "GET" or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+            key = _page_key(
+                request,
+                get_scope_versions(get_scopes(*args, **kwargs)),
+                feed_state(request),
+            )
+            response = cache.get(key)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if _is_cacheable(response):
+                    cache.set(key, response, page_cache_timeout())
+            return response
+        return wrapper
+    return decorator
+
+
+def _cache_async_page(view, get_scopes):
+    """
+    Вариант cache_anonymous_page для асинхронного представления.
+
+    Пользователь запроса должен быть уже загружен (await request.auser()),
+    иначе обращение к request.user — синхронный запрос к БД.
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != "GET" or request.user.is_authenticated:
+            return await view(request, *args, **kwargs)
+        key = _page_key(
+            request,
+            await aget_scope_versions(get_scopes(*args, **kwargs)),
+            await afeed_state(request),
+        )
+        response = await cache.aget(key)
+        if response is None:
+            response = await view(request, *args, **kwargs)
+            if _is_cacheable(response):
+                await cache.aset(key, response, await apage_cache_timeout())
+        return response
+    return wrapper
+
+
+def _page_key(request, versions, state):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    versions = ":".join(map(str, versions))
+    return f"blog:page:{path}:{versions}:{feed_state_token(state)}"
+
+
+def _is_cacheable(response):
+    return response.status_code == 200 and not response.cookies
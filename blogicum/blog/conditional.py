@@ -0,0 +1,145 @@
+import hashlib
+from functools import wraps
+from inspect import iscoroutinefunction
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.http import Http404
+from django.views.decorators.http import condition
+
+from .cache import feed_state
+from .models import Category
+from .rendering import get_renderer
+from .services import get_visible_post
+
+User = get_user_model()
+
+
+def _make_etag(*parts):
+    raw = "|".join(map(str, parts)).encode()
+    return hashlib.md5(raw).hexdigest()
+
+
+def _memoize_validators(compute):
+    """
+    Вычисляет валидаторы один раз на запрос.
+
+    Декоратор condition вызывает функции ETag и Last-Modified по
+    отдельности, а запросы к БД для них общие.
+    """
+    @wraps(compute)
+    def wrapper(request, *args, **kwargs):
+        if not hasattr(request, "_blog_validators"):
+            request._blog_validators = compute(request, *args, **kwargs)
+        return request._blog_validators
+    return wrapper
+
+
+def category_exists(category_slug):
+    """Проверяет, что лента категории существует (см. feed_condition)."""
+    return Category.objects.filter(
+        is_published=True, slug=category_slug
+    ).exists()
+
+
+def author_exists(username):
+    """Проверяет, что профиль автора существует (см. feed_condition)."""
+    return User.objects.filter(username=username).exists()
+
+
+def feed_condition(exists=None):
+    """
+    Поддержка условных GET-запросов (ETag, Last-Modified) для лент.
+
+    Валидаторы не требуют рендеринга: они строятся из состояния
+    постов в БД (см. cache.feed_state) — наибольших даты публикации
+    и времени изменения поста, количества постов и их комментариев,
+    поэтому учитывают изменения, сделанные другими процессами и
+    командами. Версии областей кэша страниц хранятся в кэше процесса
+    и в валидаторы не входят. Для ленты несуществующей категории
+    или автора валидаторы не вычисляются: представление вернёт 404
+    без ETag и Last-Modified. Last-Modified отдаётся только анонимным
+    посетителям: для авторизованных содержимое зависит от сессии.
+
+    Args:
+        exists: Функция, проверяющая по аргументам представления, что
+            объект ленты существует (category_exists, author_exists)
+
+    Returns:
+        function: Декоратор представления
+    """
+    @_memoize_validators
+    def validators(request, *args, **kwargs):
+        if exists is not None and not exists(*args, **kwargs):
+            return None, None
+        state = feed_state(request)
+        etag = _make_etag(request.get_full_path(), request.user.pk, *state)
+        if request.user.is_authenticated:
+            return etag, None
+        last_publication, last_change = state[:2]
+        changes = [
+            change for change in (last_publication, last_change) if change
+        ]
+        return etag, max(changes, default=None)
+
+    conditional = condition(
+        etag_func=lambda *args, **kwargs: validators(*args, **kwargs)[0],
+        last_modified_func=(
+            lambda *args, **kwargs: validators(*args, **kwargs)[1]
+        ),
+    )
+
+    def decorator(view):
+        conditional_view = conditional(view)
+        if not iscoroutinefunction(view):
+            return conditional_view
+
+        # condition вызывает валидаторы синхронно: для асинхронного
+        # представления они вычисляются заранее в потоке (запросы к БД).
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            await sync_to_async(validators)(request, *args, **kwargs)
+            return await conditional_view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@_memoize_validators
+def _post_detail_validators(request, post_id):
+    try:
+        post = get_visible_post(request, post_id)
+    except Http404:
+        # Пост недоступен: представление само вернёт 404.
+        return None, None
+    version = get_renderer().version
+    etag = _make_etag(
+        request.get_full_path(),
+        request.user.pk,
+        # Форма комментария содержит CSRF-токен сессии: после нового
+        # входа закэшированная страница с прежним токеном не годится.
+        request.session.session_key,
+        post.updated_at,
+        post.comment_count,
+        post.last_comment_at,
+        version,
+    )
+    if request.user.is_authenticated or post.render_version != version:
+        # HTML поста ещё не перестроен новым рендерером: updated_at
+        # изменится только при выводе страницы (см. rendering.py).
+        return etag, None
+    return etag, max(filter(None, (post.updated_at, post.last_comment_at)))
+
+
+# Post.updated_at меняется и при изменении комментариев поста,
+# его категории и местоположения (см. signals.py), и при перестройке
+# HTML текстов поста и комментариев (см. rendering.py). Количество и
+# время последнего комментария читаются из БД вместе с постом, поэтому
+# учитываются и комментарии, добавленные в обход сигналов.
+post_detail_condition = condition(
+    etag_func=lambda *args, **kwargs: (
+        _post_detail_validators(*args, **kwargs)[0]
+    ),
+    last_modified_func=lambda *args, **kwargs: (
+        _post_detail_validators(*args, **kwargs)[1]
+    ),
+)
@@ -6,3 +6,89 @@ SLUGFIELD_MAX_LENGTH = 64
 
 # Настройка для views.py
 POSTS_LIMIT = 10
+COMMENTS_LIMIT = 10
+# Поле ключа курсорной пагинации лент (?after=/?before=)
+POSTS_CURSOR_FIELD = "pub_date"
+# Окно номеров страниц в пагинаторе: соседи текущей и края диапазона
+PAGE_WINDOW_ON_EACH_SIDE = 2
+PAGE_WINDOW_ON_ENDS = 1
+# Длина превью текста поста в карточке ленты (Post.excerpt, без «…»)
+POST_PREVIEW_LENGTH = 300
+# Скорость чтения для оценки Post.reading_time, слов в минуту
+READING_WORDS_PER_MINUTE = 200
+
+# JSON API (api.py)
+# Наибольшее количество объектов на странице ответа (?limit=)
+API_MAX_PAGE_SIZE = 100
+
+# Хранимый HTML текстов (rendering.py)
+# Количество текстов в одной задаче процесса команды rerender_texts
+RENDER_BATCH_SIZE = 200
+
+# Ленты RSS и Atom (feeds.py)
+# Количество постов в ленте; переопределяется настройкой BLOG_FEED_ITEMS
+FEED_ITEMS_LIMIT = 20
+
+# Карты сайта (sitemaps.py)
+# Наибольшее количество адресов в одном файле карты сайта
+SITEMAP_SHARD_SIZE = 50_000
+# Как часто запрос карты сайта проверяет, не устарели ли файлы
+SITEMAP_CHECK_INTERVAL = 60 * 5
+# Количество строк, читаемых из БД за раз при записи файла
+SITEMAP_CHUNK_SIZE = 2000
+
+# Кэширование
+CACHE_DELETE_BATCH_SIZE = 500
+# Время жизни закэшированной карточки поста (includes/post_card.html)
+POST_CARD_CACHE_TIMEOUT = 60 * 15
+# Время жизни закэшированной страницы ленты для анонимных посетителей
+PAGE_CACHE_TIMEOUT = 60 * 5
+# Время жизни версии области кэша страниц (не меньше PAGE_CACHE_TIMEOUT)
+SCOPE_VERSION_TIMEOUT = 60 * 60 * 24
+# Время жизни закэшированного количества постов в ленте
+COUNT_CACHE_TIMEOUT = 60 * 15
+# С какого количества строк по оценке планировщика не выполнять COUNT(*)
+COUNT_ESTIMATE_THRESHOLD = 100_000
+
+# Отложенные публикации
+# Наибольшая пауза между проверками в команде publish_scheduled --loop
+PUBLISH_POLL_INTERVAL = 60
+
+# Поиск
+SEARCH_RESULTS_LIMIT = 1000
+SEARCH_TERM_MAX_LENGTH = 64
+SEARCH_INDEX_BATCH_SIZE = 500
+SEARCH_STEMMER_LANGUAGE = "russian"
+SEARCH_STEM_CACHE_SIZE = 100_000
+
+# Изображения постов
+# Миниатюры: имя и размер (ширина, высота), в который вписывается картинка
+IMAGE_RENDITIONS = {
+    "admin": (80, 60),
+    "card": (480, 360),
+    "detail": (1200, 900),
+}
+IMAGE_RENDITIONS_DIR = "posts_images/renditions"
+IMAGE_JPEG_QUALITY = 82
+IMAGE_WEBP_QUALITY = 80
+# Количество потоков, строящих миниатюры (0 — в потоке запроса)
+IMAGE_RENDITION_WORKERS = 2
+# Ограничения загружаемых изображений (переопределяются настройками
+# BLOG_IMAGE_MAX_UPLOAD_SIZE и BLOG_IMAGE_MAX_PIXELS)
+IMAGE_MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+IMAGE_MAX_PIXELS = 40_000_000
+IMAGE_UPLOAD_FORMATS = ("JPEG", "PNG", "GIF", "WEBP")
+# Сколько первых байт файла читается, чтобы разобрать заголовок
+IMAGE_HEADER_SIZE = 256 * 1024
+IMAGE_UPLOAD_FIELDS = ("image",)
+# Каталог загруженных изображений постов (см. Post.image)
+IMAGE_UPLOAD_DIR = "posts_images"
+# Файлы моложе этого возраста (в секундах) cleanup_media не удаляет
+MEDIA_CLEANUP_MIN_AGE = 60 * 60
+
+# Админка
+# Сколько самых активных авторов и обсуждаемых постов показывать в фильтрах
+ADMIN_FILTER_TOP_N = 20
+ADMIN_FILTER_CACHE_TIMEOUT = 60 * 10
+# Сколько строк изменяет или удаляет один запрос массового действия
+MODERATION_BATCH_SIZE = 500
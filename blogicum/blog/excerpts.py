@@ -0,0 +1,72 @@
+import math
+import re
+from datetime import timedelta
+
+from .constants import POST_PREVIEW_LENGTH, READING_WORDS_PER_MINUTE
+
+WORD_RE = re.compile(r"\w+(?:[-'’]\w+)*")
+# Знаки, которые не оставляются в конце обрезанного превью.
+TRAILING_PUNCTUATION = " ,.;:!?-—–"
+
+
+def make_excerpt(text, length=POST_PREVIEW_LENGTH):
+    """
+    Возвращает превью текста для карточки поста.
+
+    Пробельные символы схлопываются, длинный текст обрезается
+    по границе слова и дополняется «…».
+
+    Args:
+        text: Текст поста
+        length: Наибольшая длина превью без «…»
+
+    Returns:
+        str: Превью не длиннее length + 1 символа
+    """
+    # Пробелы схлопываются только в начале текста: остальное
+    # в превью всё равно не попадёт.
+    head = " ".join(text[:length * 4].split())
+    if len(head) <= length and len(text) <= length * 4:
+        return head
+    excerpt = head[:length + 1]
+    space = excerpt.rfind(" ")
+    excerpt = excerpt[:space] if space > length // 2 else excerpt[:length]
+    return excerpt.rstrip(TRAILING_PUNCTUATION) + "…"
+
+
+def count_words(text):
+    """Возвращает количество слов в тексте."""
+    return sum(1 for _ in WORD_RE.finditer(text))
+
+
+def estimate_reading_time(word_count):
+    """
+    Оценивает время чтения текста с точностью до минуты.
+
+    Args:
+        word_count: Количество слов
+
+    Returns:
+        timedelta: Время чтения (не меньше минуты для непустого текста)
+    """
+    return timedelta(
+        minutes=math.ceil(word_count / READING_WORDS_PER_MINUTE)
+    )
+
+
+def summarize(text):
+    """
+    Вычисляет хранимые сведения о тексте поста.
+
+    Args:
+        text: Текст поста
+
+    Returns:
+        dict: Значения полей excerpt, word_count и reading_time
+    """
+    word_count = count_words(text)
+    return {
+        "excerpt": make_excerpt(text),
+        "word_count": word_count,
+        "reading_time": estimate_reading_time(word_count),
+    }
@@ -0,0 +1,153 @@
+"""
+Ленты RSS и Atom главной страницы, категорий и авторов.
+
+Ленты выводят те же опубликованные посты, что и HTML-страницы
+(см. PostQuerySet.filter_posts_by_publication), не больше
+BLOG_FEED_ITEMS штук. Готовые ленты кэшируются в тех же областях,
+что и страницы (см. cache.cache_anonymous_page), и поддерживают
+условные GET-запросы, поэтому опрос неизменившейся ленты обходится
+без запросов к БД.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+
+from .cache import (
+    cache_anonymous_page,
+    category_posts_scopes,
+    index_scopes,
+    profile_scopes,
+)
+from .conditional import author_exists, category_exists, feed_condition
+from .constants import FEED_ITEMS_LIMIT
+from .models import Category, Post
+
+User = get_user_model()
+
+
+def feed_items_limit():
+    """Количество постов в ленте с учётом настройки BLOG_FEED_ITEMS."""
+    return getattr(settings, "BLOG_FEED_ITEMS", FEED_ITEMS_LIMIT)
+
+
+class PostsFeed(Feed):
+    """Лента RSS опубликованных постов главной страницы."""
+    title = "Блогикум: новые публикации"
+    description = "Последние публикации Блогикума."
+
+    def link(self, obj):
+        return reverse("blog:index")
+
+    def get_posts(self, obj):
+        return Post.objects.filter_posts_by_publication()
+
+    def items(self, obj):
+        return self.get_posts(obj).for_feed()[:feed_items_limit()]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.excerpt
+
+    def item_link(self, item):
+        return reverse("blog:post_detail", args=(item.pk,))
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_author_link(self, item):
+        return reverse("blog:profile", args=(item.author.username,))
+
+    def item_categories(self, item):
+        return (item.category.title,) if item.category else ()
+
+
+class CategoryPostsFeed(PostsFeed):
+    """Лента RSS опубликованных постов категории."""
+
+    def get_object(self, request, category_slug):
+        return get_object_or_404(
+            Category, is_published=True, slug=category_slug
+        )
+
+    def title(self, obj):
+        return f"Блогикум: {obj.title}"
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse("blog:category_posts", args=(obj.slug,))
+
+    def get_posts(self, obj):
+        return obj.posts.filter_posts_by_publication()
+
+
+class AuthorPostsFeed(PostsFeed):
+    """Лента RSS опубликованных постов автора."""
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, obj):
+        return f"Блогикум: публикации {obj.username}"
+
+    def description(self, obj):
+        return f"Последние публикации пользователя {obj.username}."
+
+    def link(self, obj):
+        return reverse("blog:profile", args=(obj.username,))
+
+    def get_posts(self, obj):
+        return obj.posts.filter_posts_by_publication()
+
+
+def atom(feed_class):
+    """Возвращает вариант ленты в формате Atom."""
+    return type(
+        f"Atom{feed_class.__name__}",
+        (feed_class,),
+        {"feed_type": Atom1Feed, "subtitle": feed_class.description},
+    )
+
+
+def cached_feed(feed_class, get_scopes, exists=None):
+    """
+    Создает представление ленты с кэшем и условными GET-запросами.
+
+    Args:
+        feed_class: Класс ленты
+        get_scopes: Функция, возвращающая области кэша ленты
+            по аргументам представления
+        exists: Проверка существования объекта ленты (см. feed_condition)
+
+    Returns:
+        function: Представление
+    """
+    return feed_condition(exists)(
+        cache_anonymous_page(get_scopes)(feed_class())
+    )
+
+
+posts_rss = cached_feed(PostsFeed, index_scopes)
+posts_atom = cached_feed(atom(PostsFeed), index_scopes)
+category_posts_rss = cached_feed(
+    CategoryPostsFeed, category_posts_scopes, category_exists
+)
+category_posts_atom = cached_feed(
+    atom(CategoryPostsFeed), category_posts_scopes, category_exists
+)
+author_posts_rss = cached_feed(AuthorPostsFeed, profile_scopes, author_exists)
+author_posts_atom = cached_feed(
+    atom(AuthorPostsFeed), profile_scopes, author_exists
+)
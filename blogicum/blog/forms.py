@@ -1,9 +1,12 @@
 from django import forms
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserChangeForm
+from django.core.exceptions import ValidationError
 from django.utils import timezone
 
+from .constants import IMAGE_HEADER_SIZE
 from .models import Comment, Post
+from .uploads import RejectedUpload, inspect_image_header
 
 User = get_user_model()
 
@@ -18,6 +21,29 @@ class UserEditForm(UserChangeForm):
         fields = ("first_name", "last_name", "username", "email")
 
 
+class BoundedImageField(forms.ImageField):
+    """
+    Поле изображения, которое проверяет заголовок файла до декодирования.
+
+    Файл, отклонённый BoundedImageUploadHandler, превращается в ошибку
+    поля. Файлы, загруженные в обход обработчика, проверяются
+    по заголовку здесь же, до полной проверки Pillow в ImageField.
+    """
+
+    def to_python(self, data):
+        if isinstance(data, RejectedUpload):
+            raise ValidationError(data.error, code="invalid_image")
+        if data and hasattr(data, "read"):
+            data.seek(0)
+            error, _ = inspect_image_header(
+                data.read(IMAGE_HEADER_SIZE), complete=True
+            )
+            data.seek(0)
+            if error:
+                raise ValidationError(error, code="invalid_image")
+        return super().to_python(data)
+
+
 class PostForm(forms.ModelForm):
     """
     Форма для создания и редактирования поста.
@@ -53,6 +79,7 @@ class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         exclude = ("is_published", "author")
+        field_classes = {"image": BoundedImageField}
         widgets = {
             "pub_date": forms.DateTimeInput(
                 format="%Y-%m-%dT%H:%M", attrs={"type": "datetime-local"}
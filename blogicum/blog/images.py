@@ -0,0 +1,239 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .cache import bump_scopes, drop_post_cards, post_scopes
+from .constants import (
+    IMAGE_JPEG_QUALITY,
+    IMAGE_RENDITION_WORKERS,
+    IMAGE_RENDITIONS,
+    IMAGE_RENDITIONS_DIR,
+    IMAGE_WEBP_QUALITY,
+)
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+# Форматы миниатюр: расширение файла, MIME-тип и параметры Pillow.
+RENDITION_FORMATS = {
+    "jpeg": (
+        "jpg",
+        "image/jpeg",
+        {"quality": IMAGE_JPEG_QUALITY, "optimize": True, "progressive": True},
+    ),
+    "webp": (
+        "webp",
+        "image/webp",
+        {"quality": IMAGE_WEBP_QUALITY, "method": 4},
+    ),
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _flatten(image):
+    """Приводит изображение к RGB, подкладывая белый фон под прозрачность."""
+    if image.mode == "RGB":
+        return image
+    if image.mode in ("RGBA", "LA") or "transparency" in image.info:
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def read_image_meta(image):
+    """
+    Читает ширину, высоту и размер файла изображения.
+
+    Для только что загруженного файла данные читаются из загрузки,
+    иначе — из хранилища. Результат сохраняется в Post.image_meta,
+    чтобы админка и шаблоны не обращались к хранилищу.
+
+    Args:
+        image: Значение ImageField
+
+    Returns:
+        dict: {"width", "height", "size"} или пустой словарь, если
+            изображения нет или файл не найден
+    """
+    if not image:
+        return {}
+    try:
+        return {
+            "width": image.width,
+            "height": image.height,
+            "size": image.size,
+        }
+    except OSError:
+        return {}
+
+
+def render_image(storage, source_name, prefix):
+    """
+    Строит миниатюры изображения и сохраняет их в хранилище.
+
+    Args:
+        storage: Хранилище файлов, где лежит исходное изображение
+        source_name: Имя исходного файла в хранилище
+        prefix: Начало имени файлов миниатюр
+
+    Returns:
+        dict: Сведения о миниатюрах: {имя: {"width", "height",
+            "jpeg", "webp"}}, где для форматов указаны имена файлов
+    """
+    largest = max(IMAGE_RENDITIONS.values())
+    with storage.open(source_name) as source, Image.open(source) as image:
+        # Для JPEG декодирует сразу с уменьшением, не разворачивая
+        # исходник в полном размере.
+        image.draft("RGB", largest)
+        image = _flatten(ImageOps.exif_transpose(image))
+        renditions = {}
+        for name, size in sorted(
+            IMAGE_RENDITIONS.items(), key=lambda item: item[1], reverse=True
+        ):
+            image.thumbnail(size, Image.Resampling.LANCZOS)
+            rendition = {"width": image.width, "height": image.height}
+            for fmt, (extension, _, options) in RENDITION_FORMATS.items():
+                buffer = BytesIO()
+                image.save(buffer, fmt.upper(), **options)
+                rendition[fmt] = storage.save(
+                    f"{prefix}-{name}.{extension}",
+                    ContentFile(buffer.getvalue()),
+                )
+            renditions[name] = rendition
+    return renditions
+
+
+def delete_renditions(storage, renditions):
+    """
+    Удаляет файлы миниатюр из хранилища.
+
+    Args:
+        storage: Хранилище файлов
+        renditions: Сведения о миниатюрах (см. render_image)
+    """
+    for rendition in renditions.values():
+        for fmt in RENDITION_FORMATS:
+            if rendition.get(fmt):
+                storage.delete(rendition[fmt])
+
+
+def build_renditions(post_id):
+    """
+    Строит миниатюры изображения поста и сохраняет сведения о них.
+
+    Если изображение поста успело измениться, построенные миниатюры
+    удаляются: их заменит задача, запущенная для нового изображения.
+
+    Args:
+        post_id: ID поста
+    """
+    post = Post.objects.filter(pk=post_id).only(
+        "pk", "image", "image_renditions"
+    ).first()
+    if post is None or not post.image:
+        return
+    storage = post.image.storage
+    source_name = post.image.name
+    stem = PurePosixPath(source_name).stem
+    renditions = render_image(
+        storage, source_name, f"{IMAGE_RENDITIONS_DIR}/{post_id}/{stem}"
+    )
+    posts = Post.objects.filter(pk=post_id, image=source_name)
+    drop_post_cards(posts)
+    if not posts.update(
+        image_renditions=renditions, updated_at=timezone.now()
+    ):
+        delete_renditions(storage, renditions)
+        return
+    delete_renditions(storage, post.image_renditions)
+    bump_scopes(*post_scopes(posts))
+
+
+def _build_in_worker(post_id):
+    try:
+        build_renditions(post_id)
+    except Exception:
+        logger.exception("Не удалось построить миниатюры поста %s", post_id)
+    finally:
+        close_old_connections()
+
+
+def _get_executor(workers):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="blog-images"
+            )
+    return _executor
+
+
+def schedule_renditions(post_id):
+    """
+    Запускает построение миниатюр поста в пуле потоков.
+
+    Запрос с загрузкой изображения не ждёт обработки: до её окончания
+    шаблоны выводят исходное изображение. Число потоков задаёт
+    настройка BLOG_IMAGE_WORKERS; при 0 миниатюры строятся сразу.
+
+    Args:
+        post_id: ID поста
+    """
+    workers = getattr(
+        settings, "BLOG_IMAGE_WORKERS", IMAGE_RENDITION_WORKERS
+    )
+    if not workers:
+        build_renditions(post_id)
+        return
+    _get_executor(workers).submit(_build_in_worker, post_id)
+
+
+def rendition_url(post, name, fmt="jpeg"):
+    """
+    Возвращает URL миниатюры или исходного изображения поста.
+
+    Args:
+        post: Пост с изображением
+        name: Имя миниатюры из IMAGE_RENDITIONS
+        fmt: Формат миниатюры
+
+    Returns:
+        str: URL миниатюры, а пока её нет — исходного изображения
+    """
+    rendition = post.image_renditions.get(name)
+    if not rendition:
+        return post.image.url
+    return post.image.storage.url(rendition[fmt])
+
+
+def rendition_srcset(post, fmt="jpeg"):
+    """
+    Возвращает значение атрибута srcset по всем миниатюрам поста.
+
+    Args:
+        post: Пост с изображением
+        fmt: Формат миниатюр
+
+    Returns:
+        str: Строка вида "<url> 480w, <url> 1200w" или пустая строка
+    """
+    storage = post.image.storage
+    renditions = sorted(
+        post.image_renditions.values(), key=lambda item: item["width"]
+    )
+    return ", ".join(
+        f"{storage.url(rendition[fmt])} {rendition['width']}w"
+        for rendition in renditions
+    )
@@ -0,0 +1,141 @@
+import asyncio
+import importlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client, override_settings
+from django.urls import clear_url_caches
+
+from blog.models import Post
+
+NO_CACHE = {
+    "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+}
+
+
+@contextmanager
+def read_views(use_async):
+    """
+    Подключает асинхронные или синхронные представления чтения.
+
+    Настройка BLOG_ASYNC_VIEWS читается при импорте blog.urls, поэтому
+    модуль перезагружается вместе с корневым модулем URL, который
+    хранит разобранные маршруты включённых модулей.
+    """
+    def reload_urls():
+        for module in ("blog.urls", settings.ROOT_URLCONF):
+            importlib.reload(importlib.import_module(module))
+        clear_url_caches()
+
+    try:
+        with override_settings(BLOG_ASYNC_VIEWS=use_async):
+            reload_urls()
+            yield
+    finally:
+        reload_urls()
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает пропускную способность страниц чтения под WSGI "
+        "(синхронные представления, пул потоков) и ASGI (асинхронные "
+        "представления, один цикл событий). Запросы выполняются в "
+        "процессе тестовыми клиентами Django к текущей базе данных."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help=(
+                "Адрес страницы; можно указать несколько раз (по умолчанию "
+                "— главная и страница последнего опубликованного поста)."
+            ),
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=200,
+            help="Количество запросов к каждой странице.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=20,
+            help="Количество одновременных запросов.",
+        )
+        parser.add_argument(
+            "--with-cache",
+            action="store_true",
+            help=(
+                "Не отключать кэш: анонимные страницы будут отдаваться "
+                "из него, и сравнение покажет в основном работу кэша."
+            ),
+        )
+
+    def handle(self, *args, paths, requests, concurrency, **options):
+        overrides = {"ALLOWED_HOSTS": ["testserver"]}
+        if not options["with_cache"]:
+            overrides["CACHES"] = NO_CACHE
+        with override_settings(**overrides):
+            for path in paths or self.default_paths():
+                for name, use_async, run in (
+                    ("WSGI", False, self.run_threads),
+                    ("ASGI", True, self.run_event_loop),
+                ):
+                    with read_views(use_async):
+                        run(path, 1, 1)
+                        started = time.perf_counter()
+                        statuses = run(path, requests, concurrency)
+                        elapsed = time.perf_counter() - started
+                    self.report(name, path, statuses, elapsed)
+
+    @staticmethod
+    def default_paths():
+        paths = ["/"]
+        post_id = (
+            Post.objects.filter_posts_by_publication()
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if post_id:
+            paths.append(f"/posts/{post_id}/")
+        return paths
+
+    @staticmethod
+    def run_threads(path, requests, concurrency):
+        """Выполняет запросы в пуле потоков, как WSGI-сервер."""
+        def fetch(_):
+            return Client().get(path).status_code
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(fetch, range(requests)))
+
+    @staticmethod
+    def run_event_loop(path, requests, concurrency):
+        """Выполняет запросы в одном цикле событий, как ASGI-сервер."""
+        async def run():
+            client = AsyncClient()
+            slots = asyncio.Semaphore(concurrency)
+
+            async def fetch():
+                async with slots:
+                    return (await client.get(path)).status_code
+
+            return await asyncio.gather(*(fetch() for _ in range(requests)))
+
+        return asyncio.run(run())
+
+    def report(self, name, path, statuses, elapsed):
+        failed = sum(status != 200 for status in statuses)
+        line = (
+            f"{name} {path}: {len(statuses) / elapsed:.1f} запросов/с "
+            f"({len(statuses)} за {elapsed:.2f} с)"
+        )
+        if failed:
+            line += f", ответов не 200: {failed}"
+        self.stdout.write(self.style.WARNING(line) if failed else line)
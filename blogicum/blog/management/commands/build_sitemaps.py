@@ -0,0 +1,40 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.sitemaps import refresh_sitemaps, sitemap_base_url, sitemap_root
+
+
+class Command(BaseCommand):
+    help = (
+        "Перезаписывает устаревшие файлы карты сайта. Подходит для запуска "
+        "по расписанию, чтобы запросы поисковых роботов не ждали записи."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--base-url",
+            help=(
+                "Схема и домен сайта, например https://example.com "
+                "(по умолчанию — настройка BLOG_SITEMAP_BASE_URL)."
+            ),
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Перезаписать все файлы, даже неизменившиеся.",
+        )
+
+    def handle(self, *args, base_url, force, **options):
+        try:
+            base_url = (
+                base_url.rstrip("/") if base_url else sitemap_base_url()
+            )
+        except ImproperlyConfigured as error:
+            raise CommandError(error)
+        rebuilt = refresh_sitemaps(base_url, force=force)
+        for name in rebuilt:
+            self.stdout.write(f"Записан файл {name}.xml")
+        self.stdout.write(self.style.SUCCESS(
+            f"Карта сайта обновлена в {sitemap_root()}: "
+            f"перезаписано файлов — {len(rebuilt)}."
+        ))
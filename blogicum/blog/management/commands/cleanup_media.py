@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.constants import IMAGE_UPLOAD_DIR, MEDIA_CLEANUP_MIN_AGE
+from blog.images import RENDITION_FORMATS
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        "Удаляет изображения постов и миниатюры, на которые не ссылается "
+        "ни один пост."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только вывести файлы, которые будут удалены.",
+        )
+        parser.add_argument(
+            "--min-age",
+            type=int,
+            default=MEDIA_CLEANUP_MIN_AGE,
+            help=(
+                "Не удалять файлы моложе указанного числа секунд: их могла "
+                "только что сохранить загрузка или построение миниатюр."
+            ),
+        )
+
+    def handle(self, *args, dry_run, min_age, **options):
+        referenced = self.referenced_files()
+        threshold = timezone.now() - timedelta(seconds=min_age)
+        removed = 0
+        for name in self.walk(IMAGE_UPLOAD_DIR):
+            if name in referenced:
+                continue
+            if default_storage.get_modified_time(name) > threshold:
+                continue
+            self.stdout.write(name)
+            if not dry_run:
+                default_storage.delete(name)
+            removed += 1
+        action = "Будет удалено" if dry_run else "Удалено"
+        self.stdout.write(self.style.SUCCESS(f"{action} файлов: {removed}"))
+
+    def referenced_files(self):
+        referenced = set()
+        rows = (
+            Post.objects.exclude(image="")
+            .exclude(image__isnull=True)
+            .values_list("image", "image_renditions")
+        )
+        for image, renditions in rows.iterator():
+            referenced.add(image)
+            for rendition in renditions.values():
+                referenced.update(
+                    rendition[fmt]
+                    for fmt in RENDITION_FORMATS
+                    if rendition.get(fmt)
+                )
+        return referenced
+
+    def walk(self, path):
+        if not default_storage.exists(path):
+            return
+        directories, files = default_storage.listdir(path)
+        for name in files:
+            yield f"{path}/{name}"
+        for directory in directories:
+            yield from self.walk(f"{path}/{directory}")
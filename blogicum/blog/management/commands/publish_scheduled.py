@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.constants import PUBLISH_POLL_INTERVAL
+from blog.services import publish_due_posts, seconds_until_next_publication
+
+
+class Command(BaseCommand):
+    help = (
+        "Выводит в ленты отложенные посты, время публикации которых "
+        "наступило, и сбрасывает закэшированные страницы лент."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Работать непрерывно, просыпаясь к ближайшей публикации.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=PUBLISH_POLL_INTERVAL,
+            help=(
+                "Наибольшая пауза между проверками в секундах: за это время "
+                "команда замечает новые отложенные посты."
+            ),
+        )
+
+    def handle(self, *args, loop, interval, **options):
+        while True:
+            published = publish_due_posts()
+            if published:
+                self.stdout.write(f"Опубликовано постов: {published}")
+            if not loop:
+                break
+            delay = seconds_until_next_publication()
+            time.sleep(interval if delay is None else min(delay, interval))
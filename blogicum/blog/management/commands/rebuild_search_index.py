@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+
+from blog.constants import SEARCH_INDEX_BATCH_SIZE
+from blog.models import Comment, Post, SearchDocument
+from blog.search import get_search_backend, stem_text
+
+
+class Command(BaseCommand):
+    help = (
+        "Заново выделяет основы слов постов и перестраивает поисковый "
+        "индекс постов и комментариев пакетами."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=SEARCH_INDEX_BATCH_SIZE,
+            help="Количество объектов, читаемых одним запросом.",
+        )
+
+    def handle(self, *args, batch_size, **options):
+        backend = get_search_backend()
+        for model, index in (
+            (Post, self.index_posts),
+            (Comment, self.index_comments),
+        ):
+            objects = model.objects.order_by("pk")
+            indexed = 0
+            last_id = 0
+            while True:
+                batch = list(objects.filter(pk__gt=last_id)[:batch_size])
+                if not batch:
+                    break
+                index(backend, batch)
+                indexed += len(batch)
+                last_id = batch[-1].pk
+                self.stdout.write(
+                    f"{model._meta.verbose_name_plural}: {indexed}"
+                )
+        self.stdout.write(self.style.SUCCESS("Поисковый индекс перестроен."))
+
+    def index_posts(self, backend, posts):
+        documents = [
+            SearchDocument(
+                post=post,
+                title=stem_text(post.title),
+                text=stem_text(post.text),
+            )
+            for post in posts
+        ]
+        SearchDocument.objects.bulk_create(
+            documents,
+            update_conflicts=True,
+            unique_fields=("post",),
+            update_fields=("title", "text"),
+        )
+        for document in documents:
+            backend.index_post(document)
+
+    def index_comments(self, backend, comments):
+        for comment in comments:
+            backend.index_comment(comment)
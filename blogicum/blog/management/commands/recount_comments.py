@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает хранимое количество комментариев постов "
+        "(Post.comment_count) пакетами."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Количество постов, обновляемых одним запросом.",
+        )
+
+    def handle(self, *args, batch_size, **options):
+        post_ids = Post.objects.order_by("pk").values_list("pk", flat=True)
+        updated = 0
+        last_id = 0
+        while True:
+            batch = list(post_ids.filter(pk__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            updated += Post.objects.filter(pk__in=batch).recount_comments()
+            last_id = batch[-1]
+            self.stdout.write(f"Обработано постов: {updated}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Счётчики пересчитаны для {updated} постов.")
+        )
@@ -0,0 +1,99 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.constants import RENDER_BATCH_SIZE
+from blog.models import Comment, Post
+from blog.rendering import get_renderer, posts_showing, render_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Перестраивает хранимый HTML текстов постов и комментариев, "
+        "построенный прежней версией рендерера, в пуле процессов."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Перестроить HTML всех объектов, а не только устаревший.",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=os.cpu_count(),
+            help="Количество процессов (0 — в текущем процессе).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=RENDER_BATCH_SIZE,
+            help="Количество текстов в одной задаче процесса.",
+        )
+
+    def handle(self, *args, processes, batch_size, **options):
+        version = get_renderer().version
+        executor = (
+            ProcessPoolExecutor(max_workers=processes) if processes else None
+        )
+        try:
+            for model in (Post, Comment):
+                objects = model.objects.all()
+                if not options["all"]:
+                    objects = objects.exclude(render_version=version)
+                rendered = self.rerender(
+                    model, objects, executor, batch_size, processes * 2
+                )
+                self.stdout.write(
+                    f"{model._meta.verbose_name_plural}: {rendered}"
+                )
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        self.stdout.write(self.style.SUCCESS("HTML текстов перестроен."))
+
+    @staticmethod
+    def batches(objects, batch_size):
+        """Выбирает пары (ID, текст) пачками по возрастанию ID."""
+        rows = objects.order_by("pk").values_list("pk", "text")
+        last_id = 0
+        while True:
+            batch = list(rows.filter(pk__gt=last_id)[:batch_size])
+            if not batch:
+                return
+            yield batch
+            last_id = batch[-1][0]
+
+    def rerender(self, model, objects, executor, batch_size, max_pending):
+        def save(rows):
+            model.objects.bulk_update(
+                [
+                    model(pk=pk, text_html=html, render_version=version)
+                    for pk, html, version in rows
+                ],
+                ("text_html", "render_version"),
+            )
+            # Страницы постов изменились: обновляем их валидатор.
+            posts_showing(model, [pk for pk, _, _ in rows]).update(
+                updated_at=timezone.now()
+            )
+            return len(rows)
+
+        rendered = 0
+        # Процессы пула только строят HTML, записывает его текущий процесс.
+        # Очередь задач ограничена, чтобы не читать все тексты в память.
+        pending = deque()
+        for batch in self.batches(objects, batch_size):
+            if executor is None:
+                rendered += save(render_rows(batch))
+                continue
+            pending.append(executor.submit(render_rows, batch))
+            if len(pending) > max_pending:
+                rendered += save(pending.popleft().result())
+        while pending:
+            rendered += save(pending.popleft().result())
+        return rendered
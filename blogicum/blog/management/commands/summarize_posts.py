@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.cache import bump_scopes, drop_post_cards, post_scopes
+from blog.excerpts import summarize
+from blog.models import Post
+
+SUMMARY_FIELDS = ("excerpt", "word_count", "reading_time")
+
+
+class Command(BaseCommand):
+    help = (
+        "Заново вычисляет превью, количество слов и время чтения постов "
+        "пакетами, например после изменения длины превью."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Количество постов, читаемых одним запросом.",
+        )
+
+    def handle(self, *args, batch_size, **options):
+        posts = Post.objects.order_by("pk").only("pk", "text", *SUMMARY_FIELDS)
+        scopes = set()
+        processed = updated = 0
+        last_id = 0
+        while True:
+            batch = list(posts.filter(pk__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            changed = [post for post in batch if self.summarize(post)]
+            if changed:
+                changed_posts = Post.objects.filter(
+                    pk__in=[post.pk for post in changed]
+                )
+                drop_post_cards(changed_posts)
+                scopes |= post_scopes(changed_posts)
+                Post.objects.bulk_update(
+                    changed, (*SUMMARY_FIELDS, "updated_at")
+                )
+            processed += len(batch)
+            updated += len(changed)
+            last_id = batch[-1].pk
+            self.stdout.write(f"Обработано постов: {processed}")
+        if scopes:
+            bump_scopes(*scopes)
+        self.stdout.write(self.style.SUCCESS(
+            f"Сведения о тексте обновлены у {updated} постов."
+        ))
+
+    @staticmethod
+    def summarize(post):
+        """Обновляет сведения о тексте поста; True, если они изменились."""
+        summary = summarize(post.text)
+        if all(getattr(post, name) == summary[name] for name in summary):
+            return False
+        for name, value in summary.items():
+            setattr(post, name, value)
+        post.updated_at = timezone.now()
+        return True
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_search_tables(apps, schema_editor):
+    from blog.search import get_search_backend
+
+    get_search_backend(schema_editor.connection.vendor).setup(schema_editor)
+
+
+def drop_search_tables(apps, schema_editor):
+    from blog.search import get_search_backend
+
+    get_search_backend(schema_editor.connection.vendor).teardown(
+        schema_editor
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_post_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='Терм')),
+                ('weight', models.PositiveIntegerField(verbose_name='Вес')),
+                ('comment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='blog.comment', verbose_name='Комментарий')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='blog.post', verbose_name='Публикация')),
+            ],
+            options={
+                'verbose_name': 'терм поискового индекса',
+                'verbose_name_plural': 'Поисковый индекс',
+                'indexes': [models.Index(fields=['term', 'post'], name='searchterm_term_post_idx')],
+            },
+        ),
+        migrations.RunPython(create_search_tables, drop_search_tables),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def fill_search_documents(apps, schema_editor):
+    from blog.search import stem_text
+
+    Post = apps.get_model("blog", "Post")
+    SearchDocument = apps.get_model("blog", "SearchDocument")
+    posts = Post.objects.order_by("pk").only("pk", "title", "text")
+    last_id = 0
+    while True:
+        batch = list(posts.filter(pk__gt=last_id)[:BATCH_SIZE])
+        if not batch:
+            break
+        SearchDocument.objects.bulk_create(
+            SearchDocument(
+                post_id=post.pk,
+                title=stem_text(post.title),
+                text=stem_text(post.text),
+            )
+            for post in batch
+        )
+        last_id = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0018_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='blog.post', verbose_name='Публикация')),
+                ('title', models.TextField(blank=True, verbose_name='Основы слов заголовка')),
+                ('text', models.TextField(blank=True, verbose_name='Основы слов текста')),
+            ],
+            options={
+                'verbose_name': 'поисковый документ',
+                'verbose_name_plural': 'Поисковые документы',
+            },
+        ),
+        migrations.RunPython(
+            fill_search_documents, migrations.RunPython.noop
+        ),
+    ]
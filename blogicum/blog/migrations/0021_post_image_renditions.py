@@ -0,0 +1,19 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:30
+
+import blog.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0020_post_is_visible'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_renditions',
+            field=blog.models.RenditionsField(blank=True, default=dict, editable=False, verbose_name='Миниатюры изображения'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:33
+
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def fill_image_meta(apps, schema_editor):
+    from blog.images import read_image_meta
+
+    Post = apps.get_model("blog", "Post")
+    posts = Post.objects.exclude(image="").exclude(image__isnull=True)
+    posts = posts.order_by("pk").only("pk", "image")
+    last_id = 0
+    while True:
+        batch = list(posts.filter(pk__gt=last_id)[:BATCH_SIZE])
+        if not batch:
+            break
+        for post in batch:
+            post.image_meta = read_image_meta(post.image)
+        Post.objects.bulk_update(batch, ("image_meta",))
+        last_id = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0021_post_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Ширина, высота и размер файла, сохранённые при загрузке.', verbose_name='Сведения об изображении'),
+        ),
+        migrations.RunPython(fill_image_meta, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:43
+
+import datetime
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def fill_post_summaries(apps, schema_editor):
+    from blog.excerpts import summarize
+
+    Post = apps.get_model("blog", "Post")
+    posts = Post.objects.order_by("pk").only("pk", "text")
+    last_id = 0
+    while True:
+        batch = list(posts.filter(pk__gt=last_id)[:BATCH_SIZE])
+        if not batch:
+            break
+        for post in batch:
+            for name, value in summarize(post.text).items():
+                setattr(post, name, value)
+        Post.objects.bulk_update(
+            batch, ("excerpt", "word_count", "reading_time")
+        )
+        last_id = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0022_post_image_meta'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=301, verbose_name='Превью текста'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='reading_time',
+            field=models.DurationField(default=datetime.timedelta, editable=False, verbose_name='Время чтения'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество слов'),
+        ),
+        migrations.RunPython(fill_post_summaries, migrations.RunPython.noop),
+    ]
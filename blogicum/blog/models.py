@@ -1,17 +1,80 @@
+from datetime import timedelta
+
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+from django.utils.safestring import mark_safe
 
 from .constants import (
     CHARFIELD_MAX_LENGTH,
     DEFAULT_STR_LENGTH,
+    POST_PREVIEW_LENGTH,
     PUBLISHED_HELP_TEXT,
+    SEARCH_TERM_MAX_LENGTH,
     SLUGFIELD_MAX_LENGTH,
 )
+from .rendering import get_text_html
 
 User = get_user_model()
 
 
+class ManagedFieldMixin:
+    """
+    Поле, которое изменяется только отдельными UPDATE, а не save().
+
+    При сохранении существующего объекта поле записывается само в себя,
+    поэтому save() с устаревшим значением в памяти не затирает
+    изменения, сделанные параллельными запросами или фоновыми задачами.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("editable", False)
+        super().__init__(*args, **kwargs)
+
+    def pre_save(self, model_instance, add):
+        if add:
+            return super().pre_save(model_instance, add)
+        return models.F(self.attname)
+
+
+class CounterField(ManagedFieldMixin, models.PositiveIntegerField):
+    """Денормализованный счётчик, который изменяется только через F()."""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("default", 0)
+        super().__init__(*args, **kwargs)
+
+
+class RenditionsField(ManagedFieldMixin, models.JSONField):
+    """
+    Сведения о миниатюрах изображения, которые записывает фоновая
+    задача (см. images.py).
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("default", dict)
+        kwargs.setdefault("blank", True)
+        super().__init__(*args, **kwargs)
+
+
+class RenderedHTMLField(models.TextField):
+    """
+    HTML, построенный из текста объекта (см. rendering.py).
+
+    Значение из БД помечается как безопасное для вывода в шаблоне.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("editable", False)
+        kwargs.setdefault("blank", True)
+        kwargs.setdefault("default", "")
+        super().__init__(*args, **kwargs)
+
+    def from_db_value(self, value, expression, connection):
+        return value if value is None else mark_safe(value)
+
+
 class PostQuerySet(models.QuerySet):
     """
     Кастомный QuerySet для модели Post с дополнительными методами фильтрации.
@@ -19,31 +82,129 @@ class PostQuerySet(models.QuerySet):
     
     def filter_posts_by_publication(self):
         """
-        Фильтрует посты по следующим критериям:
-        - пост опубликован
-        - категория поста опубликована
-        - дата публикации не в будущем
-        
+        Фильтрует посты, которые выводятся в лентах: пост и его категория
+        опубликованы, а дата публикации наступила.
+
+        Условие хранится в поле Post.is_visible (см. refresh_visibility
+        и команду publish_scheduled), поэтому фильтр не зависит от
+        текущего времени и выполняется по индексу.
+
         Returns:
             QuerySet: Отфильтрованный набор постов
         """
-        return self.filter(
+        return self.filter(is_visible=True)
+
+    def visible_to(self, user):
+        """
+        Фильтрует посты, доступные пользователю: опубликованные
+        (см. filter_posts_by_publication) и, кроме того, все посты
+        самого пользователя.
+
+        Args:
+            user: Пользователь, просматривающий посты
+
+        Returns:
+            QuerySet: Отфильтрованный набор постов
+        """
+        if not user.is_authenticated:
+            return self.filter_posts_by_publication()
+        return self.filter(models.Q(is_visible=True) | models.Q(author=user))
+
+    @staticmethod
+    def _published_q():
+        return models.Q(
             is_published=True,
             category__is_published=True,
             pub_date__lte=timezone.now(),
         )
 
+    def due_for_publication(self):
+        """
+        Фильтрует отложенные посты, время публикации которых наступило,
+        но которые ещё не выводятся в лентах.
+
+        Returns:
+            QuerySet: Отфильтрованный набор постов
+        """
+        return self.filter(self._published_q(), is_visible=False)
+
+    def scheduled(self):
+        """
+        Фильтрует опубликованные посты с датой публикации в будущем.
+
+        Returns:
+            QuerySet: Отфильтрованный набор постов
+        """
+        return self.filter(
+            is_published=True,
+            category__is_published=True,
+            pub_date__gt=timezone.now(),
+        )
+
+    def refresh_visibility(self):
+        """
+        Пересчитывает хранимый флаг Post.is_visible двумя UPDATE.
+
+        Returns:
+            int: Количество постов, у которых изменился флаг
+        """
+        published = self._published_q()
+        shown = self.filter(published, is_visible=False).update(
+            is_visible=True
+        )
+        hidden = (
+            self.exclude(published)
+            .filter(is_visible=True)
+            .update(is_visible=False)
+        )
+        return shown + hidden
+
     def annotate_comment_count(self):
         """
-        Добавляет к постам аннотацию с количеством комментариев
-        и сортирует по дате публикации (новые сверху).
-        
+        Сортирует посты по дате публикации (новые сверху).
+
+        Количество комментариев хранится в поле Post.comment_count,
+        поэтому JOIN и GROUP BY по комментариям не нужны.
+
         Returns:
             QuerySet: Набор постов с количеством комментариев
         """
-        return self.annotate(
-            comment_count=models.Count("comments")
-        ).order_by("-pub_date")
+        return self.order_by("-pub_date")
+
+    def recount_comments(self):
+        """
+        Пересчитывает хранимое количество комментариев одним UPDATE.
+
+        Returns:
+            int: Количество обновлённых постов
+        """
+        comments = (
+            Comment.objects.filter(post=models.OuterRef("pk"))
+            .order_by()
+            .values("post")
+            .annotate(total=models.Count("pk"))
+            .values("total")
+        )
+        return self.update(
+            comment_count=Coalesce(models.Subquery(comments), 0)
+        )
+
+    def for_feed(self):
+        """
+        Готовит посты к выводу в ленте карточками.
+
+        Загружает автора, категорию и местоположение одним запросом
+        (без отдельного запроса на каждую карточку) и не выбирает полный
+        текст поста: карточка выводит сохранённое превью Post.excerpt.
+
+        Returns:
+            QuerySet: Набор постов для шаблона includes/post_card.html
+        """
+        return (
+            self.select_related("author", "category", "location")
+            .defer("text", "text_html")
+            .annotate_comment_count()
+        )
 
 
 class CreatedAtAbstract(models.Model):
@@ -82,6 +243,10 @@ class Post(IsPublishedCreatedAtAbstract):
     """
     title = models.CharField("Заголовок", max_length=CHARFIELD_MAX_LENGTH)
     text = models.TextField("Текст")
+    text_html = RenderedHTMLField("Текст в HTML")
+    render_version = models.PositiveSmallIntegerField(
+        "Версия рендерера", default=0, editable=False
+    )
     pub_date = models.DateTimeField(
         verbose_name="Дата и время публикации",
         help_text=(
@@ -113,12 +278,56 @@ class Post(IsPublishedCreatedAtAbstract):
     image = models.ImageField(
         "Изображение", upload_to="posts_images/", blank=True, null=True
     )
+    comment_count = CounterField("Количество комментариев")
+    image_renditions = RenditionsField("Миниатюры изображения")
+    image_meta = models.JSONField(
+        "Сведения об изображении",
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text="Ширина, высота и размер файла, сохранённые при загрузке.",
+    )
+    excerpt = models.CharField(
+        "Превью текста",
+        max_length=POST_PREVIEW_LENGTH + 1,
+        blank=True,
+        editable=False,
+    )
+    word_count = models.PositiveIntegerField(
+        "Количество слов", default=0, editable=False
+    )
+    reading_time = models.DurationField(
+        "Время чтения", default=timedelta, editable=False
+    )
+    updated_at = models.DateTimeField("Изменено", auto_now=True)
+    is_visible = models.BooleanField(
+        "Выводится в лентах", default=False, editable=False
+    )
     objects = PostQuerySet.as_manager()
 
     class Meta(IsPublishedCreatedAtAbstract.Meta):
         verbose_name = "публикация"
         verbose_name_plural = "Публикации"
         ordering = ("-pub_date",)
+        indexes = (
+            # Главная лента: частичный индекс только по видимым постам.
+            models.Index(
+                fields=("-pub_date",),
+                name="post_visible_pub_date_idx",
+                condition=models.Q(is_visible=True),
+            ),
+            # Лента категории.
+            models.Index(
+                fields=("category", "-pub_date"),
+                name="post_category_visible_idx",
+                condition=models.Q(is_visible=True),
+            ),
+            # Профиль автора.
+            models.Index(
+                fields=("author", "-pub_date"),
+                name="post_author_pub_date_idx",
+            ),
+        )
 
     def __str__(self):
         """
@@ -129,6 +338,30 @@ class Post(IsPublishedCreatedAtAbstract):
         """
         return self.title[:DEFAULT_STR_LENGTH]
 
+    @property
+    def rendered_text(self):
+        """HTML текста поста (см. rendering.get_text_html)."""
+        return get_text_html(self)
+
+    @property
+    def reading_minutes(self):
+        """Время чтения поста в целых минутах."""
+        return int(self.reading_time.total_seconds() // 60)
+
+    def compute_visibility(self):
+        """
+        Вычисляет значение флага is_visible для несохранённых изменений.
+
+        Returns:
+            bool: True, если пост должен выводиться в лентах
+        """
+        return bool(
+            self.is_published
+            and self.pub_date <= timezone.now()
+            and self.category_id
+            and self.category.is_published
+        )
+
 
 class Category(IsPublishedCreatedAtAbstract):
     """
@@ -198,10 +431,21 @@ class Comment(CreatedAtAbstract):
         related_name="comments",
     )
     text = models.TextField(verbose_name="Текст комментария")
+    text_html = RenderedHTMLField("Текст в HTML")
+    render_version = models.PositiveSmallIntegerField(
+        "Версия рендерера", default=0, editable=False
+    )
 
     class Meta(CreatedAtAbstract.Meta):
         verbose_name = "комментарий"
         verbose_name_plural = "Комментарии"
+        indexes = (
+            # Комментарии поста в порядке добавления.
+            models.Index(
+                fields=("post", "created_at"),
+                name="comment_post_created_idx",
+            ),
+        )
 
     def __str__(self):
         """
@@ -211,3 +455,82 @@ class Comment(CreatedAtAbstract):
             str: Текст комментария, обрезанный до DEFAULT_STR_LENGTH символов
         """
         return self.text[:DEFAULT_STR_LENGTH]
+
+    @property
+    def rendered_text(self):
+        """HTML текста комментария (см. rendering.get_text_html)."""
+        return get_text_html(self)
+
+
+class SearchTerm(models.Model):
+    """
+    Запись инвертированного индекса полнотекстового поиска.
+
+    Используется переносимым бэкендом поиска (см. search.py), когда
+    в базе данных нет собственного полнотекстового индекса.
+    """
+    term = models.CharField("Терм", max_length=SEARCH_TERM_MAX_LENGTH)
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name="Публикация",
+        related_name="search_terms",
+    )
+    comment = models.ForeignKey(
+        Comment,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        verbose_name="Комментарий",
+        related_name="search_terms",
+    )
+    weight = models.PositiveIntegerField("Вес")
+
+    class Meta:
+        verbose_name = "терм поискового индекса"
+        verbose_name_plural = "Поисковый индекс"
+        indexes = (
+            models.Index(
+                fields=("term", "post"), name="searchterm_term_post_idx"
+            ),
+        )
+
+    def __str__(self):
+        """
+        Возвращает строковое представление записи индекса.
+
+        Returns:
+            str: Терм
+        """
+        return self.term
+
+
+class SearchDocument(models.Model):
+    """
+    Основы слов поста, заранее выделенные для поискового индекса.
+
+    Хранится отдельно от поста, чтобы не увеличивать строки, которые
+    читаются при выводе лент.
+    """
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        verbose_name="Публикация",
+        related_name="search_document",
+    )
+    title = models.TextField("Основы слов заголовка", blank=True)
+    text = models.TextField("Основы слов текста", blank=True)
+
+    class Meta:
+        verbose_name = "поисковый документ"
+        verbose_name_plural = "Поисковые документы"
+
+    def __str__(self):
+        """
+        Возвращает строковое представление документа.
+
+        Returns:
+            str: Основы слов заголовка
+        """
+        return self.title[:DEFAULT_STR_LENGTH]
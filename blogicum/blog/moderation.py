@@ -0,0 +1,212 @@
+"""
+Массовые действия модерации.
+
+Действия выполняются запросами UPDATE и DELETE над пачками ID
+(см. MODERATION_BATCH_SIZE) без загрузки объектов моделей и без
+сигналов. Удаление идёт запросами DELETE по ID, начиная с зависимых
+строк (каскады CASCADE обходятся по связям моделей, см. _delete_rows),
+поэтому коллектор Django не загружает объекты. Карточки, счётчики
+комментариев, видимость постов и поисковый индекс обновляются для
+всей пачки сразу, а области кэша страниц сбрасываются одним вызовом
+bump_scopes в конце действия.
+"""
+from django.db import connection, transaction
+from django.db.models import CASCADE
+from django.utils import timezone
+
+from .cache import bump_scopes, category_scope, drop_post_cards, post_scopes
+from .constants import MODERATION_BATCH_SIZE
+from .models import Category, Comment, Location, Post
+from .search import get_search_backend
+
+
+def iter_pk_batches(queryset, batch_size=MODERATION_BATCH_SIZE):
+    """
+    Выбирает ID объектов пачками по возрастанию ключа.
+
+    Следующая пачка выбирается условием pk > последнего ID, поэтому
+    обход корректен, даже если действие убирает строки из выборки.
+
+    Args:
+        queryset: QuerySet объектов
+        batch_size: Размер пачки
+
+    Yields:
+        list: ID объектов пачки
+    """
+    pks = queryset.order_by("pk").values_list("pk", flat=True)
+    last_pk = None
+    while True:
+        batch = pks if last_pk is None else pks.filter(pk__gt=last_pk)
+        batch = list(batch[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last_pk = batch[-1]
+
+
+def _related_posts(model, pks):
+    if model is Post:
+        return Post.objects.filter(pk__in=pks)
+    return Post.objects.filter(**{f"{model._meta.model_name}__in": pks})
+
+
+def set_published(queryset, is_published):
+    """
+    Публикует или снимает с публикации посты, категории или местоположения.
+
+    Для категорий и местоположений обновляются и их посты: версия
+    карточки (updated_at) и флаг Post.is_visible.
+
+    Args:
+        queryset: QuerySet постов, категорий или местоположений
+        is_published: Новое значение флага is_published
+
+    Returns:
+        int: Количество изменённых объектов
+    """
+    model = queryset.model
+    scopes = set()
+    changed = 0
+    for pks in iter_pk_batches(queryset.exclude(is_published=is_published)):
+        rows = model.objects.filter(pk__in=pks)
+        posts = _related_posts(model, pks)
+        if model is Category:
+            scopes.update(
+                category_scope(slug)
+                for slug in rows.values_list("slug", flat=True)
+            )
+        drop_post_cards(posts)
+        now = timezone.now()
+        if model is Post:
+            changed += rows.update(is_published=is_published, updated_at=now)
+        else:
+            changed += rows.update(is_published=is_published)
+            posts.update(updated_at=now)
+        if model is not Location:
+            posts.refresh_visibility()
+        scopes |= post_scopes(posts)
+    if scopes:
+        bump_scopes(*scopes)
+    return changed
+
+
+def move_posts(posts, category):
+    """
+    Переносит посты в другую категорию.
+
+    Args:
+        posts: QuerySet постов
+        category: Новая категория
+
+    Returns:
+        int: Количество перенесённых постов
+    """
+    scopes = {category_scope(category.slug)}
+    moved = 0
+    for pks in iter_pk_batches(posts.exclude(category=category)):
+        batch = Post.objects.filter(pk__in=pks)
+        drop_post_cards(batch)
+        # Области до переноса: посты уходят из лент прежних категорий.
+        scopes |= post_scopes(batch)
+        moved += batch.update(category=category, updated_at=timezone.now())
+        batch.refresh_visibility()
+    if moved:
+        bump_scopes(*scopes)
+    return moved
+
+
+def _delete_rows(model, pks):
+    """
+    Удаляет строки по ID одним DELETE на каждую пачку параметров,
+    предварительно удалив строки, ссылающиеся на них (CASCADE).
+
+    Returns:
+        int: Количество удалённых строк модели
+    """
+    for relation in model._meta.related_objects:
+        if relation.on_delete is not CASCADE:
+            continue
+        children = list(
+            relation.related_model._base_manager.filter(
+                **{f"{relation.field.name}__in": pks}
+            ).values_list("pk", flat=True)
+        )
+        if children:
+            _delete_rows(relation.related_model, children)
+    table = connection.ops.quote_name(model._meta.db_table)
+    column = connection.ops.quote_name(model._meta.pk.column)
+    deleted = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(pks), MODERATION_BATCH_SIZE):
+            batch = pks[start:start + MODERATION_BATCH_SIZE]
+            placeholders = ", ".join(["%s"] * len(batch))
+            cursor.execute(
+                f"DELETE FROM {table} WHERE {column} IN ({placeholders})",
+                batch,
+            )
+            deleted += cursor.rowcount
+    return deleted
+
+
+def delete_posts(posts):
+    """
+    Удаляет посты вместе с их комментариями и записями поискового индекса.
+
+    Файлы изображений удалённых постов остаются в хранилище до запуска
+    команды cleanup_media.
+
+    Args:
+        posts: QuerySet постов
+
+    Returns:
+        int: Количество удалённых постов
+    """
+    backend = get_search_backend()
+    scopes = set()
+    deleted = 0
+    for pks in iter_pk_batches(posts):
+        batch = Post.objects.filter(pk__in=pks)
+        drop_post_cards(batch)
+        scopes |= post_scopes(batch)
+        backend.remove_posts(pks)
+        with transaction.atomic():
+            deleted += _delete_rows(Post, pks)
+    if scopes:
+        bump_scopes(*scopes)
+    return deleted
+
+
+def delete_comments(comments):
+    """
+    Удаляет комментарии и пересчитывает количество комментариев постов.
+
+    Args:
+        comments: QuerySet комментариев
+
+    Returns:
+        int: Количество удалённых комментариев
+    """
+    backend = get_search_backend()
+    post_ids = set()
+    deleted = 0
+    for pks in iter_pk_batches(comments):
+        batch = Comment.objects.filter(pk__in=pks)
+        post_ids.update(batch.values_list("post", flat=True).distinct())
+        backend.remove_comments(pks)
+        with transaction.atomic():
+            deleted += _delete_rows(Comment, pks)
+
+    scopes = set()
+    post_ids = sorted(post_ids)
+    for start in range(0, len(post_ids), MODERATION_BATCH_SIZE):
+        batch = Post.objects.filter(
+            pk__in=post_ids[start:start + MODERATION_BATCH_SIZE]
+        )
+        drop_post_cards(batch)
+        batch.recount_comments()
+        batch.update(updated_at=timezone.now())
+        scopes |= post_scopes(batch)
+    if scopes:
+        bump_scopes(*scopes)
+    return deleted
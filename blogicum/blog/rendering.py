@@ -0,0 +1,145 @@
+"""
+Хранимый HTML текстов постов и комментариев.
+
+Текст преобразуется в HTML при сохранении (см. signals.py) и хранится
+в поле text_html вместе с версией рендерера render_version. Шаблоны
+выводят готовый HTML; если версия рендерера изменилась, HTML
+перестраивается при первом обращении (get_text_html) или сразу для
+всех объектов командой rerender_texts.
+
+Рендерер задаётся настройкой BLOG_TEXT_RENDERER (путь импорта класса
+с атрибутом version и методом render), например для поддержки
+Markdown. При изменении вывода рендерера нужно увеличить его version.
+
+Перестроенный HTML меняет страницу поста, поэтому вместе с ним
+обновляется Post.updated_at — валидатор условных запросов
+(см. conditional.py).
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from django.template.defaultfilters import linebreaksbr
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+DEFAULT_RENDERER = "blog.rendering.PlainTextRenderer"
+
+
+class PlainTextRenderer:
+    """Экранированный текст с переносами строк (фильтр linebreaksbr)."""
+    version = 1
+
+    def render(self, text):
+        return linebreaksbr(text, autoescape=True)
+
+
+@lru_cache
+def _load_renderer(path):
+    return import_string(path)()
+
+
+def get_renderer():
+    """
+    Возвращает рендерер текстов из настройки BLOG_TEXT_RENDERER.
+
+    Returns:
+        object: Экземпляр рендерера
+    """
+    return _load_renderer(
+        getattr(settings, "BLOG_TEXT_RENDERER", DEFAULT_RENDERER)
+    )
+
+
+def render_text(text):
+    """
+    Преобразует текст в HTML текущим рендерером.
+
+    Args:
+        text: Исходный текст
+
+    Returns:
+        tuple: Пара (HTML, версия рендерера)
+    """
+    renderer = get_renderer()
+    return renderer.render(text), renderer.version
+
+
+def render_instance(obj):
+    """Записывает в объект HTML его текста и версию рендерера."""
+    obj.text_html, obj.render_version = render_text(obj.text)
+
+
+def posts_showing(model, pks):
+    """
+    Возвращает посты, на страницах которых выводятся тексты объектов.
+
+    Args:
+        model: Модель объектов — Post или Comment
+        pks: ID объектов
+
+    Returns:
+        QuerySet: Посты
+    """
+    # Модели импортируют этот модуль, поэтому Post импортируется здесь.
+    from .models import Post
+
+    if model is Post:
+        return Post.objects.filter(pk__in=pks)
+    return Post.objects.filter(comments__pk__in=pks)
+
+
+def get_text_html(obj):
+    """
+    Возвращает HTML текста поста или комментария.
+
+    HTML, построенный прежней версией рендерера, перестраивается
+    и сохраняется отдельным UPDATE без сигналов и без изменения
+    остальных полей объекта; Post.updated_at поста, на странице
+    которого выводится текст, обновляется.
+
+    Args:
+        obj: Пост или комментарий
+
+    Returns:
+        SafeString: HTML текста
+    """
+    if obj.render_version != get_renderer().version:
+        render_instance(obj)
+        type(obj)._default_manager.filter(pk=obj.pk).update(
+            text_html=obj.text_html, render_version=obj.render_version
+        )
+        posts_showing(type(obj), [obj.pk]).update(
+            updated_at=timezone.now()
+        )
+    return obj.text_html
+
+
+async def aget_text_html(obj):
+    """Асинхронный вариант get_text_html()."""
+    if obj.render_version != get_renderer().version:
+        render_instance(obj)
+        await type(obj)._default_manager.filter(pk=obj.pk).aupdate(
+            text_html=obj.text_html, render_version=obj.render_version
+        )
+        await posts_showing(type(obj), [obj.pk]).aupdate(
+            updated_at=timezone.now()
+        )
+    return obj.text_html
+
+
+def render_rows(rows):
+    """
+    Преобразует тексты в HTML; выполняется в процессах пула
+    команды rerender_texts.
+
+    Args:
+        rows: Пары (ID объекта, текст)
+
+    Returns:
+        list: Тройки (ID объекта, HTML, версия рендерера)
+    """
+    rendered = []
+    for pk, text in rows:
+        html, version = render_text(text)
+        rendered.append((pk, str(html), version))
+    return rendered
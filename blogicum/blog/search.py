@@ -0,0 +1,515 @@
+import re
+import threading
+from collections import Counter
+from functools import lru_cache, reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Q, Sum
+from django.utils.module_loading import import_string
+from snowballstemmer import stemmer
+
+from .constants import (
+    SEARCH_RESULTS_LIMIT,
+    SEARCH_STEM_CACHE_SIZE,
+    SEARCH_STEMMER_LANGUAGE,
+    SEARCH_TERM_MAX_LENGTH,
+)
+from .models import SearchTerm
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Объекты snowballstemmer хранят состояние разбора, поэтому у каждого
+# потока свой экземпляр.
+_local = threading.local()
+
+# Вес совпадения в заголовке, тексте поста и комментарии.
+TITLE_WEIGHT = 4
+TEXT_WEIGHT = 2
+COMMENT_WEIGHT = 1
+
+
+def tokenize(text):
+    """
+    Разбивает текст на термы поискового индекса.
+
+    Args:
+        text: Исходный текст
+
+    Returns:
+        list: Термы в нижнем регистре в порядке появления в тексте
+    """
+    return [
+        token[:SEARCH_TERM_MAX_LENGTH]
+        for token in TOKEN_RE.findall((text or "").lower())
+    ]
+
+
+@lru_cache(maxsize=SEARCH_STEM_CACHE_SIZE)
+def stem(token):
+    """
+    Возвращает основу слова по алгоритму Snowball для русского языка.
+
+    Слова на латинице и числа возвращаются без изменений.
+
+    Args:
+        token: Слово в нижнем регистре
+
+    Returns:
+        str: Основа слова
+    """
+    if not hasattr(_local, "stemmer"):
+        _local.stemmer = stemmer(SEARCH_STEMMER_LANGUAGE)
+    return _local.stemmer.stemWord(token) or token
+
+
+def analyze(text):
+    """
+    Разбивает текст на основы слов для поискового индекса и запроса.
+
+    Одинаковая обработка текста и запроса позволяет находить разные
+    словоформы: «путешествие», «путешествия» и «путешествиями»
+    дают одну основу.
+
+    Args:
+        text: Исходный текст
+
+    Returns:
+        list: Основы слов в порядке появления в тексте
+    """
+    return [stem(token) for token in tokenize(text)]
+
+
+def stem_text(text):
+    """
+    Возвращает основы слов текста строкой через пробел.
+
+    В таком виде основы хранятся в SearchDocument и передаются
+    полнотекстовому индексу СУБД.
+
+    Args:
+        text: Исходный текст
+
+    Returns:
+        str: Основы слов через пробел
+    """
+    return " ".join(analyze(text))
+
+
+class SearchBackend:
+    """
+    Базовый класс бэкенда полнотекстового поиска.
+
+    Бэкенд поддерживает индекс постов и комментариев в актуальном
+    состоянии (см. signals.py) и возвращает ID найденных постов,
+    упорядоченные по релевантности. В индекс попадают основы слов
+    (см. analyze): для постов — заранее сохранённый SearchDocument.
+    Слова запроса обрабатываются так же, поэтому при поиске строки
+    индекса не разбираются заново.
+    """
+
+    def setup(self, schema_editor):
+        """Создает таблицы индекса, которые не описаны моделями."""
+
+    def teardown(self, schema_editor):
+        """Удаляет таблицы индекса, созданные setup()."""
+
+    def index_post(self, document):
+        raise NotImplementedError
+
+    def remove_posts(self, post_ids):
+        raise NotImplementedError
+
+    def index_comment(self, comment):
+        raise NotImplementedError
+
+    def remove_comments(self, comment_ids):
+        raise NotImplementedError
+
+    def search_posts(self, query, limit=SEARCH_RESULTS_LIMIT,
+                     with_comments=True):
+        """
+        Args:
+            query: Поисковая фраза
+            limit: Наибольшее количество постов (None — без ограничения)
+            with_comments: Учитывать совпадения в комментариях постов
+
+        Returns:
+            list: ID постов по убыванию релевантности
+        """
+        raise NotImplementedError
+
+    def search_comments(self, query, limit=SEARCH_RESULTS_LIMIT):
+        """
+        Returns:
+            list: ID комментариев по убыванию релевантности; limit=None
+                — без ограничения количества
+        """
+        raise NotImplementedError
+
+
+class InvertedIndexBackend(SearchBackend):
+    """
+    Переносимый инвертированный индекс на модели SearchTerm.
+
+    Для каждого поста и комментария хранится по строке на терм с весом,
+    равным числу вхождений, умноженному на вес поля. Поиск выбирает
+    посты, в которых встречаются термы, начинающиеся со всех основ
+    запроса, и упорядочивает их по сумме весов.
+    """
+
+    def _rows(self, post_id, comment_id, *fields):
+        weights = Counter()
+        for stems, weight in fields:
+            for term in stems.split():
+                weights[term[:SEARCH_TERM_MAX_LENGTH]] += weight
+        return [
+            SearchTerm(
+                term=term, post_id=post_id, comment_id=comment_id,
+                weight=weight,
+            )
+            for term, weight in weights.items()
+        ]
+
+    def index_post(self, document):
+        SearchTerm.objects.filter(
+            post_id=document.post_id, comment__isnull=True
+        ).delete()
+        SearchTerm.objects.bulk_create(
+            self._rows(
+                document.post_id, None,
+                (document.title, TITLE_WEIGHT),
+                (document.text, TEXT_WEIGHT),
+            )
+        )
+
+    def remove_posts(self, post_ids):
+        SearchTerm.objects.filter(post_id__in=post_ids).delete()
+
+    def index_comment(self, comment):
+        SearchTerm.objects.filter(comment_id=comment.pk).delete()
+        SearchTerm.objects.bulk_create(
+            self._rows(
+                comment.post_id, comment.pk,
+                (stem_text(comment.text), COMMENT_WEIGHT),
+            )
+        )
+
+    def remove_comments(self, comment_ids):
+        SearchTerm.objects.filter(comment_id__in=comment_ids).delete()
+
+    def _matches(self, terms, group_by, **filters):
+        # Как и в индексах СУБД, основа слова запроса ищется по префиксу:
+        # Snowball не всегда одинаково обрезает формы одного слова.
+        prefixes = {
+            f"term_{number}": Q(term__startswith=term)
+            for number, term in enumerate(terms)
+        }
+        return (
+            SearchTerm.objects.filter(
+                reduce(or_, prefixes.values()), **filters
+            )
+            .values(group_by)
+            .annotate(
+                score=Sum("weight"),
+                **{
+                    name: Count("pk", filter=prefix)
+                    for name, prefix in prefixes.items()
+                },
+            )
+            .filter(**{f"{name}__gt": 0 for name in prefixes})
+            .order_by("-score", f"-{group_by}")
+            .values_list(group_by, flat=True)
+        )
+
+    def search_posts(self, query, limit=SEARCH_RESULTS_LIMIT,
+                     with_comments=True):
+        terms = set(analyze(query))
+        if not terms:
+            return []
+        filters = {} if with_comments else {"comment__isnull": True}
+        return list(self._matches(terms, "post_id", **filters)[:limit])
+
+    def search_comments(self, query, limit=SEARCH_RESULTS_LIMIT):
+        terms = set(analyze(query))
+        if not terms:
+            return []
+        return list(
+            self._matches(terms, "comment_id", comment__isnull=False)[:limit]
+        )
+
+
+class SqliteFTSBackend(SearchBackend):
+    """
+    Поиск по виртуальным таблицам SQLite FTS5 с ранжированием BM25.
+
+    rowid таблицы blog_post_fts совпадает с ID поста, а
+    blog_comment_fts — с ID комментария. Каждая основа слова запроса
+    ищется по префиксу.
+    """
+
+    def setup(self, schema_editor):
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS blog_post_fts "
+            "USING fts5(title, text)"
+        )
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS blog_comment_fts "
+            "USING fts5(text, post_id UNINDEXED)"
+        )
+
+    def teardown(self, schema_editor):
+        schema_editor.execute("DROP TABLE IF EXISTS blog_post_fts")
+        schema_editor.execute("DROP TABLE IF EXISTS blog_comment_fts")
+
+    def index_post(self, document):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT OR REPLACE INTO blog_post_fts (rowid, title, text) "
+                "VALUES (%s, %s, %s)",
+                [document.post_id, document.title, document.text],
+            )
+
+    def remove_posts(self, post_ids):
+        post_ids = list(post_ids)
+        if not post_ids:
+            return
+        placeholders = ", ".join(["%s"] * len(post_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM blog_post_fts WHERE rowid IN ({placeholders})",
+                post_ids,
+            )
+            cursor.execute(
+                "DELETE FROM blog_comment_fts "
+                f"WHERE post_id IN ({placeholders})",
+                post_ids,
+            )
+
+    def index_comment(self, comment):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT OR REPLACE INTO blog_comment_fts "
+                "(rowid, text, post_id) VALUES (%s, %s, %s)",
+                [comment.pk, stem_text(comment.text), comment.post_id],
+            )
+
+    def remove_comments(self, comment_ids):
+        comment_ids = list(comment_ids)
+        if not comment_ids:
+            return
+        placeholders = ", ".join(["%s"] * len(comment_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "DELETE FROM blog_comment_fts "
+                f"WHERE rowid IN ({placeholders})",
+                comment_ids,
+            )
+
+    @staticmethod
+    def _match(query):
+        return " AND ".join(f'"{term}"*' for term in analyze(query))
+
+    @staticmethod
+    def _limit(limit):
+        # В SQLite отрицательный LIMIT означает «без ограничения».
+        return -1 if limit is None else limit
+
+    def search_posts(self, query, limit=SEARCH_RESULTS_LIMIT,
+                     with_comments=True):
+        match = self._match(query)
+        if not match:
+            return []
+        # bm25() тем меньше, чем релевантнее строка; совпадение
+        # в комментариях весит вдвое меньше совпадения в тексте поста.
+        if with_comments:
+            sql = (
+                "SELECT post_id, SUM(score) AS total FROM ("
+                "  SELECT rowid AS post_id,"
+                "         -bm25(blog_post_fts, 2.0, 1.0) AS score"
+                "  FROM blog_post_fts WHERE blog_post_fts MATCH %s"
+                "  UNION ALL"
+                "  SELECT post_id, -0.5 * bm25(blog_comment_fts) AS score"
+                "  FROM blog_comment_fts WHERE blog_comment_fts MATCH %s"
+                ") GROUP BY post_id ORDER BY total DESC, post_id DESC "
+                "LIMIT %s"
+            )
+            params = [match, match]
+        else:
+            sql = (
+                "SELECT rowid FROM blog_post_fts "
+                "WHERE blog_post_fts MATCH %s "
+                "ORDER BY bm25(blog_post_fts, 2.0, 1.0), rowid DESC LIMIT %s"
+            )
+            params = [match]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [*params, self._limit(limit)])
+            return [row[0] for row in cursor.fetchall()]
+
+    def search_comments(self, query, limit=SEARCH_RESULTS_LIMIT):
+        match = self._match(query)
+        if not match:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT rowid FROM blog_comment_fts "
+                "WHERE blog_comment_fts MATCH %s ORDER BY rank LIMIT %s",
+                [match, self._limit(limit)],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    Поиск по столбцам tsvector PostgreSQL с GIN-индексами.
+
+    Используется конфигурация 'simple', так как в индекс передаются
+    уже выделенные основы слов (см. analyze); ранжирование — ts_rank
+    с весами A (заголовок) и B (текст).
+    """
+
+    def setup(self, schema_editor):
+        schema_editor.execute(
+            "CREATE TABLE IF NOT EXISTS blog_post_search ("
+            " post_id bigint PRIMARY KEY"
+            "  REFERENCES blog_post (id) ON DELETE CASCADE"
+            "  DEFERRABLE INITIALLY DEFERRED,"
+            " document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE TABLE IF NOT EXISTS blog_comment_search ("
+            " comment_id bigint PRIMARY KEY"
+            "  REFERENCES blog_comment (id) ON DELETE CASCADE"
+            "  DEFERRABLE INITIALLY DEFERRED,"
+            " post_id bigint NOT NULL,"
+            " document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS blog_post_search_document_idx "
+            "ON blog_post_search USING gin (document)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS blog_comment_search_document_idx "
+            "ON blog_comment_search USING gin (document)"
+        )
+
+    def teardown(self, schema_editor):
+        schema_editor.execute("DROP TABLE IF EXISTS blog_post_search")
+        schema_editor.execute("DROP TABLE IF EXISTS blog_comment_search")
+
+    def index_post(self, document):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO blog_post_search (post_id, document) VALUES ("
+                " %s,"
+                " setweight(to_tsvector('simple', %s), 'A')"
+                " || setweight(to_tsvector('simple', %s), 'B')) "
+                "ON CONFLICT (post_id) DO UPDATE"
+                " SET document = EXCLUDED.document",
+                [document.post_id, document.title, document.text],
+            )
+
+    def remove_posts(self, post_ids):
+        post_ids = list(post_ids)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "DELETE FROM blog_post_search WHERE post_id = ANY(%s)",
+                [post_ids],
+            )
+            cursor.execute(
+                "DELETE FROM blog_comment_search WHERE post_id = ANY(%s)",
+                [post_ids],
+            )
+
+    def index_comment(self, comment):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO blog_comment_search"
+                " (comment_id, post_id, document) "
+                "VALUES (%s, %s, to_tsvector('simple', %s)) "
+                "ON CONFLICT (comment_id) DO UPDATE"
+                " SET post_id = EXCLUDED.post_id,"
+                " document = EXCLUDED.document",
+                [comment.pk, comment.post_id, stem_text(comment.text)],
+            )
+
+    def remove_comments(self, comment_ids):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "DELETE FROM blog_comment_search WHERE comment_id = ANY(%s)",
+                [list(comment_ids)],
+            )
+
+    @staticmethod
+    def _tsquery(query):
+        return " & ".join(f"{term}:*" for term in analyze(query))
+
+    def search_posts(self, query, limit=SEARCH_RESULTS_LIMIT,
+                     with_comments=True):
+        tsquery = self._tsquery(query)
+        if not tsquery:
+            return []
+        sources = (
+            "  SELECT post_id, ts_rank(document, q.query) AS score"
+            "  FROM blog_post_search, q WHERE document @@ q.query"
+        )
+        if with_comments:
+            sources += (
+                "  UNION ALL"
+                "  SELECT post_id, 0.5 * ts_rank(document, q.query)"
+                "  FROM blog_comment_search, q WHERE document @@ q.query"
+            )
+        # LIMIT NULL в PostgreSQL означает «без ограничения».
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "WITH q AS (SELECT to_tsquery('simple', %s) AS query) "
+                f"SELECT post_id, SUM(score) AS total FROM ({sources}) "
+                "AS matches GROUP BY post_id "
+                "ORDER BY total DESC, post_id DESC LIMIT %s",
+                [tsquery, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def search_comments(self, query, limit=SEARCH_RESULTS_LIMIT):
+        tsquery = self._tsquery(query)
+        if not tsquery:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "WITH q AS (SELECT to_tsquery('simple', %s) AS query) "
+                "SELECT comment_id FROM blog_comment_search, q "
+                "WHERE document @@ q.query "
+                "ORDER BY ts_rank(document, q.query) DESC LIMIT %s",
+                [tsquery, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+VENDOR_BACKENDS = {
+    "sqlite": SqliteFTSBackend,
+    "postgresql": PostgresSearchBackend,
+}
+
+
+def get_search_backend(vendor=None):
+    """
+    Возвращает бэкенд поиска для текущей базы данных.
+
+    Класс бэкенда можно задать явно настройкой BLOG_SEARCH_BACKEND
+    (путь импорта), иначе он выбирается по СУБД, а для остальных СУБД
+    используется InvertedIndexBackend.
+
+    Args:
+        vendor: Имя СУБД (по умолчанию — СУБД соединения default)
+
+    Returns:
+        SearchBackend: Экземпляр бэкенда
+    """
+    path = getattr(settings, "BLOG_SEARCH_BACKEND", None)
+    if path:
+        return import_string(path)()
+    backend = VENDOR_BACKENDS.get(
+        vendor or connection.vendor, InvertedIndexBackend
+    )
+    return backend()
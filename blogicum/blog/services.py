@@ -1,19 +1,517 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.core.cache import cache
 from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Min, OuterRef, Q, Subquery
+from django.shortcuts import aget_object_or_404, get_object_or_404
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .cache import (
+    aget_scope_versions,
+    bump_scopes,
+    feed_state_token,
+    get_scope_versions,
+    post_scopes,
+)
+from .constants import (
+    COUNT_CACHE_TIMEOUT,
+    COUNT_ESTIMATE_THRESHOLD,
+    PAGE_WINDOW_ON_EACH_SIDE,
+    PAGE_WINDOW_ON_ENDS,
+    POSTS_LIMIT,
+)
+from .models import Comment, Post
+
+
+class CountStrategyPaginator(Paginator):
+    """
+    Paginator, который получает общее количество объектов
+    через переданную стратегию вместо COUNT(*).
+
+    Стратегия — функция, принимающая QuerySet и возвращающая число
+    (см. exact_count, planner_count, cached_count).
+    """
+
+    def __init__(self, *args, count_strategy=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_strategy = count_strategy
+
+    @cached_property
+    def count(self):
+        if self.count_strategy is None:
+            return super().count
+        return self.count_strategy(self.object_list)
+
+
+def exact_count(queryset):
+    """Точное количество объектов: SELECT COUNT(*)."""
+    return queryset.count()
+
+
+def planner_count(queryset, threshold=COUNT_ESTIMATE_THRESHOLD):
+    """
+    Количество объектов по оценке планировщика запросов.
+
+    Для больших выборок на PostgreSQL берётся оценка строк из
+    EXPLAIN без выполнения запроса. Небольшие выборки и другие СУБД,
+    которые не дают оценки (SQLite), считаются точно.
+
+    Args:
+        queryset: QuerySet для подсчёта
+        threshold: Оценка, начиная с которой точный подсчёт не нужен
+
+    Returns:
+        int: Количество объектов
+    """
+    if connections[queryset.db].vendor == "postgresql":
+        plan = json.loads(queryset.order_by().explain(format="json"))
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        if estimate >= threshold:
+            return estimate
+    return exact_count(queryset)
+
+
+def _count_key(name, versions, state):
+    versions = ":".join(map(str, versions))
+    return f"blog:count:{name}:{versions}:{feed_state_token(state)}"
+
+
+def cached_count(name, scopes, counter=exact_count, state=()):
+    """
+    Стратегия подсчёта с кэшированием результата для ленты.
+
+    Ключ включает версии областей кэша страниц (см. cache.bump_scopes)
+    и состояние постов в БД (см. cache.feed_state), поэтому
+    добавление, удаление и отложенная публикация постов сбрасывают
+    закэшированное количество. Для категории и автора это работает
+    как денормализованный счётчик опубликованных постов.
 
-from .constants import POSTS_LIMIT
+    Args:
+        name: Имя ленты и фильтра, например "category:<slug>"
+        scopes: Области кэша страниц ленты
+        counter: Стратегия подсчёта при промахе кэша
+        state: Состояние постов (см. cache.feed_state)
+
+    Returns:
+        function: Стратегия для CountStrategyPaginator
+    """
+    def count(queryset):
+        key = _count_key(name, get_scope_versions(scopes), state)
+        result = cache.get(key)
+        if result is None:
+            result = counter(queryset)
+            cache.set(key, result, COUNT_CACHE_TIMEOUT)
+        return result
+    return count
+
+
+async def aexact_count(queryset):
+    """Асинхронный вариант exact_count()."""
+    return await queryset.acount()
+
+
+async def aplanner_count(queryset, threshold=COUNT_ESTIMATE_THRESHOLD):
+    """Асинхронный вариант planner_count()."""
+    if connections[queryset.db].vendor == "postgresql":
+        plan = json.loads(await queryset.order_by().aexplain(format="json"))
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        if estimate >= threshold:
+            return estimate
+    return await aexact_count(queryset)
+
+
+def acached_count(name, scopes, counter=aexact_count, state=()):
+    """
+    Асинхронный вариант cached_count(): ключи кэша те же, поэтому
+    синхронные и асинхронные представления делят закэшированные
+    количества.
+    """
+    async def count(queryset):
+        key = _count_key(
+            name, await aget_scope_versions(scopes), state
+        )
+        result = await cache.aget(key)
+        if result is None:
+            result = await counter(queryset)
+            await cache.aset(key, result, COUNT_CACHE_TIMEOUT)
+        return result
+    return count
 
 
-def get_paginated_page(request, queryset, per_page=POSTS_LIMIT):
+class CursorPage:
+    """
+    Страница курсорной (keyset) пагинации.
+
+    Повторяет интерфейс django.core.paginator.Page, который используется
+    в шаблонах, но не знает общего числа объектов и номера страницы:
+    переходы выполняются по токенам ?after= и ?before=.
+    """
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f"<CursorPage of {len(self.object_list)} objects>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def encode_cursor(obj, field="pub_date"):
+    """
+    Кодирует позицию объекта в ленте в URL-безопасный токен.
+
+    Args:
+        obj: Объект модели или словарь из values()
+        field: Поле даты, по которому упорядочена лента
+
+    Returns:
+        str: Токен вида base64("<дата в ISO>|<pk>")
+    """
+    if isinstance(obj, dict):
+        value, pk = obj[field], obj.get("pk", obj.get("id"))
+    else:
+        value, pk = getattr(obj, field), obj.pk
+    raw = f"{value.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """
+    Разбирает токен, созданный encode_cursor().
+
+    Args:
+        token: Строка токена из параметра запроса
+
+    Returns:
+        tuple | None: Пара (дата, pk) или None для некорректного токена
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        value, pk = raw.decode().split("|")
+        return datetime.fromisoformat(value), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def get_cursor_page(request, queryset, per_page=POSTS_LIMIT,
+                    field="pub_date", descending=True):
+    """
+    Создает страницу курсорной пагинации по ключу (field, pk).
+
+    В отличие от Paginator не выполняет COUNT(*) и OFFSET: следующая
+    страница выбирается условием по ключу последнего показанного объекта,
+    поэтому стоимость запроса не зависит от глубины страницы.
+    По умолчанию лента упорядочивается от новых записей к старым.
+
+    Args:
+        request: HTTP запрос с параметром after или before
+        queryset: QuerySet для пагинации
+        per_page: Количество объектов на странице
+        field: Поле даты, по которому упорядочена лента
+        descending: Порядок от новых к старым (False — от старых к новым)
+
+    Returns:
+        CursorPage: Страница с токенами соседних страниц
+    """
+    queryset, after, before = _cursor_queryset(
+        request, queryset, per_page, field, descending
+    )
+    return _cursor_page(list(queryset), per_page, after, before, field)
+
+
+async def aget_cursor_page(request, queryset, per_page=POSTS_LIMIT,
+                           field="pub_date", descending=True):
+    """Асинхронный вариант get_cursor_page()."""
+    queryset, after, before = _cursor_queryset(
+        request, queryset, per_page, field, descending
+    )
+    object_list = [obj async for obj in queryset]
+    return _cursor_page(object_list, per_page, after, before, field)
+
+
+def _cursor_queryset(request, queryset, per_page, field, descending=True):
+    """
+    Возвращает выборку страницы курсорной пагинации и разобранные курсоры.
+
+    Returns:
+        tuple: (QuerySet, курсор after, курсор before)
+    """
+    after = decode_cursor(request.GET.get("after", ""))
+    before = None if after else decode_cursor(request.GET.get("before", ""))
+    # Сравнение и направление сортировки для перехода вперёд (after).
+    forward, order = ("lt", "-") if descending else ("gt", "")
+    backward, reverse_order = ("gt", "") if descending else ("lt", "-")
+
+    if before:
+        value, pk = before
+        queryset = queryset.filter(
+            Q(**{f"{field}__{backward}": value})
+            | Q(**{field: value, f"pk__{backward}": pk})
+        ).order_by(f"{reverse_order}{field}", f"{reverse_order}pk")
+    else:
+        if after:
+            value, pk = after
+            queryset = queryset.filter(
+                Q(**{f"{field}__{forward}": value})
+                | Q(**{field: value, f"pk__{forward}": pk})
+            )
+        queryset = queryset.order_by(f"{order}{field}", f"{order}pk")
+
+    # Лишний объект показывает, есть ли записи за границей страницы.
+    return queryset[:per_page + 1], after, before
+
+
+def _cursor_page(object_list, per_page, after, before, field):
+    has_more = len(object_list) > per_page
+    object_list = object_list[:per_page]
+    if before:
+        object_list.reverse()
+
+    if not object_list:
+        return CursorPage(object_list)
+
+    has_next = has_more if not before else True
+    has_previous = has_more if before else after is not None
+    return CursorPage(
+        object_list,
+        next_cursor=(
+            encode_cursor(object_list[-1], field) if has_next else None
+        ),
+        previous_cursor=(
+            encode_cursor(object_list[0], field) if has_previous else None
+        ),
+    )
+
+
+def get_query_prefix(request):
+    """
+    Возвращает параметры запроса, которые сохраняются в ссылках пагинации.
+
+    Args:
+        request: HTTP запрос
+
+    Returns:
+        str: Параметры без page, after и before, с завершающим "&"
+            (пустая строка, если параметров нет)
+    """
+    params = request.GET.copy()
+    for name in ("page", "after", "before"):
+        params.pop(name, None)
+    return f"{params.urlencode()}&" if params else ""
+
+
+def get_paginated_page(request, queryset, per_page=POSTS_LIMIT,
+                       cursor_field=None, count=None):
     """
     Создает пагинированную страницу для переданного QuerySet.
-    
+
+    Если передан cursor_field и запрос содержит параметр after или before,
+    используется курсорная пагинация (см. get_cursor_page), иначе —
+    обычная постраничная по параметру page. У постраничной страницы
+    есть атрибут page_window — номера соседних и крайних страниц
+    с пропусками (Paginator.ELLIPSIS), а не весь page_range. Атрибут
+    query_prefix обеих страниц хранит остальные параметры запроса
+    (например, поисковую фразу) для ссылок на соседние страницы.
+
     Args:
         request: HTTP запрос, содержащий параметр page
         queryset: QuerySet для пагинации
         per_page: Количество объектов на странице (по умолчанию POSTS_LIMIT)
-        
+        cursor_field: Поле даты для курсорной пагинации (None — отключена)
+        count: Стратегия подсчёта объектов (None — точный COUNT(*))
+
+    Returns:
+        Page | CursorPage: Объект страницы с пагинированными данными
+    """
+    if cursor_field and (
+        "after" in request.GET or "before" in request.GET
+    ):
+        page = get_cursor_page(request, queryset, per_page, cursor_field)
+        page.query_prefix = get_query_prefix(request)
+        return page
+    paginator = CountStrategyPaginator(
+        queryset, per_page, count_strategy=count
+    )
+    return _numbered_page(request, paginator)
+
+
+async def aget_paginated_page(request, queryset, per_page=POSTS_LIMIT,
+                              cursor_field=None, count=aexact_count,
+                              prefetched=None):
+    """
+    Асинхронный вариант get_paginated_page().
+
+    Стратегия подсчёта count — корутина (aexact_count, aplanner_count,
+    acached_count); объекты страницы загружаются асинхронной итерацией.
+    prefetched — объекты запрошенной страницы, загруженные заранее
+    (см. get_requested_page_slice); они используются, если номер
+    страницы в запросе оказался допустимым.
+    """
+    if cursor_field and (
+        "after" in request.GET or "before" in request.GET
+    ):
+        page = await aget_cursor_page(
+            request, queryset, per_page, cursor_field
+        )
+        page.query_prefix = get_query_prefix(request)
+        return page
+    total = await count(queryset)
+    paginator = CountStrategyPaginator(
+        queryset, per_page, count_strategy=lambda queryset: total
+    )
+    page = _numbered_page(request, paginator)
+    if prefetched is not None and page.number == _requested_page(request):
+        page.object_list = prefetched
+    else:
+        page.object_list = [obj async for obj in page.object_list]
+    return page
+
+
+def _requested_page(request):
+    number = request.GET.get("page", "1")
+    return int(number) if number.isdigit() and int(number) > 0 else 1
+
+
+def get_requested_page_slice(request, queryset, per_page=POSTS_LIMIT):
+    """
+    Возвращает объекты страницы из параметра page без подсчёта объектов.
+
+    Позволяет загружать страницу одновременно с данными, от которых
+    зависит количество объектов (см. aget_paginated_page).
+
+    Args:
+        request: HTTP запрос, содержащий параметр page
+        queryset: QuerySet для пагинации
+        per_page: Количество объектов на странице
+
+    Returns:
+        QuerySet: Срез выборки
+    """
+    bottom = (_requested_page(request) - 1) * per_page
+    return queryset[bottom:bottom + per_page]
+
+
+def _numbered_page(request, paginator):
+    page = paginator.get_page(request.GET.get("page"))
+    page.page_window = list(
+        paginator.get_elided_page_range(
+            page.number,
+            on_each_side=PAGE_WINDOW_ON_EACH_SIDE,
+            on_ends=PAGE_WINDOW_ON_ENDS,
+        )
+    )
+    page.query_prefix = get_query_prefix(request)
+    return page
+
+
+def _visible_posts(user):
+    last_comment = (
+        Comment.objects.filter(post=OuterRef("pk"))
+        .order_by("-created_at")
+        .values("created_at")[:1]
+    )
+    return (
+        Post.objects.visible_to(user)
+        .select_related("author", "category", "location")
+        .annotate(last_comment_at=Subquery(last_comment))
+    )
+
+
+def get_visible_post(request, post_id):
+    """
+    Возвращает пост, доступный текущему пользователю, одним запросом.
+
+    Проверка доступа (см. PostQuerySet.visible_to), загрузка автора,
+    категории и местоположения и время последнего комментария
+    (Post.last_comment_at, для валидаторов условного GET) выполняются
+    в одном SELECT. Результат
+    запоминается в запросе, чтобы валидаторы условного GET
+    и представление не читали пост дважды.
+
+    Args:
+        request: HTTP запрос
+        post_id: ID поста
+
+    Returns:
+        Post: Пост со связанными объектами
+
+    Raises:
+        Http404: Если пост не существует или недоступен пользователю
+    """
+    post = getattr(request, "_blog_visible_post", None)
+    if post is None or post.pk != post_id:
+        post = get_object_or_404(_visible_posts(request.user), pk=post_id)
+        request._blog_visible_post = post
+    return post
+
+
+async def aget_visible_post(request, post_id):
+    """Асинхронный вариант get_visible_post()."""
+    post = getattr(request, "_blog_visible_post", None)
+    if post is None or post.pk != post_id:
+        post = await aget_object_or_404(
+            _visible_posts(request.user), pk=post_id
+        )
+        request._blog_visible_post = post
+    return post
+
+
+def publish_due_posts():
+    """
+    Выводит в ленты отложенные посты, время публикации которых наступило.
+
+    Устанавливает флаг Post.is_visible и сбрасывает страницы лент,
+    в которых появились посты.
+
+    Returns:
+        int: Количество опубликованных постов
+    """
+    post_ids = list(
+        Post.objects.due_for_publication().values_list("pk", flat=True)
+    )
+    if not post_ids:
+        return 0
+    posts = Post.objects.filter(pk__in=post_ids)
+    posts.update(is_visible=True)
+    bump_scopes(*post_scopes(posts))
+    return len(post_ids)
+
+
+def seconds_until_next_publication():
+    """
+    Возвращает время до ближайшей отложенной публикации.
+
     Returns:
-        Page: Объект страницы с пагинированными данными
+        float | None: Время в секундах или None, если отложенных
+            публикаций нет
     """
-    paginator = Paginator(queryset, per_page)
-    return paginator.get_page(request.GET.get("page"))
+    next_pub_date = Post.objects.scheduled().aggregate(
+        next_pub_date=Min("pub_date")
+    )["next_pub_date"]
+    if next_pub_date is None:
+        return None
+    return max((next_pub_date - timezone.now()).total_seconds(), 0)
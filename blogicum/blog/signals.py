@@ -0,0 +1,267 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import (
+    FEED_SCOPE,
+    author_scope,
+    bump_scopes,
+    category_scope,
+    drop_post_cards,
+    post_scopes,
+)
+from .excerpts import summarize
+from .images import delete_renditions, read_image_meta, schedule_renditions
+from .models import Category, Comment, Location, Post, SearchDocument
+from .rendering import render_instance
+from .search import get_search_backend, stem_text
+
+User = get_user_model()
+
+
+def touch_post(post_id, comment_delta=0):
+    """
+    Отмечает изменение поста или его комментариев.
+
+    Обновляет Post.updated_at (версию карточки и валидатор условных
+    запросов) и атомарно, выражением F(), изменяет хранимое количество
+    комментариев, чтобы параллельные запросы не перезаписывали
+    изменения друг друга.
+
+    Args:
+        post_id: ID поста
+        comment_delta: Изменение количества комментариев (+1, -1 или 0)
+    """
+    posts = Post.objects.filter(pk=post_id)
+    drop_post_cards(posts)
+    posts.update(
+        comment_count=F("comment_count") + comment_delta,
+        updated_at=timezone.now(),
+    )
+    if comment_delta:
+        bump_scopes(*post_scopes(posts))
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_post(sender, instance, **kwargs):
+    """Запоминает исходный пост комментария перед его изменением."""
+    instance._previous_post_id = None
+    if instance.pk and not instance._state.adding:
+        instance._previous_post_id = (
+            Comment.objects.filter(pk=instance.pk)
+            .values_list("post_id", flat=True)
+            .first()
+        )
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Comment)
+def render_text_html(sender, instance, **kwargs):
+    """Сохраняет HTML текста поста или комментария (см. rendering.py)."""
+    render_instance(instance)
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, **kwargs):
+    """Учитывает новый, изменённый или перенесённый комментарий."""
+    previous_post_id = getattr(instance, "_previous_post_id", None)
+    if created:
+        touch_post(instance.post_id, 1)
+    elif previous_post_id and previous_post_id != instance.post_id:
+        touch_post(previous_post_id, -1)
+        touch_post(instance.post_id, 1)
+    else:
+        touch_post(instance.post_id)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    """Учитывает удаление комментария, в том числе массовое из админки."""
+    touch_post(instance.post_id, -1)
+
+
+@receiver(pre_save, sender=Post)
+def materialize_post_visibility(sender, instance, **kwargs):
+    """Вычисляет флаг Post.is_visible перед сохранением поста."""
+    instance.is_visible = instance.compute_visibility()
+
+
+@receiver(pre_save, sender=Post)
+def summarize_post_text(sender, instance, **kwargs):
+    """Сохраняет превью, количество слов и время чтения текста поста."""
+    for name, value in summarize(instance.text).items():
+        setattr(instance, name, value)
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_delete, sender=Post)
+def drop_post_caches(sender, instance, **kwargs):
+    """
+    Удаляет карточку поста в версии, которая была до изменения,
+    и сбрасывает страницы, где пост выводился до изменения.
+    """
+    if instance.pk:
+        posts = Post.objects.filter(pk=instance.pk)
+        drop_post_cards(posts)
+        bump_scopes(*post_scopes(posts))
+
+
+@receiver(post_save, sender=Post)
+def drop_saved_post_pages(sender, instance, **kwargs):
+    """Сбрасывает страницы, где пост выводится после сохранения."""
+    bump_scopes(*post_scopes(Post.objects.filter(pk=instance.pk)))
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_image(sender, instance, **kwargs):
+    """
+    Запоминает исходное изображение поста и его миниатюры, а для
+    нового изображения сохраняет его размеры (см. read_image_meta).
+    """
+    instance._previous_image = None
+    if instance.pk and not instance._state.adding:
+        instance._previous_image = (
+            Post.objects.filter(pk=instance.pk)
+            .values_list("image", "image_renditions")
+            .first()
+        )
+    previous_name = (instance._previous_image or ("",))[0] or ""
+    if instance._state.adding or (instance.image.name or "") != previous_name:
+        instance.image_meta = read_image_meta(instance.image)
+
+
+@receiver(post_save, sender=Post)
+def render_post_image(sender, instance, created, **kwargs):
+    """
+    Запускает построение миниатюр нового изображения поста после
+    фиксации транзакции и удаляет миниатюры снятого изображения.
+    """
+    previous_name, previous_renditions = (
+        getattr(instance, "_previous_image", None) or ("", {})
+    )
+    if not created and (instance.image.name or "") == (previous_name or ""):
+        return
+    if previous_renditions:
+        Post.objects.filter(pk=instance.pk).update(image_renditions={})
+        instance.image_renditions = {}
+        storage = instance.image.storage
+        transaction.on_commit(
+            lambda: delete_renditions(storage, previous_renditions)
+        )
+    if instance.image:
+        post_id = instance.pk
+        transaction.on_commit(lambda: schedule_renditions(post_id))
+
+
+@receiver(post_save, sender=Post)
+def index_saved_post(sender, instance, **kwargs):
+    """Сохраняет основы слов поста и обновляет его в поисковом индексе."""
+    document, _ = SearchDocument.objects.update_or_create(
+        post_id=instance.pk,
+        defaults={
+            "title": stem_text(instance.title),
+            "text": stem_text(instance.text),
+        },
+    )
+    get_search_backend().index_post(document)
+
+
+@receiver(pre_delete, sender=Post)
+def unindex_deleted_post(sender, instance, **kwargs):
+    """Удаляет пост и его комментарии из поискового индекса."""
+    get_search_backend().remove_posts([instance.pk])
+
+
+@receiver(post_save, sender=Comment)
+def index_saved_comment(sender, instance, **kwargs):
+    """Обновляет комментарий в поисковом индексе."""
+    get_search_backend().index_comment(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def unindex_deleted_comment(sender, instance, **kwargs):
+    """Удаляет комментарий из поискового индекса."""
+    get_search_backend().remove_comments([instance.pk])
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_slug(sender, instance, **kwargs):
+    """Запоминает исходный slug категории перед её изменением."""
+    instance._previous_slug = None
+    if instance.pk and not instance._state.adding:
+        instance._previous_slug = (
+            Category.objects.filter(pk=instance.pk)
+            .values_list("slug", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Category)
+def refresh_category_visibility(sender, instance, **kwargs):
+    """Пересчитывает видимость постов после изменения категории."""
+    instance.posts.refresh_visibility()
+
+
+@receiver(pre_delete, sender=Category)
+def hide_category_posts(sender, instance, **kwargs):
+    """Убирает из лент посты удаляемой категории."""
+    instance.posts.update(is_visible=False)
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def drop_category_caches(sender, instance, **kwargs):
+    """
+    Сбрасывает карточки и страницы постов изменённой категории.
+
+    Карточка выводит название и slug категории, а снятая с публикации
+    категория убирает свои посты из всех лент.
+    """
+    drop_post_cards(instance.posts.all())
+    instance.posts.update(updated_at=timezone.now())
+    bump_scopes(
+        category_scope(instance.slug),
+        *post_scopes(instance.posts.all()),
+    )
+    previous_slug = getattr(instance, "_previous_slug", None)
+    if previous_slug:
+        bump_scopes(category_scope(previous_slug))
+
+
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+def drop_location_caches(sender, instance, **kwargs):
+    """Отмечает изменение постов изменённого местоположения."""
+    drop_post_cards(instance.posts.all())
+    instance.posts.update(updated_at=timezone.now())
+
+
+@receiver(pre_save, sender=User)
+def drop_author_pages(sender, instance, **kwargs):
+    """Сбрасывает профиль пользователя, в том числе по прежнему имени."""
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    if instance.pk:
+        previous_username = (
+            User.objects.filter(pk=instance.pk)
+            .values_list("username", flat=True)
+            .first()
+        )
+        if previous_username:
+            bump_scopes(author_scope(previous_username))
+    bump_scopes(author_scope(instance.username))
+
+
+@receiver(pre_delete, sender=User)
+def drop_deleted_author_pages(sender, instance, **kwargs):
+    """Сбрасывает профиль и ленты удаляемого пользователя."""
+    bump_scopes(FEED_SCOPE, author_scope(instance.username))
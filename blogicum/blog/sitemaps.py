@@ -0,0 +1,358 @@
+"""
+Карта сайта: посты, категории и профили авторов.
+
+Адреса разделов делятся на файлы по диапазонам ID (не больше
+SITEMAP_SHARD_SIZE адресов в файле) и перечисляются в индексе
+sitemap.xml. Файлы записываются потоково из values_list().iterator()
+в каталог BLOG_SITEMAP_ROOT. Манифест хранит подпись каждого файла —
+количество адресов и время последнего изменения, полученные одним
+агрегирующим запросом, — поэтому при обновлении перезаписываются
+только файлы, подпись которых изменилась.
+
+Адреса строятся от настройки BLOG_SITEMAP_BASE_URL, а не от заголовка
+Host запроса: иначе запрос через другой разрешённый домен
+перезаписывал бы все файлы прямо во время ответа роботу.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Count, Max, Min, OuterRef, Subquery
+from django.http import FileResponse, Http404
+from django.urls import reverse
+from django.views.decorators.http import require_safe
+
+from .constants import (
+    SITEMAP_CHECK_INTERVAL,
+    SITEMAP_CHUNK_SIZE,
+    SITEMAP_SHARD_SIZE,
+)
+from .models import Category, Post
+
+INDEX_NAME = "sitemap.xml"
+MANIFEST_NAME = "manifest.json"
+CHECKED_KEY = "blog:sitemap:checked"
+XMLNS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+
+def _isoformat(value):
+    if not value or isinstance(value, str):
+        return value or None
+    return value.isoformat()
+
+
+def _shard_range(shard, field="pk"):
+    return {
+        f"{field}__gt": shard * SITEMAP_SHARD_SIZE,
+        f"{field}__lte": (shard + 1) * SITEMAP_SHARD_SIZE,
+    }
+
+
+def _shards_of(queryset, field):
+    bounds = queryset.aggregate(first=Min(field), last=Max(field))
+    if bounds["first"] is None:
+        return range(0)
+    return range(
+        (bounds["first"] - 1) // SITEMAP_SHARD_SIZE,
+        (bounds["last"] - 1) // SITEMAP_SHARD_SIZE + 1,
+    )
+
+
+class SitemapSection:
+    """
+    Раздел карты сайта.
+
+    Подкласс перечисляет номера файлов раздела (shards), вычисляет
+    подпись файла (signature) и выдаёт его адреса (rows).
+    """
+    name = None
+
+    def shards(self):
+        raise NotImplementedError
+
+    def signature(self, shard):
+        """
+        Returns:
+            list: Значения, изменение которых означает, что файл устарел;
+                первое — количество адресов
+        """
+        raise NotImplementedError
+
+    def rows(self, shard):
+        """
+        Yields:
+            tuple: Пары (путь страницы, время последнего изменения)
+        """
+        raise NotImplementedError
+
+
+class PostSitemap(SitemapSection):
+    """Опубликованные посты; lastmod — Post.updated_at."""
+    name = "posts"
+
+    def posts(self):
+        return Post.objects.filter_posts_by_publication()
+
+    def shards(self):
+        return _shards_of(self.posts(), "pk")
+
+    def signature(self, shard):
+        # Post.updated_at обновляется и при изменении комментариев.
+        stats = self.posts().filter(**_shard_range(shard)).aggregate(
+            count=Count("pk"), lastmod=Max("updated_at")
+        )
+        return [stats["count"], _isoformat(stats["lastmod"])]
+
+    def rows(self, shard):
+        posts = (
+            self.posts()
+            .filter(**_shard_range(shard))
+            .order_by("pk")
+            .values_list("pk", "updated_at")
+        )
+        for pk, updated_at in posts.iterator(chunk_size=SITEMAP_CHUNK_SIZE):
+            yield reverse("blog:post_detail", args=(pk,)), updated_at
+
+
+class AuthorSitemap(PostSitemap):
+    """Профили авторов опубликованных постов."""
+    name = "authors"
+
+    def shards(self):
+        return _shards_of(self.posts(), "author_id")
+
+    def signature(self, shard):
+        stats = (
+            self.posts()
+            .filter(**_shard_range(shard, "author_id"))
+            .aggregate(
+                count=Count("author_id", distinct=True),
+                posts=Count("pk"),
+                lastmod=Max("updated_at"),
+            )
+        )
+        return [stats["count"], stats["posts"], _isoformat(stats["lastmod"])]
+
+    def rows(self, shard):
+        authors = (
+            self.posts()
+            .filter(**_shard_range(shard, "author_id"))
+            .values("author_id", "author__username")
+            .annotate(lastmod=Max("updated_at"))
+            .order_by("author_id")
+            .values_list("author__username", "lastmod")
+        )
+        for username, lastmod in authors.iterator(
+            chunk_size=SITEMAP_CHUNK_SIZE
+        ):
+            yield reverse("blog:profile", args=(username,)), lastmod
+
+
+class CategorySitemap(SitemapSection):
+    """Опубликованные категории одним файлом."""
+    name = "categories"
+
+    def categories(self):
+        last_post = (
+            Post.objects.filter_posts_by_publication()
+            .filter(category=OuterRef("pk"))
+            .order_by("-updated_at")
+            .values("updated_at")[:1]
+        )
+        return (
+            Category.objects.filter(is_published=True)
+            .annotate(lastmod=Subquery(last_post))
+            .order_by("pk")
+            .values_list("slug", "lastmod")
+        )
+
+    def shards(self):
+        return range(1)
+
+    def signature(self, shard):
+        # Категорий немного: подпись строится по всем строкам раздела.
+        rows = list(self.categories())
+        digest = hashlib.md5(
+            repr([(slug, _isoformat(lastmod)) for slug, lastmod in rows])
+            .encode()
+        ).hexdigest()
+        return [len(rows), digest]
+
+    def rows(self, shard):
+        for slug, lastmod in self.categories().iterator(
+            chunk_size=SITEMAP_CHUNK_SIZE
+        ):
+            yield reverse("blog:category_posts", args=(slug,)), lastmod
+
+
+SECTIONS = (PostSitemap(), CategorySitemap(), AuthorSitemap())
+
+
+def sitemap_root():
+    """Каталог файлов карты сайта (настройка BLOG_SITEMAP_ROOT)."""
+    return Path(settings.BLOG_SITEMAP_ROOT)
+
+
+def sitemap_base_url():
+    """
+    Схема и домен сайта без завершающего "/" (настройка
+    BLOG_SITEMAP_BASE_URL).
+
+    Raises:
+        ImproperlyConfigured: Если настройка не задана
+    """
+    base_url = getattr(settings, "BLOG_SITEMAP_BASE_URL", None)
+    if not base_url:
+        raise ImproperlyConfigured(
+            "Укажите настройку BLOG_SITEMAP_BASE_URL, например "
+            "https://example.com."
+        )
+    return base_url.rstrip("/")
+
+
+def _write_atomic(path, chunks):
+    """Записывает файл из частей и атомарно заменяет им прежний."""
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=path.parent, delete=False,
+        prefix=f".{path.name}.",
+    ) as file:
+        for chunk in chunks:
+            file.write(chunk)
+    os.replace(file.name, path)
+
+
+def _url_entries(base_url, tag, rows):
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<{tag} xmlns="{XMLNS}">\n'
+    )
+    item = "url" if tag == "urlset" else "sitemap"
+    for page, lastmod in rows:
+        entry = f"<{item}><loc>{escape(base_url + page)}</loc>"
+        if lastmod:
+            entry += f"<lastmod>{_isoformat(lastmod)}</lastmod>"
+        yield entry + f"</{item}>\n"
+    yield f"</{tag}>\n"
+
+
+def _write_shard(path, base_url, rows):
+    """
+    Записывает файл раздела карты сайта.
+
+    Returns:
+        datetime | None: Наибольшее время изменения страниц файла
+    """
+    lastmod = None
+
+    def tracked_rows():
+        nonlocal lastmod
+        for page, modified in rows:
+            if modified and (lastmod is None or modified > lastmod):
+                lastmod = modified
+            yield page, modified
+
+    _write_atomic(path, _url_entries(base_url, "urlset", tracked_rows()))
+    return lastmod
+
+
+def _load_manifest(root):
+    try:
+        return json.loads((root / MANIFEST_NAME).read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def refresh_sitemaps(base_url, force=False):
+    """
+    Перезаписывает устаревшие файлы карты сайта и индекс.
+
+    Args:
+        base_url: Схема и домен сайта без завершающего "/"
+        force: Перезаписать все файлы независимо от подписи
+
+    Returns:
+        list: Имена перезаписанных файлов
+    """
+    root = sitemap_root()
+    root.mkdir(parents=True, exist_ok=True)
+    manifest = _load_manifest(root)
+    previous = manifest.get("shards", {})
+    if manifest.get("base_url") != base_url:
+        force = True
+
+    shards = {}
+    rebuilt = []
+    for section in SECTIONS:
+        for shard in section.shards():
+            name = f"{section.name}-{shard}"
+            signature = section.signature(shard)
+            if not signature[0]:
+                continue
+            entry = previous.get(name)
+            if (
+                not force
+                and entry
+                and entry["signature"] == signature
+                and (root / f"{name}.xml").exists()
+            ):
+                shards[name] = entry
+                continue
+            lastmod = _write_shard(
+                root / f"{name}.xml", base_url, section.rows(shard)
+            )
+            shards[name] = {
+                "signature": signature,
+                "lastmod": _isoformat(lastmod),
+            }
+            rebuilt.append(name)
+
+    _write_atomic(root / INDEX_NAME, _url_entries(
+        base_url,
+        "sitemapindex",
+        (
+            (reverse("blog:sitemap_shard", args=(name,)), entry["lastmod"])
+            for name, entry in shards.items()
+        ),
+    ))
+    _write_atomic(
+        root / MANIFEST_NAME,
+        [json.dumps({"base_url": base_url, "shards": shards})],
+    )
+    for name in previous.keys() - shards.keys():
+        (root / f"{name}.xml").unlink(missing_ok=True)
+    return rebuilt
+
+
+def _ensure_fresh():
+    """Обновляет карту сайта не чаще раза в SITEMAP_CHECK_INTERVAL секунд."""
+    if (
+        not (sitemap_root() / INDEX_NAME).exists()
+        or cache.add(CHECKED_KEY, True, SITEMAP_CHECK_INTERVAL)
+    ):
+        refresh_sitemaps(sitemap_base_url())
+
+
+def _file_response(path):
+    try:
+        return FileResponse(path.open("rb"), content_type="application/xml")
+    except FileNotFoundError:
+        raise Http404
+
+
+@require_safe
+def sitemap_index(request):
+    """Индекс карты сайта со ссылками на файлы разделов."""
+    _ensure_fresh()
+    return _file_response(sitemap_root() / INDEX_NAME)
+
+
+@require_safe
+def sitemap_shard(request, name):
+    """Файл раздела карты сайта."""
+    return _file_response(sitemap_root() / f"{name}.xml")
@@ -0,0 +1,17 @@
+from django import template
+
+from blog.constants import POST_CARD_CACHE_TIMEOUT
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card_cache_timeout():
+    """
+    Возвращает время жизни закэшированной карточки поста для тега
+    {% cache %} шаблона includes/post_card.html.
+
+    Returns:
+        int: Время жизни в секундах
+    """
+    return POST_CARD_CACHE_TIMEOUT
@@ -0,0 +1,37 @@
+from django import template
+
+from blog.images import RENDITION_FORMATS, rendition_srcset, rendition_url
+
+register = template.Library()
+
+
+@register.inclusion_tag("includes/post_image.html")
+def post_image(post, rendition, css_class="", sizes="100vw"):
+    """
+    Выводит изображение поста элементом <picture> с миниатюрами.
+
+    Браузер выбирает WebP или JPEG и подходящий размер по srcset;
+    пока миниатюры не построены, выводится исходное изображение
+    с размерами из Post.image_meta.
+
+    Args:
+        post: Пост с изображением
+        rendition: Имя миниатюры для атрибута src
+        css_class: CSS-классы элемента <img>
+        sizes: Значение атрибута sizes
+
+    Returns:
+        dict: Контекст шаблона includes/post_image.html
+    """
+    current = post.image_renditions.get(rendition) or post.image_meta
+    return {
+        "post": post,
+        "src": rendition_url(post, rendition),
+        "srcset": rendition_srcset(post),
+        "webp_srcset": rendition_srcset(post, "webp"),
+        "webp_type": RENDITION_FORMATS["webp"][1],
+        "width": current.get("width"),
+        "height": current.get("height"),
+        "css_class": css_class,
+        "sizes": sizes,
+    }
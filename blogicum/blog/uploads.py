@@ -0,0 +1,139 @@
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
+
+from .constants import (
+    IMAGE_HEADER_SIZE,
+    IMAGE_MAX_PIXELS,
+    IMAGE_MAX_UPLOAD_SIZE,
+    IMAGE_UPLOAD_FIELDS,
+    IMAGE_UPLOAD_FORMATS,
+)
+
+
+def max_upload_size():
+    return getattr(
+        settings, "BLOG_IMAGE_MAX_UPLOAD_SIZE", IMAGE_MAX_UPLOAD_SIZE
+    )
+
+
+def max_pixels():
+    return getattr(settings, "BLOG_IMAGE_MAX_PIXELS", IMAGE_MAX_PIXELS)
+
+
+class RejectedUpload(UploadedFile):
+    """
+    Загруженный файл, отклонённый BoundedImageUploadHandler.
+
+    Содержимое файла не сохраняется; форма выводит сообщение error
+    как ошибку поля (см. forms.BoundedImageField).
+    """
+
+    def __init__(self, name, content_type, error):
+        super().__init__(BytesIO(), name, content_type, 0)
+        self.error = error
+
+
+def inspect_image_header(header, complete=False):
+    """
+    Проверяет изображение по началу файла, не декодируя пиксели.
+
+    Pillow при открытии читает только заголовок: формат и размер.
+    Этого достаточно, чтобы отклонить неподдерживаемый формат
+    и «бомбу распаковки» — маленький файл с огромным числом пикселей.
+
+    Args:
+        header: Прочитанные первые байты файла
+        complete: True, если прочитан весь файл
+
+    Returns:
+        tuple: (ошибка или None, True если проверка завершена);
+            (None, False) означает, что для разбора нужно больше данных
+    """
+    try:
+        with Image.open(BytesIO(header)) as image:
+            image_format, (width, height) = image.format, image.size
+    except Image.DecompressionBombError:
+        return "Изображение слишком большое.", True
+    except (OSError, SyntaxError, ValueError, EOFError):
+        if complete or len(header) >= IMAGE_HEADER_SIZE:
+            return (
+                "Загрузите правильное изображение. Файл, который вы "
+                "загрузили, поврежден или не является изображением.",
+                True,
+            )
+        return None, False
+    if image_format not in IMAGE_UPLOAD_FORMATS:
+        return (
+            f"Формат {image_format} не поддерживается. Загрузите "
+            f"изображение {', '.join(IMAGE_UPLOAD_FORMATS)}.",
+            True,
+        )
+    if width * height > max_pixels():
+        return (
+            f"Изображение {width}×{height} слишком большое: допускается "
+            f"не более {max_pixels()} пикселей.",
+            True,
+        )
+    return None, True
+
+
+class BoundedImageUploadHandler(FileUploadHandler):
+    """
+    Потоково проверяет загружаемые изображения постов.
+
+    Стоит первым в FILE_UPLOAD_HANDLERS и передаёт данные следующим
+    обработчикам (в память или во временный файл) по частям. Заголовок
+    изображения проверяется по первым частям файла, до чтения
+    остального, а размер — по мере поступления данных. После
+    отклонения файла данные дальше не передаются и не накапливаются,
+    а вместо файла форма получает RejectedUpload с текстом ошибки.
+    Поэтому память процесса не зависит от размера загрузки.
+    """
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.active = field_name in getattr(
+            settings, "BLOG_IMAGE_UPLOAD_FIELDS", IMAGE_UPLOAD_FIELDS
+        )
+        self.header = bytearray()
+        self.received = 0
+        self.checked = False
+        self.error = None
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.active:
+            return raw_data
+        if self.error:
+            return None
+        self.received += len(raw_data)
+        if self.received > max_upload_size():
+            self.error = (
+                "Размер файла превышает "
+                f"{filesizeformat(max_upload_size())}."
+            )
+        elif not self.checked:
+            self.header += raw_data
+            self.error, self.checked = inspect_image_header(
+                bytes(self.header)
+            )
+            if self.checked:
+                self.header = bytearray()
+        return None if self.error else raw_data
+
+    def file_complete(self, file_size):
+        if not self.active:
+            return None
+        if not self.error and not self.checked:
+            self.error, self.checked = inspect_image_header(
+                bytes(self.header), complete=True
+            )
+        if self.error:
+            return RejectedUpload(
+                self.file_name, self.content_type, self.error
+            )
+        return None
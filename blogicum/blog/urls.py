@@ -1,22 +1,33 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import api, async_views, feeds, sitemaps, views
 
 app_name = "blog"
 
+# Под ASGI страницы чтения обслуживаются асинхронными представлениями.
+read_views = (
+    async_views if getattr(settings, "BLOG_ASYNC_VIEWS", False) else views
+)
+
 
 urlpatterns = [
     # Главная и категории
     path(
         "",
-        views.index,
+        read_views.index,
         name="index"
     ),
     path(
         "category/<slug:category_slug>/",
-        views.category_posts,
+        read_views.category_posts,
         name="category_posts",
     ),
+    path(
+        "search/",
+        views.search,
+        name="search"
+    ),
 
     # Посты
     path(
@@ -26,7 +37,7 @@ urlpatterns = [
     ),
     path(
         "posts/<int:post_id>/",
-        views.post_detail,
+        read_views.post_detail,
         name="post_detail"
     ),
     path(
@@ -65,7 +76,78 @@ urlpatterns = [
     ),
     path(
         "profile/<str:username>/",
-        views.profile,
+        read_views.profile,
         name="profile"
     ),
+
+    # Ленты RSS и Atom
+    path(
+        "feed/rss/",
+        feeds.posts_rss,
+        name="posts_rss"
+    ),
+    path(
+        "feed/atom/",
+        feeds.posts_atom,
+        name="posts_atom"
+    ),
+    path(
+        "category/<slug:category_slug>/feed/rss/",
+        feeds.category_posts_rss,
+        name="category_posts_rss",
+    ),
+    path(
+        "category/<slug:category_slug>/feed/atom/",
+        feeds.category_posts_atom,
+        name="category_posts_atom",
+    ),
+    path(
+        "profile/<str:username>/feed/rss/",
+        feeds.author_posts_rss,
+        name="author_posts_rss",
+    ),
+    path(
+        "profile/<str:username>/feed/atom/",
+        feeds.author_posts_atom,
+        name="author_posts_atom",
+    ),
+
+    # Карта сайта
+    path(
+        "sitemap.xml",
+        sitemaps.sitemap_index,
+        name="sitemap"
+    ),
+    path(
+        "sitemaps/<slug:name>.xml",
+        sitemaps.sitemap_shard,
+        name="sitemap_shard"
+    ),
+
+    # JSON API
+    path(
+        "api/posts/",
+        api.post_list,
+        name="api_posts"
+    ),
+    path(
+        "api/posts/<int:post_id>/",
+        api.post_detail,
+        name="api_post_detail"
+    ),
+    path(
+        "api/posts/<int:post_id>/comments/",
+        api.post_comments,
+        name="api_post_comments"
+    ),
+    path(
+        "api/category/<slug:category_slug>/posts/",
+        api.category_post_list,
+        name="api_category_posts"
+    ),
+    path(
+        "api/profile/<str:username>/posts/",
+        api.profile_post_list,
+        name="api_profile_posts"
+    ),
 ]
@@ -1,13 +1,41 @@
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Case, When
 from django.shortcuts import get_object_or_404, redirect, render
 
-from .constants import POSTS_LIMIT
+from .cache import (
+    cache_anonymous_page,
+    category_posts_scopes,
+    feed_state,
+    index_scopes,
+    profile_scopes,
+)
+from .conditional import (
+    author_exists,
+    category_exists,
+    feed_condition,
+    post_detail_condition,
+)
+from .constants import (
+    COMMENTS_LIMIT,
+    POSTS_CURSOR_FIELD,
+    POSTS_LIMIT,
+    SEARCH_RESULTS_LIMIT,
+)
 from .forms import CommentForm, PostForm, UserEditForm
 from .models import Category, Comment, Post
-from .services import get_paginated_page
+from .search import get_search_backend
+from .services import (
+    cached_count,
+    get_paginated_page,
+    get_visible_post,
+    planner_count,
+)
 
 
+@feed_condition()
+@cache_anonymous_page(index_scopes)
 def index(request):
     """
     Отображает главную страницу блога со списком опубликованных постов.
@@ -20,12 +48,57 @@ def index(request):
     """
     post_list = (
         Post.objects.filter_posts_by_publication()
-        .annotate_comment_count()
+        .for_feed()
+    )
+    page_obj = get_paginated_page(
+        request,
+        post_list,
+        POSTS_LIMIT,
+        cursor_field=POSTS_CURSOR_FIELD,
+        count=cached_count(
+            "index",
+            index_scopes(),
+            planner_count,
+            feed_state(request),
+        ),
     )
-    page_obj = get_paginated_page(request, post_list, POSTS_LIMIT)
     return render(request, "blog/index.html", {"page_obj": page_obj})
 
 
+def search(request):
+    """
+    Отображает результаты полнотекстового поиска по постам.
+
+    Посты ищутся по заголовку, тексту и комментариям (см. search.py)
+    и выводятся по убыванию релевантности. В выдачу попадают только
+    опубликованные посты.
+
+    Args:
+        request: HTTP запрос с поисковой фразой в параметре q
+
+    Returns:
+        HttpResponse: Страница с пагинированными результатами поиска
+    """
+    query = request.GET.get("q", "").strip()
+    post_ids = (
+        get_search_backend().search_posts(query, SEARCH_RESULTS_LIMIT)
+        if query else []
+    )
+    post_list = (
+        Post.objects.filter_posts_by_publication()
+        .for_feed()
+        .filter(pk__in=post_ids)
+    )
+    if post_ids:
+        ranks = [When(pk=pk, then=rank) for rank, pk in enumerate(post_ids)]
+        post_list = post_list.order_by(Case(*ranks))
+    page_obj = get_paginated_page(request, post_list, POSTS_LIMIT)
+    return render(
+        request, "blog/search.html", {"page_obj": page_obj, "query": query}
+    )
+
+
+@post_detail_condition
 def post_detail(request, post_id):
     """
     Отображает детальную страницу поста с комментариями.
@@ -37,14 +110,14 @@ def post_detail(request, post_id):
     Returns:
         HttpResponse: Страница с детальной информацией о посте и комментариями
     """
-    post = get_object_or_404(Post, pk=post_id)
-    if request.user != post.author:
-        post = get_object_or_404(
-            Post.objects.filter_posts_by_publication(),
-            pk=post_id,
-        )
+    post = get_visible_post(request, post_id)
     form = CommentForm()
-    comments = get_paginated_page(request, post.comments.all(), per_page=10)
+    comments = get_paginated_page(
+        request,
+        post.comments.select_related("author"),
+        per_page=COMMENTS_LIMIT,
+        count=lambda comments: post.comment_count,
+    )
     return render(
         request,
         "blog/detail.html",
@@ -52,6 +125,8 @@ def post_detail(request, post_id):
     )
 
 
+@feed_condition(category_exists)
+@cache_anonymous_page(category_posts_scopes)
 def category_posts(request, category_slug):
     """
     Отображает список постов определенной категории.
@@ -70,9 +145,20 @@ def category_posts(request, category_slug):
     )
     posts_list = (
         category.posts.filter_posts_by_publication()
-        .annotate_comment_count()
+        .for_feed()
+    )
+    page_obj = get_paginated_page(
+        request,
+        posts_list,
+        POSTS_LIMIT,
+        cursor_field=POSTS_CURSOR_FIELD,
+        count=cached_count(
+            f"category:{category_slug}",
+            category_posts_scopes(category_slug),
+            planner_count,
+            feed_state(request),
+        ),
     )
-    page_obj = get_paginated_page(request, posts_list, POSTS_LIMIT)
     return render(
         request,
         "blog/category.html",
@@ -80,6 +166,8 @@ def category_posts(request, category_slug):
     )
 
 
+@feed_condition(author_exists)
+@cache_anonymous_page(profile_scopes)
 def profile(request, username):
     """
     Отображает профиль пользователя со списком его постов.
@@ -92,15 +180,24 @@ def profile(request, username):
         HttpResponse: Страница профиля пользователя со списком постов
     """
     author = get_object_or_404(User, username=username)
-    posts_list = (
-        author.posts.all()
-        .annotate_comment_count()
-    )
+    posts_list = author.posts.for_feed()
 
-    if not (request.user == author or request.user.is_staff):
+    shows_all = request.user == author or request.user.is_staff
+    if not shows_all:
         posts_list = posts_list.filter_posts_by_publication()
 
-    page_obj = get_paginated_page(request, posts_list, POSTS_LIMIT)
+    page_obj = get_paginated_page(
+        request,
+        posts_list,
+        POSTS_LIMIT,
+        cursor_field=POSTS_CURSOR_FIELD,
+        count=cached_count(
+            f"profile:{username}:{'all' if shows_all else 'published'}",
+            profile_scopes(username),
+            planner_count,
+            feed_state(request),
+        ),
+    )
     return render(
         request, "blog/profile.html", {"profile": author, "page_obj": page_obj}
     )
@@ -212,7 +309,9 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.post = post
         comment.author = request.user
-        comment.save()
+        # Счётчик комментариев поста обновляется в той же транзакции.
+        with transaction.atomic():
+            comment.save()
     return redirect("blog:post_detail", post_id=post.id)
 
 
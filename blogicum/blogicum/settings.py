@@ -67,6 +67,14 @@ DATABASES = {
 }
 
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "blogicum",
+    }
+}
+
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -108,6 +116,21 @@ EMAIL_FILE_PATH = BASE_DIR / "sent_emails"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Каталог файлов карты сайта и схема с доменом её адресов
+# (см. blog/sitemaps.py)
+BLOG_SITEMAP_ROOT = BASE_DIR / "sitemaps"
+BLOG_SITEMAP_BASE_URL = "https://vasiliy924.pythonanywhere.com"
+
+# Асинхронные представления чтения для запуска под ASGI
+# (см. blog/async_views.py)
+BLOG_ASYNC_VIEWS = False
+
+FILE_UPLOAD_HANDLERS = [
+    "blog.uploads.BoundedImageUploadHandler",
+    "django.core.files.uploadhandler.MemoryFileUploadHandler",
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+
 AUTH_USER_MODEL = "auth.User"
 
 
@@ -10,6 +10,7 @@ from typing import (Any, Iterable, List, NamedTuple, Optional, Tuple, Type,
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db.models import Field, Model
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -32,6 +33,26 @@ def enable_debug_false():
         yield
 
 
+def post_queries(ctx):
+    """
+    Выборки постов, записанные CaptureQueriesContext, кроме запроса
+    состояния постов в БД (см. blog.cache.feed_state).
+    """
+    return [
+        query for query in ctx.captured_queries
+        if "blog_post" in query["sql"] and "MAX(" not in query["sql"]
+    ]
+
+
+# Кэш не откатывается вместе с БД: закэшированные фрагменты и страницы
+# одного теста не должны попадать в следующие.
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
 class SafeImportFromContextManager:
     def __init__(
         self,
@@ -362,6 +383,7 @@ def cleanup(request):
                 filename.endswith(".jpg")
                 or filename.endswith(".gif")
                 or filename.endswith(".png")
+                or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
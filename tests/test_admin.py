@@ -0,0 +1,114 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+USERS_CHANGELIST = "/admin/auth/user/"
+
+
+def _blend_active_users(mixer, count, published_category):
+    users = mixer.cycle(count).blend("auth.User")
+    for number, user in enumerate(users):
+        posts = mixer.cycle(number + 1).blend(
+            "blog.Post", author=user, category=published_category
+        )
+        mixer.cycle(2).blend("blog.Comment", author=user, post=posts[0])
+    return users
+
+
+def _changelist_queries(admin_client, url=USERS_CHANGELIST):
+    with CaptureQueriesContext(connection) as ctx:
+        response = admin_client.get(url)
+    assert response.status_code == 200
+    return response, len(ctx.captured_queries)
+
+
+def test_user_changelist_query_count_is_constant(
+    admin_client, mixer, published_category
+):
+    _blend_active_users(mixer, 2, published_category)
+    _, few = _changelist_queries(admin_client)
+    _blend_active_users(mixer, 5, published_category)
+    _, many = _changelist_queries(admin_client)
+    assert few == many, (
+        "Убедитесь, что количество постов и комментариев пользователей"
+        " в админке считается без отдельного запроса на каждую строку."
+    )
+
+
+def test_user_changelist_counts_and_sorting(
+    admin_client, mixer, published_category
+):
+    users = _blend_active_users(mixer, 3, published_category)
+    # Столбец «Кол-во постов» — шестой в list_display.
+    response, _ = _changelist_queries(admin_client, f"{USERS_CHANGELIST}?o=-6")
+    result = list(response.context["cl"].result_list)
+    assert [user.pk for user in result[:3]] == [
+        user.pk for user in reversed(users)
+    ], "Убедитесь, что пользователей можно сортировать по числу постов."
+    assert [user.posts_total for user in result[:3]] == [3, 2, 1]
+    assert all(user.comments_total == 2 for user in result[:3])
+
+
+def _filter_choices(response, title):
+    spec = next(
+        spec for spec in response.context["cl"].filter_specs
+        if spec.title == title
+    )
+    return [
+        choice["display"]
+        for choice in spec.choices(response.context["cl"])
+    ][1:]
+
+
+def test_author_filter_lists_only_top_authors(
+    admin_client, mixer, published_category, monkeypatch
+):
+    monkeypatch.setattr("blog.admin_filters.ADMIN_FILTER_TOP_N", 2)
+    users = _blend_active_users(mixer, 3, published_category)
+    response = admin_client.get("/admin/blog/post/")
+    assert _filter_choices(response, "автору") == [
+        users[2].username, users[1].username
+    ], "Убедитесь, что фильтр по автору выводит только самых активных."
+
+    response = admin_client.get(
+        "/admin/blog/post/", {"author": users[0].username}
+    )
+    assert list(response.context["cl"].result_list) == list(
+        users[0].posts.all()
+    )
+    assert users[0].username in _filter_choices(response, "автору"), (
+        "Убедитесь, что выбранный автор выводится в фильтре,"
+        " даже если он не входит в число самых активных."
+    )
+
+
+def test_comment_post_filter(admin_client, mixer, published_category):
+    users = _blend_active_users(mixer, 2, published_category)
+    post = users[0].posts.get()
+    response = admin_client.get("/admin/blog/comment/", {"post": post.pk})
+    assert response.status_code == 200
+    assert {
+        comment.post_id for comment in response.context["cl"].result_list
+    } == {post.pk}
+    response = admin_client.get("/admin/blog/comment/", {"post": "abc"})
+    assert not response.context["cl"].result_list
+
+
+def test_change_forms_do_not_list_related_objects(
+    admin_client, mixer, user, published_category
+):
+    post = mixer.blend("blog.Post", author=user, category=published_category)
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    content = admin_client.get(
+        f"/admin/blog/post/{post.pk}/change/"
+    ).content.decode()
+    assert "admin-autocomplete" in content, (
+        "Убедитесь, что автор, категория и местоположение поста"
+        " выбираются автодополнением."
+    )
+    content = admin_client.get(
+        f"/admin/blog/comment/{comment.pk}/change/"
+    ).content.decode()
+    assert "vForeignKeyRawIdAdminField" in content
@@ -0,0 +1,127 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def blend_posts(mixer, user, published_category):
+    def blend(count, **kwargs):
+        kwargs.setdefault("author", user)
+        kwargs.setdefault("category", published_category)
+        now = timezone.now()
+        return [
+            mixer.blend("blog.Post", **{
+                "pub_date": now - timedelta(hours=number), **kwargs
+            })
+            for number in range(count)
+        ]
+    return blend
+
+
+def test_post_list_follows_publication_rules(client, blend_posts):
+    shown = blend_posts(1)[0]
+    blend_posts(1, is_published=False)
+    blend_posts(1, pub_date=timezone.now() + timedelta(days=1))
+    response = client.get("/api/posts/")
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["id"] for item in data["results"]] == [shown.pk], (
+        "Убедитесь, что API выводит только опубликованные посты."
+    )
+    assert data["results"][0]["author"] == shown.author.username
+    assert data["next"] is None
+
+
+def test_post_list_cursor_pagination(client, blend_posts):
+    posts = blend_posts(5)
+    url = "/api/posts/?limit=2&fields=id"
+    ids = []
+    while url:
+        data = client.get(url).json()
+        ids += [item["id"] for item in data["results"]]
+        url = data["next"]
+    assert ids == [post.pk for post in posts], (
+        "Убедитесь, что ссылки next проходят всю ленту без пропусков."
+    )
+
+
+def test_sparse_fieldsets(client, blend_posts):
+    blend_posts(1)
+    data = client.get("/api/posts/", {"fields": "id,title"}).json()
+    assert set(data["results"][0]) == {"id", "title"}
+    response = client.get("/api/posts/", {"fields": "id,password"})
+    assert response.status_code == 400
+
+
+def test_post_list_query_count_is_constant(client, blend_posts):
+    def count_queries():
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            client.get("/api/posts/", {"limit": 20})
+        return len(ctx.captured_queries)
+
+    blend_posts(2)
+    few = count_queries()
+    blend_posts(10)
+    assert count_queries() == few
+
+
+def test_category_and_profile_lists(
+    client, user_client, user, blend_posts, published_category
+):
+    published = blend_posts(1)[0]
+    hidden = blend_posts(1, is_published=False)[0]
+    data = client.get(
+        f"/api/category/{published_category.slug}/posts/"
+    ).json()
+    assert [item["id"] for item in data["results"]] == [published.pk]
+
+    url = f"/api/profile/{user.username}/posts/"
+    assert [item["id"] for item in client.get(url).json()["results"]] == [
+        published.pk
+    ]
+    assert {
+        item["id"] for item in user_client.get(url).json()["results"]
+    } == {published.pk, hidden.pk}, (
+        "Убедитесь, что автор видит в API все свои посты."
+    )
+
+
+def test_post_detail_and_comments(client, blend_posts, mixer):
+    post = blend_posts(1)[0]
+    hidden = blend_posts(1, is_published=False)[0]
+    comment = mixer.blend("blog.Comment", post=post)
+    data = client.get(f"/api/posts/{post.pk}/").json()
+    assert data["text"] == post.text
+    assert client.get(f"/api/posts/{hidden.pk}/").status_code == 404
+
+    data = client.get(f"/api/posts/{post.pk}/comments/").json()
+    assert data["results"] == [{
+        "id": comment.pk,
+        "text": comment.text,
+        "created_at": data["results"][0]["created_at"],
+        "author": comment.author.username,
+        "post": post.pk,
+    }]
+    assert client.get(f"/api/posts/{hidden.pk}/comments/").status_code == 404
+
+
+def test_comments_in_page_order(client, blend_posts, mixer):
+    post = blend_posts(1)[0]
+    comments = mixer.cycle(3).blend("blog.Comment", post=post)
+    url = f"/api/posts/{post.pk}/comments/?limit=2&fields=id"
+    first = client.get(url).json()
+    second = client.get(first["next"]).json()
+    ids = [item["id"] for item in first["results"] + second["results"]]
+    assert ids == [comment.pk for comment in comments], (
+        "Убедитесь, что API выводит комментарии в порядке добавления,"
+        " как на странице поста."
+    )
+    back = client.get(second["previous"]).json()
+    assert back["results"] == first["results"]
@@ -0,0 +1,144 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from conftest import post_queries
+from blog import async_views
+from blog.management.commands.benchmark_views import read_views
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def async_urls():
+    with read_views(True):
+        yield
+
+
+@pytest.fixture
+def feed_urls(user, published_category):
+    return (
+        "/",
+        f"/category/{published_category.slug}/",
+        f"/profile/{user.username}/",
+    )
+
+
+def test_setting_switches_read_views(async_urls, user, published_category):
+    for url, view in (
+        ("/", async_views.index),
+        (f"/category/{published_category.slug}/", async_views.category_posts),
+        (f"/profile/{user.username}/", async_views.profile),
+        ("/posts/1/", async_views.post_detail),
+    ):
+        assert resolve(url).func is view, (
+            f"Убедитесь, что при BLOG_ASYNC_VIEWS = True адрес `{url}`"
+            " обслуживается асинхронным представлением."
+        )
+
+
+def test_async_feeds_match_sync(client, mixer, user, published_category,
+                                feed_urls):
+    mixer.blend("blog.Post", author=user, category=published_category,
+                title="Опубликованный пост")
+    mixer.blend("blog.Post", author=user, category=published_category,
+                title="Черновик", is_published=False)
+    sync_pages = [client.get(url) for url in feed_urls]
+    cache.clear()
+    with read_views(True):
+        async_pages = [client.get(url) for url in feed_urls]
+    for url, sync_page, async_page in zip(
+        feed_urls, sync_pages, async_pages
+    ):
+        assert async_page.status_code == 200
+        assert async_page.content == sync_page.content, (
+            f"Убедитесь, что асинхронное представление страницы `{url}`"
+            " выводит те же посты, что и синхронное."
+        )
+        assert "Черновик" not in async_page.content.decode()
+
+
+def test_async_profile_shows_drafts_to_author(
+    user_client, mixer, user, published_category, async_urls
+):
+    mixer.blend("blog.Post", author=user, category=published_category,
+                title="Черновик", is_published=False)
+    content = user_client.get(f"/profile/{user.username}/").content.decode()
+    assert "Черновик" in content, (
+        "Убедитесь, что асинхронная страница профиля показывает автору"
+        " его неопубликованные посты."
+    )
+
+
+def test_async_feed_served_from_cache(
+    client, mixer, user, published_category, feed_urls, async_urls
+):
+    mixer.blend("blog.Post", author=user, category=published_category)
+    for url in feed_urls:
+        first = client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            second = client.get(url)
+        assert second.content == first.content
+        assert not post_queries(ctx), (
+            f"Убедитесь, что асинхронная страница `{url}` для анонимного"
+            " посетителя отдаётся из кэша."
+        )
+
+
+def test_async_post_detail(client, mixer, user, published_category,
+                           async_urls):
+    post = mixer.blend("blog.Post", author=user, category=published_category)
+    mixer.cycle(3).blend("blog.Comment", post=post, author=user,
+                         text="Текст комментария")
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(f"/posts/{post.pk}/")
+    assert response.status_code == 200
+    assert response.content.decode().count("Текст комментария") == 3
+    assert len(ctx.captured_queries) == 2, (
+        "Убедитесь, что асинхронная страница поста загружает пост и"
+        " страницу комментариев двумя запросами, без подсчёта комментариев."
+    )
+
+
+def test_async_post_detail_hides_unpublished(
+    client, another_user_client, mixer, user, published_category, async_urls
+):
+    post = mixer.blend("blog.Post", author=user, category=published_category,
+                       pub_date=timezone.now() + timedelta(days=1))
+    assert client.get(f"/posts/{post.pk}/").status_code == 404
+    assert another_user_client.get(f"/posts/{post.pk}/").status_code == 404
+    assert client.get("/posts/0/").status_code == 404
+
+
+def test_async_post_detail_out_of_range_page(
+    client, mixer, user, published_category, async_urls
+):
+    post = mixer.blend("blog.Post", author=user, category=published_category)
+    mixer.blend("blog.Comment", post=post, author=user,
+                text="Текст комментария")
+    response = client.get(f"/posts/{post.pk}/?page=5")
+    assert response.status_code == 200
+    assert "Текст комментария" in response.content.decode(), (
+        "Убедитесь, что для несуществующей страницы комментариев"
+        " выводится последняя страница."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_views_command(mixer, user, published_category):
+    mixer.blend("blog.Post", author=user, category=published_category)
+    out = StringIO()
+    call_command(
+        "benchmark_views", "--requests", "4", "--concurrency", "2",
+        stdout=out,
+    )
+    output = out.getvalue()
+    assert "WSGI /" in output and "ASGI /" in output
+    assert "не 200" not in output
+    assert resolve("/").func is not async_views.index
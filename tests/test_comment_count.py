@@ -0,0 +1,59 @@
+from io import StringIO
+
+import pytest
+from blog.models import Comment, Post
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _stored_count(post):
+    return Post.objects.values_list("comment_count", flat=True).get(
+        pk=post.pk
+    )
+
+
+def test_counter_follows_comment_views(
+    user_client, post_with_published_location
+):
+    post = post_with_published_location
+    for text in ("Первый", "Второй"):
+        user_client.post(f"/posts/{post.id}/comment/", data={"text": text})
+    assert _stored_count(post) == 2
+
+    comment = Comment.objects.filter(post=post).first()
+    user_client.post(f"/posts/{post.id}/delete_comment/{comment.id}/")
+    assert _stored_count(post) == 1
+
+
+def test_counter_survives_stale_post_save(
+    mixer, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post=post)
+    post.title = "Новый заголовок"
+    post.save()
+    assert _stored_count(post) == 3, (
+        "Убедитесь, что сохранение поста не затирает счётчик комментариев."
+    )
+
+
+def test_counter_follows_bulk_delete(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(4).blend("blog.Comment", post=post)
+    Comment.objects.filter(
+        pk__in=list(
+            Comment.objects.filter(post=post).values_list("pk", flat=True)[:3]
+        )
+    ).delete()
+    assert _stored_count(post) == 1
+
+
+def test_recount_command_repairs_counters(
+    mixer, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=42)
+    call_command("recount_comments", batch_size=1, stdout=StringIO())
+    assert _stored_count(post) == 2
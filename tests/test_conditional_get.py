@@ -0,0 +1,152 @@
+from datetime import timedelta
+
+import pytest
+from blog.cache import (
+    _scope_version_key,
+    author_scope,
+    bump_scopes,
+    category_scope,
+    get_scope_versions,
+)
+from blog.models import Comment, Post
+from django.core.cache import cache
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _revalidate(client, url, response):
+    return client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+
+def test_post_detail_not_modified(client, post_with_published_location):
+    url = f"/posts/{post_with_published_location.id}/"
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.has_header("ETag") and response.has_header(
+        "Last-Modified"
+    )
+
+    revalidated = _revalidate(client, url, response)
+    assert revalidated.status_code == 304, (
+        "Убедитесь, что неизменённая страница поста отдаётся со статусом"
+        " 304 Not Modified."
+    )
+    assert not revalidated.content
+
+    revalidated = client.get(
+        url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+    )
+    assert revalidated.status_code == 304
+
+
+def test_post_detail_modified_by_comment(
+    mixer, client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    response = client.get(url)
+    mixer.blend("blog.Comment", post=post_with_published_location)
+    assert _revalidate(client, url, response).status_code == 200
+
+
+def test_post_detail_etag_depends_on_user(
+    client, user_client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    response = client.get(url)
+    assert _revalidate(user_client, url, response).status_code == 200
+
+
+def test_post_detail_etag_depends_on_session(
+    user_client, user, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    response = user_client.get(url)
+    user_client.logout()
+    user_client.force_login(user)
+    assert _revalidate(user_client, url, response).status_code == 200, (
+        "Убедитесь, что после повторного входа страница поста с формой"
+        " комментария (и CSRF-токеном сессии) отдаётся заново."
+    )
+
+
+def test_post_detail_modified_by_comment_without_signals(
+    client, user, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    response = client.get(url)
+    Comment.objects.bulk_create(
+        [Comment(post=post_with_published_location, author=user, text="a")]
+    )
+    assert _revalidate(client, url, response).status_code == 200
+
+
+def test_hidden_post_has_no_validators(client, mixer, user):
+    post = mixer.blend("blog.Post", author=user, is_published=False)
+    response = client.get(f"/posts/{post.id}/")
+    assert response.status_code == 404
+    assert not response.has_header("ETag")
+
+
+@pytest.mark.parametrize("authenticated", [False, True])
+def test_feed_not_modified(
+    client, user_client, mixer, user, published_category, authenticated
+):
+    viewer = user_client if authenticated else client
+    mixer.blend("blog.Post", author=user, category=published_category)
+    response = viewer.get("/")
+    assert _revalidate(viewer, "/", response).status_code == 304
+
+    mixer.blend("blog.Post", author=user, category=published_category)
+    assert _revalidate(viewer, "/", response).status_code == 200, (
+        "Убедитесь, что после публикации нового поста лента отдаётся"
+        " заново, а не со статусом 304."
+    )
+
+
+@pytest.mark.parametrize("url", ["/", "/feed/rss/", "/api/posts/"])
+def test_feed_modified_in_database(client, mixer, user, published_category,
+                                   url):
+    post = mixer.blend("blog.Post", author=user, category=published_category)
+    response = client.get(url)
+    # Изменение другим процессом или командой: области кэша этого
+    # процесса не сбрасываются.
+    Post.objects.filter(pk=post.pk).update(
+        title="Updated title",
+        updated_at=timezone.now() + timedelta(minutes=1),
+    )
+    for headers in (
+        {"If-None-Match": response["ETag"]},
+        {"If-Modified-Since": response["Last-Modified"]},
+    ):
+        revalidated = client.get(url, headers=headers)
+        assert revalidated.status_code == 200, (
+            f"Убедитесь, что валидаторы ленты `{url}` строятся из состояния"
+            " постов в БД, а не из версий областей кэша процесса."
+        )
+        assert "Updated title" in revalidated.content.decode()
+
+
+@pytest.mark.parametrize(
+    "url", ["/category/unknown/", "/profile/unknown/",
+            "/category/unknown/feed/rss/", "/api/profile/unknown/posts/"]
+)
+def test_missing_feed_has_no_validators(client, url):
+    response = client.get(url)
+    assert response.status_code == 404
+    assert not response.has_header("ETag") and not response.has_header(
+        "Last-Modified"
+    ), (
+        "Убедитесь, что ответ 404 для несуществующей категории или автора"
+        " не содержит валидаторов условного GET."
+    )
+
+
+def test_scope_versions_expire():
+    get_scope_versions([category_scope("unknown")])
+    bump_scopes(author_scope("unknown"))
+    for scope in (category_scope("unknown"), author_scope("unknown")):
+        key = cache.make_key(_scope_version_key(scope))
+        assert cache._expire_info[key] is not None, (
+            "Убедитесь, что версии областей кэша хранятся ограниченное время."
+        )
@@ -0,0 +1,73 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from blog.constants import POST_PREVIEW_LENGTH
+from blog.excerpts import make_excerpt
+from blog.models import Post
+from django.core.cache import cache
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_make_excerpt():
+    assert make_excerpt("Короткий\n\n  текст") == "Короткий текст"
+    excerpt = make_excerpt("слово, " * 1000)
+    assert len(excerpt) <= POST_PREVIEW_LENGTH + 1
+    assert excerpt.endswith("слово…"), (
+        "Убедитесь, что превью обрезается по границе слова."
+    )
+
+
+def test_summary_computed_on_save(mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        text="слово " * 450,
+    )
+    assert post.word_count == 450
+    assert post.reading_time == timedelta(minutes=3)
+    assert len(post.excerpt) <= POST_PREVIEW_LENGTH + 1
+
+    post.text = "Одно предложение."
+    post.save()
+    post.refresh_from_db()
+    assert post.excerpt == "Одно предложение."
+    assert post.word_count == 2
+
+
+def test_feed_html_does_not_depend_on_text_length(
+    client, mixer, user, published_category
+):
+    def feed_size(text):
+        Post.objects.all().delete()
+        cache.clear()
+        mixer.blend(
+            "blog.Post",
+            author=user,
+            category=published_category,
+            title="Пост",
+            text=text,
+        )
+        return len(client.get("/").content)
+
+    # Разница — только в числах: ID поста и минутах чтения.
+    short, long = feed_size("слово " * 100), feed_size("слово " * 10_000)
+    assert abs(long - short) < 20, (
+        "Убедитесь, что карточка поста выводит превью, а не весь текст."
+    )
+
+
+def test_summarize_posts_command(mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category, text="Текст"
+    )
+    Post.objects.filter(pk=post.pk).update(
+        text="Новый текст поста", excerpt="", word_count=0
+    )
+    call_command("summarize_posts", stdout=StringIO())
+    post.refresh_from_db()
+    assert post.excerpt == "Новый текст поста"
+    assert post.word_count == 3
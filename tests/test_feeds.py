@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+import pytest
+from conftest import post_queries
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_urls(user, published_category):
+    return [
+        f"{prefix}feed/{kind}/"
+        for prefix in (
+            "/",
+            f"/category/{published_category.slug}/",
+            f"/profile/{user.username}/",
+        )
+        for kind in ("rss", "atom")
+    ]
+
+
+@pytest.fixture
+def blend_post(mixer, user, published_category):
+    def blend(**kwargs):
+        return mixer.blend(
+            "blog.Post", author=user, category=published_category, **kwargs
+        )
+    return blend
+
+
+def test_feeds_list_published_posts(client, blend_post, feed_urls):
+    shown = blend_post(title="Опубликованный")
+    hidden = blend_post(title="Черновик", is_published=False)
+    scheduled = blend_post(
+        title="Запланированный", pub_date=timezone.now() + timedelta(days=1)
+    )
+    for url in feed_urls:
+        response = client.get(url)
+        assert response.status_code == 200
+        content = response.content.decode()
+        assert shown.title in content
+        assert hidden.title not in content, (
+            f"Убедитесь, что лента `{url}` выводит только опубликованные"
+            " посты."
+        )
+        assert scheduled.title not in content
+
+
+def test_feed_items_limit(client, blend_post, settings):
+    settings.BLOG_FEED_ITEMS = 3
+    for number in range(5):
+        blend_post()
+    content = client.get("/feed/rss/").content.decode()
+    assert content.count("<item>") == 3
+
+
+def test_feed_served_from_cache(client, blend_post, feed_urls):
+    blend_post()
+    for url in feed_urls:
+        first = client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            second = client.get(url)
+            not_modified = client.get(
+                url, HTTP_IF_NONE_MATCH=first["ETag"]
+            )
+        assert second.content == first.content
+        assert not_modified.status_code == 304
+        # Остаются время последней публикации и проверка существования
+        # категории или автора.
+        assert not post_queries(ctx), (
+            f"Убедитесь, что лента `{url}` отдаётся из кэша."
+        )
+
+
+def test_feed_updated_on_new_post(client, blend_post, feed_urls):
+    for url in feed_urls:
+        client.get(url)
+    post = blend_post(title="Свежая публикация")
+    for url in feed_urls:
+        assert post.title in client.get(url).content.decode()
+
+
+def test_missing_category_feed(client):
+    assert client.get("/category/missing/feed/rss/").status_code == 404
@@ -0,0 +1,89 @@
+import os
+from io import BytesIO, StringIO
+
+import pytest
+from blog.models import Post
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.BLOG_IMAGE_WORKERS = 0
+    return tmp_path
+
+
+def _image_file(size=(120, 90), name="photo.png"):
+    buffer = BytesIO()
+    Image.new("RGB", size, (10, 20, 30)).save(buffer, "PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), "image/png")
+
+
+@pytest.fixture
+def post_with_image(
+    mixer, user, published_category, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        post = mixer.blend(
+            "blog.Post",
+            author=user,
+            category=published_category,
+            image=_image_file(),
+        )
+    return Post.objects.get(pk=post.pk)
+
+
+def test_meta_stored_on_upload(post_with_image):
+    meta = post_with_image.image_meta
+    assert (meta["width"], meta["height"]) == (120, 90)
+    assert meta["size"] == post_with_image.image.size
+
+
+def test_meta_cleared_with_image(post_with_image):
+    post_with_image.image = None
+    post_with_image.save()
+    assert Post.objects.get(pk=post_with_image.pk).image_meta == {}
+
+
+def test_admin_changelist_does_not_touch_storage(
+    admin_client, post_with_image, monkeypatch
+):
+    def fail(*args, **kwargs):
+        raise AssertionError(
+            "Убедитесь, что список постов в админке не обращается"
+            " к хранилищу файлов для каждой строки."
+        )
+
+    monkeypatch.setattr(type(default_storage._wrapped), "exists", fail)
+    response = admin_client.get("/admin/blog/post/")
+    assert response.status_code == 200
+    assert post_with_image.image_renditions["admin"]["jpeg"] in (
+        response.content.decode()
+    )
+
+
+def test_cleanup_media(post_with_image, media_root):
+    orphan = default_storage.save("posts_images/orphan.png", _image_file())
+    kept = [post_with_image.image.name] + [
+        rendition["webp"]
+        for rendition in post_with_image.image_renditions.values()
+    ]
+
+    out = StringIO()
+    call_command("cleanup_media", "--dry-run", "--min-age=0", stdout=out)
+    assert orphan in out.getvalue()
+    assert default_storage.exists(orphan)
+
+    old = os.path.getmtime(media_root / orphan) - 7200
+    os.utime(media_root / orphan, (old, old))
+    call_command("cleanup_media", stdout=StringIO())
+    assert not default_storage.exists(orphan), (
+        "Убедитесь, что команда cleanup_media удаляет файлы,"
+        " на которые не ссылаются посты."
+    )
+    assert all(default_storage.exists(name) for name in kept)
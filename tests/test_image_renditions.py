@@ -0,0 +1,104 @@
+from io import BytesIO
+
+import pytest
+from blog.constants import IMAGE_RENDITIONS
+from blog.models import Post
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.BLOG_IMAGE_WORKERS = 0
+    cache.clear()
+    yield tmp_path
+    cache.clear()
+
+
+def _image_file(size=(2000, 1500), name="photo.png", mode="RGBA"):
+    buffer = BytesIO()
+    Image.new(mode, size, (200, 80, 40, 255)).save(buffer, "PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), "image/png")
+
+
+@pytest.fixture
+def post_with_image(
+    mixer, user, published_category, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        post = mixer.blend(
+            "blog.Post",
+            author=user,
+            category=published_category,
+            image=_image_file(),
+        )
+    return Post.objects.get(pk=post.pk)
+
+
+def test_renditions_built_after_commit(post_with_image):
+    renditions = post_with_image.image_renditions
+    assert set(renditions) == set(IMAGE_RENDITIONS), (
+        "Убедитесь, что после сохранения поста с изображением строятся"
+        " миниатюры всех размеров."
+    )
+    storage = post_with_image.image.storage
+    for name, (width, height) in IMAGE_RENDITIONS.items():
+        rendition = renditions[name]
+        assert rendition["width"] <= width
+        assert rendition["height"] <= height
+        for fmt in ("jpeg", "webp"):
+            with storage.open(rendition[fmt]) as file, Image.open(file) as img:
+                assert img.size == (rendition["width"], rendition["height"])
+                assert img.format == fmt.upper()
+
+
+def test_renditions_not_built_inside_request_transaction(
+    mixer, user, published_category
+):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        image=_image_file(),
+    )
+    assert Post.objects.get(pk=post.pk).image_renditions == {}
+
+
+def test_card_and_detail_use_srcset(client, post_with_image):
+    renditions = post_with_image.image_renditions
+    for url, rendition in (
+        ("/", "card"),
+        (f"/posts/{post_with_image.pk}/", "detail"),
+    ):
+        content = client.get(url).content.decode()
+        assert renditions[rendition]["jpeg"] in content
+        assert "srcset=" in content and 'type="image/webp"' in content, (
+            f"Убедитесь, что страница `{url}` выводит миниатюры через srcset."
+        )
+        assert post_with_image.image.url not in content
+
+
+def test_stale_post_save_keeps_renditions(post_with_image):
+    post_with_image.image_renditions = {}
+    post_with_image.title = "Новый заголовок"
+    post_with_image.save()
+    assert Post.objects.get(pk=post_with_image.pk).image_renditions
+
+
+def test_replaced_image_renditions_rebuilt(
+    post_with_image, django_capture_on_commit_callbacks
+):
+    storage = post_with_image.image.storage
+    old_card = post_with_image.image_renditions["card"]["jpeg"]
+    post_with_image.image = _image_file((300, 300), "other.png", "RGB")
+    with django_capture_on_commit_callbacks(execute=True):
+        post_with_image.save()
+    renditions = Post.objects.get(pk=post_with_image.pk).image_renditions
+    assert renditions["card"]["width"] == 300
+    assert not storage.exists(old_card), (
+        "Убедитесь, что миниатюры заменённого изображения удаляются."
+    )
@@ -0,0 +1,68 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != "sqlite",
+        reason="План запроса проверяется в формате SQLite.",
+    ),
+]
+
+
+def _feed_query(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    feed_queries = [
+        query["sql"]
+        for query in ctx.captured_queries
+        if 'FROM "blog_post"' in query["sql"] and "LIMIT" in query["sql"]
+    ]
+    assert feed_queries, f"Не найден запрос ленты для `{url}`."
+    return feed_queries[0]
+
+
+def _post_table_plan(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        plan = [row[-1] for row in cursor.fetchall()]
+    return [step for step in plan if "blog_post " in f"{step} "]
+
+
+@pytest.mark.parametrize("url_name", ["index", "category", "profile"])
+def test_feed_query_uses_index(
+    mixer, user, client, published_category, url_name
+):
+    mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    url = {
+        "index": "/",
+        "category": f"/category/{published_category.slug}/",
+        "profile": f"/profile/{user.username}/",
+    }[url_name]
+
+    steps = _post_table_plan(_feed_query(client, url))
+
+    assert steps and all("INDEX" in step for step in steps), (
+        f"Убедитесь, что запрос ленты `{url}` читает таблицу постов по"
+        f" индексу, а не полным сканированием. План: {steps}"
+    )
+
+
+def test_comments_query_uses_composite_index(
+    client, post_with_published_location, comment_to_a_post
+):
+    with CaptureQueriesContext(connection) as ctx:
+        client.get(f"/posts/{post_with_published_location.id}/")
+    comments_sql = next(
+        query["sql"]
+        for query in ctx.captured_queries
+        if 'FROM "blog_comment"' in query["sql"] and "LIMIT" in query["sql"]
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {comments_sql}")
+        plan = " ".join(row[-1] for row in cursor.fetchall())
+    assert "comment_post_created_idx" in plan, plan
@@ -0,0 +1,199 @@
+import pytest
+from blog.moderation import delete_comments, delete_posts
+from blog.models import Comment, Post, SearchDocument
+from blog.search import get_search_backend
+from django.db import connection
+from django.db.models.signals import pre_delete
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def blend_posts(mixer, user, published_category):
+    def blend(count, **kwargs):
+        kwargs.setdefault("author", user)
+        kwargs.setdefault("category", published_category)
+        return mixer.cycle(count).blend("blog.Post", **kwargs)
+    return blend
+
+
+def run_action(admin_client, url, action, objects=(), **data):
+    """Выполняет действие админки для выбора «все объекты»."""
+    return admin_client.post(url, {
+        "action": action,
+        "select_across": "1",
+        "index": "0",
+        "_selected_action": [obj.pk for obj in objects] or ["0"],
+        **data,
+    })
+
+
+def test_unpublish_all_posts(admin_client, client, blend_posts):
+    posts = blend_posts(3, title="Байкал")
+    assert posts[0].title in client.get("/").content.decode()
+    response = run_action(admin_client, "/admin/blog/post/", "unpublish")
+    assert response.status_code == 302
+    assert not Post.objects.filter(is_published=True).exists()
+    assert not Post.objects.filter(is_visible=True).exists()
+    assert posts[0].title not in client.get("/").content.decode(), (
+        "Убедитесь, что массовое снятие с публикации сбрасывает"
+        " закэшированные ленты."
+    )
+
+    run_action(admin_client, "/admin/blog/post/", "publish")
+    assert Post.objects.filter(is_visible=True).count() == 3
+
+
+def test_publish_query_count_does_not_depend_on_selection(
+    admin_client, blend_posts
+):
+    def count_queries(action):
+        with CaptureQueriesContext(connection) as ctx:
+            run_action(admin_client, "/admin/blog/post/", action)
+        return len(ctx.captured_queries)
+
+    blend_posts(2)
+    # Первый запрос заполняет кэш фильтров списка постов.
+    count_queries("publish")
+    few = count_queries("unpublish")
+    blend_posts(20)
+    many = count_queries("unpublish")
+    assert few == many, (
+        "Убедитесь, что массовые действия выполняются запросами"
+        " над всей выборкой, а не для каждого объекта."
+    )
+
+
+def test_unpublish_category_hides_its_posts(
+    admin_client, client, blend_posts, published_category
+):
+    posts = blend_posts(2, title="Байкал")
+    client.get(f"/category/{published_category.slug}/")
+    run_action(
+        admin_client, "/admin/blog/category/", "unpublish",
+        [published_category],
+    )
+    assert not Post.objects.filter(is_visible=True).exists()
+    assert posts[0].title not in client.get("/").content.decode()
+
+
+def test_move_posts_to_category(
+    admin_client, blend_posts, published_category, mixer
+):
+    target = mixer.blend("blog.Category", is_published=True)
+    posts = blend_posts(2)
+    run_action(
+        admin_client, "/admin/blog/post/", "move_to_category", posts[:1],
+        select_across="0", category=target.pk,
+    )
+    assert list(target.posts.all()) == posts[:1]
+    assert published_category.posts.count() == 1
+
+
+def test_delete_authored_posts(admin_client, blend_posts, user, mixer):
+    posts = blend_posts(3, title="Байкал")
+    mixer.blend("blog.Comment", post=posts[0], text="Омуль")
+    run_action(
+        admin_client, "/admin/auth/user/", "delete_authored_posts", [user],
+        select_across="0",
+    )
+    assert not Post.objects.exists()
+    assert not Comment.objects.exists()
+    assert not SearchDocument.objects.exists()
+    backend = get_search_backend()
+    assert backend.search_posts("байкал") == []
+    assert backend.search_comments("омуль") == []
+
+
+def test_purge_post_comments(admin_client, blend_posts, mixer):
+    post, other = blend_posts(2)
+    mixer.cycle(3).blend("blog.Comment", post=post)
+    mixer.blend("blog.Comment", post=other)
+    run_action(
+        admin_client, "/admin/blog/post/", "purge_comments", [post],
+        select_across="0",
+    )
+    post.refresh_from_db()
+    other.refresh_from_db()
+    assert post.comment_count == 0
+    assert other.comment_count == 1
+    assert Comment.objects.count() == 1
+
+
+def _dependent_rows(model, pks):
+    """Строки всех моделей, ссылающихся на удалённые объекты."""
+    return {
+        relation.related_model._meta.label: relation.related_model.objects
+        .filter(**{f"{relation.field.name}__in": pks})
+        .count()
+        for relation in model._meta.related_objects
+    }
+
+
+def test_bulk_delete_leaves_no_dependent_rows(blend_posts, mixer):
+    posts = blend_posts(2, title="Байкал")
+    comments = mixer.cycle(2).blend("blog.Comment", post=posts[0])
+    comment = mixer.blend("blog.Comment", post=posts[1])
+
+    delete_comments(Comment.objects.filter(pk=comment.pk))
+    assert not any(_dependent_rows(Comment, [comment.pk]).values())
+    posts[1].refresh_from_db()
+    assert posts[1].comment_count == 0
+
+    post_ids = [post.pk for post in posts]
+    assert delete_posts(Post.objects.all()) == 2
+    assert not any(_dependent_rows(Post, post_ids).values()), (
+        "Убедитесь, что массовое удаление постов удаляет все зависимые"
+        " строки, в том числе по внешним ключам, добавленным позже."
+    )
+    assert not any(
+        _dependent_rows(Comment, [c.pk for c in comments]).values()
+    )
+
+
+def test_bulk_delete_query_count_does_not_depend_on_comments(
+    blend_posts, mixer
+):
+    def count_queries(comments):
+        post = blend_posts(1)[0]
+        mixer.cycle(comments).blend("blog.Comment", post=post)
+        with CaptureQueriesContext(connection) as ctx:
+            delete_posts(Post.objects.filter(pk=post.pk))
+        return len(ctx.captured_queries)
+
+    assert count_queries(1) == count_queries(5), (
+        "Убедитесь, что при массовом удалении сигналы не выполняют"
+        " запросы для каждого комментария."
+    )
+
+
+def test_bulk_delete_does_not_load_objects(blend_posts, mixer):
+    post = blend_posts(1)[0]
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    loaded = []
+
+    def receiver(sender, instance, **kwargs):
+        loaded.append(instance)
+
+    pre_delete.connect(receiver, weak=False)
+    try:
+        delete_posts(Post.objects.filter(pk=post.pk))
+    finally:
+        pre_delete.disconnect(receiver)
+    assert not loaded, (
+        "Убедитесь, что массовое удаление выполняется запросами DELETE"
+        " по ID, без загрузки удаляемых объектов."
+    )
+    assert not Comment.objects.exists()
+
+
+def test_inline_publish_toggle_kept(admin_client):
+    for url in (
+        "/admin/blog/post/", "/admin/blog/category/", "/admin/blog/location/"
+    ):
+        response = admin_client.get(url)
+        assert response.context["cl"].list_editable == ("is_published",), (
+            f"Убедитесь, что в списке `{url}` флаг публикации можно"
+            " изменить прямо в таблице."
+        )
@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+import pytest
+from blog.cache import page_cache_timeout
+from blog.constants import PAGE_CACHE_TIMEOUT, PUBLISH_POLL_INTERVAL
+from conftest import post_queries
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_urls(user, published_category):
+    return (
+        "/",
+        f"/category/{published_category.slug}/",
+        f"/profile/{user.username}/",
+    )
+
+
+def test_anonymous_feed_served_from_cache(
+    client, mixer, user, published_category, feed_urls
+):
+    mixer.blend("blog.Post", author=user, category=published_category)
+    for url in feed_urls:
+        first = client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            second = client.get(url)
+        assert second.content == first.content
+        # Остаются время последней публикации и проверка существования
+        # категории или автора.
+        assert not post_queries(ctx), (
+            f"Убедитесь, что страница `{url}` для анонимного посетителя"
+            " отдаётся из кэша без выборки постов."
+        )
+
+
+def test_cached_feed_invalidated_on_new_post(
+    client, mixer, user, published_category, feed_urls
+):
+    for url in feed_urls:
+        client.get(url)
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        title="Свежая публикация",
+    )
+    for url in feed_urls:
+        assert post.title in client.get(url).content.decode(), (
+            f"Убедитесь, что кэш страницы `{url}` сбрасывается"
+            " при добавлении поста."
+        )
+
+
+def test_authenticated_feed_not_cached(user_client, mixer, user):
+    user_client.get("/")
+    with CaptureQueriesContext(connection) as ctx:
+        user_client.get("/")
+    assert ctx.captured_queries
+
+
+def test_timeout_bounded_by_next_publication(mixer, user, published_category):
+    assert page_cache_timeout() == PAGE_CACHE_TIMEOUT
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=timezone.now() + timedelta(seconds=30),
+    )
+    assert 0 < page_cache_timeout() <= 30, (
+        "Убедитесь, что страница кэшируется не дольше, чем до ближайшей"
+        " отложенной публикации."
+    )
+    type(post).objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1)
+    )
+    assert page_cache_timeout() == PUBLISH_POLL_INTERVAL, (
+        "Убедитесь, что пока наступившая публикация ждёт команду"
+        " publish_scheduled, страница кэшируется ненадолго."
+    )
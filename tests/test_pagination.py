@@ -0,0 +1,118 @@
+import re
+from datetime import timedelta
+
+import pytest
+from blog.models import Post
+from blog.services import get_paginated_page
+from bs4 import BeautifulSoup
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+N_POSTS = 25
+
+
+@pytest.fixture
+def feed_posts(mixer, user, published_category):
+    now = timezone.now()
+    # Пары постов с одинаковой датой проверяют разрешение ничьих по pk.
+    dates = (now - timedelta(hours=i // 2) for i in range(N_POSTS))
+    return mixer.cycle(N_POSTS).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=dates,
+    )
+
+
+def _cursor_link(content, rel):
+    soup = BeautifulSoup(content.decode("utf-8"), features="html.parser")
+    link = soup.find("a", rel=rel)
+    if link is None:
+        return None
+    return re.search(r"(after|before)=([\w-]+)", link["href"]).group(0)
+
+
+def test_cursor_walk_matches_feed_order(client, feed_posts):
+    expected = list(
+        Post.objects.order_by("-pub_date", "-pk").values_list("pk", flat=True)
+    )
+
+    seen = []
+    query = "after="
+    while query:
+        response = client.get(f"/?{query}")
+        assert response.status_code == 200
+        seen.extend(post.pk for post in response.context["page_obj"])
+        query = _cursor_link(response.content, "next")
+    assert seen == expected, (
+        "Убедитесь, что переход по токенам ?after= обходит ленту целиком, "
+        "без пропусков и повторов."
+    )
+
+    last_page = [post.pk for post in response.context["page_obj"]]
+    response = client.get(f"/?{_cursor_link(response.content, 'prev')}")
+    previous_page = [post.pk for post in response.context["page_obj"]]
+    assert previous_page == expected[-len(last_page) - 10:-len(last_page)], (
+        "Убедитесь, что токен ?before= возвращает предыдущую страницу ленты."
+    )
+
+
+def test_cursor_page_skips_count(client, feed_posts):
+    first = client.get("/?after=")
+    token = first.context["page_obj"].next_cursor
+    with CaptureQueriesContext(connection) as ctx:
+        client.get(f"/?after={token}")
+    assert not any(
+        "COUNT(*)" in query["sql"].upper() for query in ctx.captured_queries
+    ), (
+        "Убедитесь, что курсорная пагинация не выполняет COUNT(*)."
+    )
+
+
+def test_invalid_cursor_falls_back_to_first_page(client, feed_posts):
+    response = client.get("/?after=not-a-token")
+    assert response.status_code == 200
+    newest = Post.objects.order_by("-pub_date", "-pk").first()
+    assert response.context["page_obj"][0] == newest
+
+
+def test_page_window_is_bounded(rf):
+    request = rf.get("/", {"page": 50})
+    page = get_paginated_page(request, list(range(1000)), per_page=10)
+    ellipsis = page.paginator.ELLIPSIS
+    assert page.page_window == [
+        1, ellipsis, 48, 49, 50, 51, 52, ellipsis, 100
+    ], (
+        "Убедитесь, что в пагинаторе выводятся только соседние и крайние"
+        " номера страниц."
+    )
+
+    html = render_to_string("includes/paginator.html", {"page_obj": page})
+    numbers = [i for i in page.page_window if i != ellipsis]
+    # Плюс ссылки «Первая», «←», «→» и «Последняя».
+    assert html.count("?page=") == len(numbers) + 4
+
+
+def test_feed_count_is_cached(user_client, feed_posts, mixer, user):
+    # Авторизованный пользователь: страница не берётся из кэша целиком.
+    user_client.get("/")
+    with CaptureQueriesContext(connection) as ctx:
+        response = user_client.get("/?page=2")
+    assert response.context["page_obj"].paginator.count == N_POSTS
+    assert not any(
+        "COUNT(*)" in query["sql"].upper() for query in ctx.captured_queries
+    ), "Убедитесь, что количество постов ленты берётся из кэша."
+
+    mixer.blend(
+        "blog.Post", author=user, category=feed_posts[0].category
+    )
+    response = user_client.get("/?page=2")
+    assert response.context["page_obj"].paginator.count == N_POSTS + 1, (
+        "Убедитесь, что закэшированное количество постов сбрасывается"
+        " при добавлении поста."
+    )
@@ -0,0 +1,64 @@
+import time
+
+import pytest
+from blog.cache import post_card_key
+from blog.models import Post
+from django.core.cache import cache
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def cached_post(client, mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category
+    )
+    client.get("/")
+    return Post.objects.get(pk=post.pk)
+
+
+def _card_key(post):
+    return post_card_key(post.pk, post.updated_at, post.comment_count)
+
+
+def test_card_is_cached(cached_post):
+    assert cache.get(_card_key(cached_post)) is not None, (
+        "Убедитесь, что карточка поста кэшируется при выводе ленты."
+    )
+
+
+def test_card_timeout_from_constants(
+    client, mixer, user, published_category, monkeypatch
+):
+    monkeypatch.setattr(
+        "blog.templatetags.post_cards.POST_CARD_CACHE_TIMEOUT", 123
+    )
+    post = mixer.blend("blog.Post", author=user, category=published_category)
+    client.get("/")
+    post.refresh_from_db()
+    expires = cache._expire_info[cache.make_key(_card_key(post))]
+    assert expires - time.time() == pytest.approx(123, abs=10), (
+        "Убедитесь, что время жизни карточки поста задано константой"
+        " POST_CARD_CACHE_TIMEOUT."
+    )
+
+
+def test_card_dropped_on_comment(mixer, cached_post):
+    key = _card_key(cached_post)
+    mixer.blend("blog.Comment", post=cached_post)
+    assert cache.get(key) is None
+
+
+def test_card_dropped_on_category_change(client, cached_post):
+    key = _card_key(cached_post)
+    category = cached_post.category
+    category.title = "Новое название категории"
+    category.save()
+    assert cache.get(key) is None
+    assert "Новое название категории" in client.get("/").content.decode()
+
+
+def test_card_dropped_on_post_delete(cached_post):
+    key = _card_key(cached_post)
+    cached_post.delete()
+    assert cache.get(key) is None
@@ -0,0 +1,104 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _blend_posts(mixer, user, n):
+    # У каждого поста своя категория и местоположение: N+1 по связям
+    # сразу проявится в числе запросов.
+    return mixer.cycle(n).blend(
+        "blog.Post",
+        author=user,
+        is_published=True,
+        category__is_published=True,
+        location__is_published=True,
+    )
+
+
+def _count_queries(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(ctx.captured_queries)
+
+
+@pytest.mark.parametrize("url_name", ["index", "category", "profile"])
+def test_feed_query_count_does_not_depend_on_page_size(
+    mixer, user, user_client, url_name
+):
+    posts = _blend_posts(mixer, user, 2)
+    category = posts[0].category
+    urls = {
+        "index": "/",
+        "category": f"/category/{category.slug}/",
+        "profile": f"/profile/{user.username}/",
+    }
+    few = _count_queries(user_client, urls[url_name])
+
+    mixer.cycle(8).blend(
+        "blog.Post",
+        author=user,
+        is_published=True,
+        category=category,
+        location__is_published=True,
+    )
+    _blend_posts(mixer, user, 8)
+    many = _count_queries(user_client, urls[url_name])
+
+    assert few == many, (
+        f"Убедитесь, что число запросов к БД на странице `{urls[url_name]}`"
+        " не зависит от количества постов на странице."
+    )
+
+
+def test_feed_does_not_select_full_text(mixer, user, client):
+    post = mixer.blend(
+        "blog.Post",
+        text="слово " * 1000,
+        is_published=True,
+        category__is_published=True,
+    )
+    response = client.get("/")
+    card_post = response.context["page_obj"][0]
+    assert card_post == post
+    assert "text" in card_post.get_deferred_fields()
+    assert len(card_post.excerpt) < len(post.text)
+    assert card_post.excerpt in response.content.decode()
+
+
+@pytest.fixture
+def commented_post(mixer, post_with_published_location):
+    # Комментарии разных авторов: загрузка авторов по одному дала бы N+1.
+    mixer.cycle(5).blend("blog.Comment", post=post_with_published_location)
+    return post_with_published_location
+
+
+def test_post_detail_queries_for_reader(
+    client, django_assert_num_queries, commented_post
+):
+    # Пост с автором, категорией и местоположением; страница комментариев
+    # с авторами (количество берётся из Post.comment_count).
+    with django_assert_num_queries(2):
+        response = client.get(f"/posts/{commented_post.id}/")
+    assert response.status_code == 200
+
+
+def test_post_detail_queries_for_author(
+    user_client, django_assert_num_queries, commented_post
+):
+    # Плюс сессия и пользователь.
+    with django_assert_num_queries(4):
+        response = user_client.get(f"/posts/{commented_post.id}/")
+    assert response.status_code == 200
+
+
+def test_post_detail_hidden_post(
+    another_user_client, user_client, commented_post
+):
+    commented_post.is_published = False
+    commented_post.save()
+    url = f"/posts/{commented_post.id}/"
+    assert another_user_client.get(url).status_code == 404
+    assert user_client.get(url).status_code == 200
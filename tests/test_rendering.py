@@ -0,0 +1,110 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from blog.models import Comment, Post
+from blog.rendering import PlainTextRenderer
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+class NextVersionRenderer(PlainTextRenderer):
+    version = PlainTextRenderer.version + 1
+
+    def render(self, text):
+        return f"<p>{super().render(text)}</p>"
+
+
+@pytest.fixture
+def next_renderer(settings):
+    settings.BLOG_TEXT_RENDERER = "tests.test_rendering.NextVersionRenderer"
+
+
+@pytest.fixture
+def post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        text="<b>Жирный</b>\nвторая строка",
+    )
+
+
+def test_text_html_stored_on_save(post, mixer):
+    post = Post.objects.get(pk=post.pk)
+    assert post.text_html == "&lt;b&gt;Жирный&lt;/b&gt;<br>вторая строка"
+    comment = mixer.blend("blog.Comment", post=post, text="a\nb")
+    assert Comment.objects.get(pk=comment.pk).text_html == "a<br>b"
+
+
+def test_detail_renders_stored_html(client, post, mixer):
+    mixer.blend("blog.Comment", post=post, text="Первая\nвторая")
+    content = client.get(f"/posts/{post.pk}/").content.decode()
+    assert "&lt;b&gt;Жирный&lt;/b&gt;<br>вторая строка" in content
+    assert "Первая<br>вторая" in content
+
+
+def test_outdated_html_rerendered_lazily(post, next_renderer):
+    post = Post.objects.get(pk=post.pk)
+    assert post.rendered_text.startswith("<p>")
+    stored = Post.objects.get(pk=post.pk)
+    assert stored.render_version == NextVersionRenderer.version, (
+        "Убедитесь, что HTML прежней версии рендерера перестраивается"
+        " и сохраняется при обращении."
+    )
+
+
+@pytest.mark.parametrize("processes", [0, 2])
+def test_rerender_texts_command(post, mixer, next_renderer, processes):
+    mixer.blend("blog.Comment", post=post, text="Текст")
+    call_command(
+        "rerender_texts", processes=processes, batch_size=1,
+        stdout=StringIO(),
+    )
+    for model in (Post, Comment):
+        assert not model.objects.exclude(
+            render_version=NextVersionRenderer.version
+        ).exists()
+    assert Comment.objects.get().text_html == "<p>Текст</p>"
+
+
+def test_rerender_texts_updates_post_validator(post, mixer, next_renderer):
+    comment = mixer.blend("blog.Comment", post=post, text="Текст")
+    Post.objects.filter(pk=post.pk).update(
+        render_version=NextVersionRenderer.version
+    )
+    Comment.objects.filter(pk=comment.pk).update(
+        render_version=PlainTextRenderer.version
+    )
+    updated_at = Post.objects.get(pk=post.pk).updated_at
+    call_command("rerender_texts", processes=0, stdout=StringIO())
+    assert Comment.objects.get(pk=comment.pk).text_html == "<p>Текст</p>"
+    assert Post.objects.get(pk=post.pk).updated_at > updated_at, (
+        "Убедитесь, что при перестройке HTML комментария обновляется"
+        " Post.updated_at его поста."
+    )
+
+
+def test_post_page_revalidated_after_renderer_change(
+    client, post, settings
+):
+    # Last-Modified передаётся с точностью до секунды.
+    Post.objects.filter(pk=post.pk).update(
+        updated_at=timezone.now() - timedelta(minutes=1)
+    )
+    url = f"/posts/{post.pk}/"
+    first = client.get(url)
+    etag, last_modified = first["ETag"], first["Last-Modified"]
+    settings.BLOG_TEXT_RENDERER = "tests.test_rendering.NextVersionRenderer"
+    for headers in (
+        {"If-None-Match": etag},
+        {"If-Modified-Since": last_modified},
+    ):
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200, (
+            "Убедитесь, что после смены рендерера страница поста не"
+            f" отдаётся как неизменённая по заголовку {next(iter(headers))}."
+        )
+        assert response.content != first.content
@@ -0,0 +1,113 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from blog.models import Post
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def scheduled_post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        title="Отложенная публикация",
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+
+
+def _is_visible(post):
+    return Post.objects.values_list("is_visible", flat=True).get(pk=post.pk)
+
+
+def test_visibility_follows_post_and_category(
+    mixer, user, published_category
+):
+    post = mixer.blend("blog.Post", author=user, category=published_category)
+    assert _is_visible(post)
+
+    published_category.is_published = False
+    published_category.save()
+    assert not _is_visible(post), (
+        "Убедитесь, что посты снятой с публикации категории"
+        " не выводятся в лентах."
+    )
+
+    published_category.is_published = True
+    published_category.save()
+    assert _is_visible(post)
+
+    post.is_published = False
+    post.save()
+    assert not _is_visible(post)
+
+
+def test_category_delete_hides_posts(mixer, user, published_category):
+    post = mixer.blend("blog.Post", author=user, category=published_category)
+    published_category.delete()
+    assert not _is_visible(post)
+
+
+def test_publish_scheduled(client, scheduled_post):
+    assert not _is_visible(scheduled_post)
+    assert scheduled_post.title not in client.get("/").content.decode()
+
+    call_command("publish_scheduled", stdout=StringIO())
+    assert not _is_visible(scheduled_post), (
+        "Убедитесь, что команда publish_scheduled не публикует посты"
+        " раньше времени."
+    )
+
+    Post.objects.filter(pk=scheduled_post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1)
+    )
+    out = StringIO()
+    call_command("publish_scheduled", stdout=out)
+    assert _is_visible(scheduled_post)
+    assert "1" in out.getvalue()
+    assert scheduled_post.title in client.get("/").content.decode(), (
+        "Убедитесь, что команда publish_scheduled сбрасывает"
+        " закэшированные страницы лент."
+    )
+
+
+def test_refresh_visibility(scheduled_post):
+    Post.objects.filter(pk=scheduled_post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1)
+    )
+    assert Post.objects.refresh_visibility() == 1
+    assert _is_visible(scheduled_post)
+    assert Post.objects.refresh_visibility() == 0
+
+
+def test_publication_from_other_process(client, scheduled_post):
+    """
+    Команда publish_scheduled в отдельном процессе не сбрасывает
+    локальный кэш веб-процесса: флаг меняется только в БД.
+    """
+    urls = ("/", "/api/posts/", "/feed/rss/")
+    responses = {url: client.get(url) for url in urls}
+    Post.objects.filter(pk=scheduled_post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1), is_visible=True
+    )
+    for url, response in responses.items():
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=response["ETag"]
+        ).status_code == 200, (
+            f"Убедитесь, что ETag страницы `{url}` меняется, когда"
+            " отложенный пост выводится в ленту."
+        )
+        response = client.get(url)
+        if url.startswith("/api/"):
+            results = response.json()["results"]
+            shown = scheduled_post.pk in {post["id"] for post in results}
+        else:
+            shown = scheduled_post.title in response.content.decode()
+        assert shown, (
+            f"Убедитесь, что закэшированная страница `{url}` обновляется,"
+            " когда отложенный пост выводится в ленту другим процессом."
+        )
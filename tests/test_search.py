@@ -0,0 +1,148 @@
+from io import StringIO
+
+import pytest
+from blog.models import Post, SearchDocument
+from blog.search import analyze, get_search_backend, tokenize
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(params=["vendor", "inverted"])
+def search_backend(request, settings):
+    if request.param == "inverted":
+        settings.BLOG_SEARCH_BACKEND = "blog.search.InvertedIndexBackend"
+    return get_search_backend()
+
+
+@pytest.fixture
+def blend_post(mixer, user, published_category):
+    def blend(**kwargs):
+        return mixer.blend(
+            "blog.Post", author=user, category=published_category, **kwargs
+        )
+    return blend
+
+
+def test_tokenize():
+    assert tokenize("Привет, Мир! hello_world 42") == [
+        "привет", "мир", "hello_world", "42"
+    ]
+
+
+def test_analyze_reduces_word_forms():
+    assert analyze("Путешествие путешествия путешествиями") == [
+        "путешеств"
+    ] * 3
+
+
+def test_post_stores_stems(blend_post):
+    post = blend_post(title="Зимние озёра", text="Долгие прогулки")
+    document = SearchDocument.objects.get(post=post)
+    assert document.title == "зимн озер"
+    assert document.text == "долг прогулк"
+
+
+def test_search_matches_other_word_forms(search_backend, mixer, blend_post):
+    post = blend_post(title="Путешествие", text="На Байкале")
+    mixer.blend("blog.Comment", post=post, text="Красивые озёра")
+    for query in ("путешествиями", "байкала", "озеро"):
+        assert search_backend.search_posts(query) == [post.pk], (
+            "Убедитесь, что поиск находит другие словоформы слов запроса."
+        )
+
+
+def test_search_ranks_title_above_text(search_backend, blend_post):
+    in_text = blend_post(title="Заметка", text="Путешествие на Байкал")
+    in_title = blend_post(title="Байкал зимой", text="Лёд и ветер")
+    blend_post(title="Другое", text="Про горы")
+    assert search_backend.search_posts("байкал") == [in_title.pk, in_text.pk]
+
+
+def test_search_requires_all_words(search_backend, blend_post):
+    both = blend_post(title="Байкал", text="Зимний лёд")
+    blend_post(title="Байкал", text="Летний отдых")
+    assert search_backend.search_posts("байкал лёд") == [both.pk]
+
+
+def test_search_follows_comments(search_backend, mixer, blend_post):
+    post = blend_post(title="Поездка", text="Без подробностей")
+    comment = mixer.blend("blog.Comment", post=post, text="Омуль отличный")
+    assert search_backend.search_posts("омуль") == [post.pk]
+    assert search_backend.search_comments("омуль") == [comment.pk]
+
+    comment.delete()
+    assert search_backend.search_posts("омуль") == []
+
+
+def test_search_without_comments_or_limit(
+    search_backend, mixer, blend_post
+):
+    posts = [blend_post(title="Байкал", text="Озеро") for _ in range(3)]
+    mixer.blend("blog.Comment", post=blend_post(), text="Байкал")
+    assert search_backend.search_posts("байкал", limit=1) == [posts[-1].pk]
+    assert sorted(
+        search_backend.search_posts(
+            "байкал", limit=None, with_comments=False
+        )
+    ) == [post.pk for post in posts], (
+        "Убедитесь, что поиск без комментариев и без ограничения находит"
+        " все посты с совпадением в заголовке или тексте."
+    )
+
+
+def test_admin_search_uses_post_fields(admin_client, mixer, blend_post):
+    by_title = blend_post(title="Байкал зимой")
+    by_comment = blend_post(title="Заметка")
+    mixer.blend("blog.Comment", post=by_comment, text="Байкал")
+    response = admin_client.get("/admin/blog/post/", {"q": "байкал"})
+    assert list(response.context["cl"].result_list) == [by_title], (
+        "Убедитесь, что поиск постов в админке не учитывает комментарии."
+    )
+    response = admin_client.get(
+        "/admin/blog/post/", {"q": by_title.author.username}
+    )
+    assert by_title in response.context["cl"].result_list, (
+        "Убедитесь, что в админке посты ищутся и по автору."
+    )
+
+
+def test_search_follows_post_changes(search_backend, blend_post):
+    post = blend_post(title="Черновик", text="Текст")
+    post.title = "Чистовик"
+    post.save()
+    assert search_backend.search_posts("черновик") == []
+    assert search_backend.search_posts("чистовик") == [post.pk]
+
+    post.delete()
+    assert search_backend.search_posts("чистовик") == []
+
+
+def test_search_view(client, blend_post):
+    found = blend_post(title="Байкал зимой")
+    hidden = blend_post(title="Байкал летом", is_published=False)
+    response = client.get("/search/", {"q": "байкал"})
+    assert response.status_code == 200
+    content = response.content.decode()
+    assert found.title in content
+    assert hidden.title not in content, (
+        "Убедитесь, что в результатах поиска выводятся только"
+        " опубликованные посты."
+    )
+
+
+def test_search_view_keeps_query_in_paginator(client, blend_post):
+    for number in range(11):
+        blend_post(title=f"Байкал {number}")
+    response = client.get("/search/", {"q": "байкал"})
+    assert "?q=%D0%B1%D0%B0%D0%B9%D0%BA%D0%B0%D0%BB&amp;page=2" in (
+        response.content.decode()
+    ), "Убедитесь, что ссылки пагинатора сохраняют поисковый запрос."
+
+
+def test_rebuild_search_index(search_backend, blend_post):
+    post = blend_post(title="Байкал")
+    Post.objects.filter(pk=post.pk).update(title="Ангара")
+    call_command("rebuild_search_index", stdout=StringIO())
+    assert search_backend.search_posts("ангарой") == [post.pk]
+    assert search_backend.search_posts("байкал") == []
@@ -0,0 +1,133 @@
+from io import StringIO
+
+import pytest
+from blog import sitemaps
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+
+pytestmark = [pytest.mark.django_db]
+
+BASE_URL = "http://testserver"
+
+
+@pytest.fixture(autouse=True)
+def sitemap_root(settings, tmp_path):
+    settings.BLOG_SITEMAP_ROOT = tmp_path
+    settings.BLOG_SITEMAP_BASE_URL = BASE_URL
+    cache.clear()
+    yield tmp_path
+    cache.clear()
+
+
+@pytest.fixture
+def small_shards(monkeypatch):
+    monkeypatch.setattr(sitemaps, "SITEMAP_SHARD_SIZE", 2)
+
+
+@pytest.fixture
+def blend_posts(mixer, user, published_category):
+    def blend(count, **kwargs):
+        kwargs.setdefault("author", user)
+        kwargs.setdefault("category", published_category)
+        return mixer.cycle(count).blend("blog.Post", **kwargs)
+    return blend
+
+
+def read(root, name):
+    return (root / name).read_text(encoding="utf-8")
+
+
+def test_sitemap_index_and_sections(
+    client, blend_posts, user, published_category, sitemap_root
+):
+    shown = blend_posts(1)[0]
+    hidden = blend_posts(1, is_published=False)[0]
+    response = client.get("/sitemap.xml")
+    assert response.status_code == 200
+    index = b"".join(response.streaming_content).decode()
+    for name in ("posts-0", "categories-0", "authors-0"):
+        assert f"{BASE_URL}/sitemaps/{name}.xml" in index
+
+    posts = read(sitemap_root, "posts-0.xml")
+    assert f"<loc>{BASE_URL}/posts/{shown.pk}/</loc>" in posts
+    assert f"/posts/{hidden.pk}/" not in posts, (
+        "Убедитесь, что в карту сайта попадают только опубликованные посты."
+    )
+    assert shown.updated_at.isoformat() in posts
+    assert f"/category/{published_category.slug}/" in read(
+        sitemap_root, "categories-0.xml"
+    )
+    assert f"/profile/{user.username}/" in read(sitemap_root, "authors-0.xml")
+    assert client.get("/sitemaps/posts-0.xml").status_code == 200
+    assert client.get("/sitemaps/posts-9.xml").status_code == 404
+
+
+def test_sitemap_sharded_by_id(blend_posts, small_shards, sitemap_root):
+    posts = blend_posts(5)
+    sitemaps.refresh_sitemaps(BASE_URL)
+    shards = sorted(path.name for path in sitemap_root.glob("posts-*.xml"))
+    assert len(shards) == 3
+    for name in shards:
+        assert read(sitemap_root, name).count("<url>") <= 2
+    assert sum(
+        read(sitemap_root, name).count("<url>") for name in shards
+    ) == len(posts)
+
+
+def test_sitemap_regenerated_incrementally(
+    blend_posts, user, small_shards, sitemap_root
+):
+    posts = blend_posts(5)
+    assert sitemaps.refresh_sitemaps(BASE_URL)
+    assert sitemaps.refresh_sitemaps(BASE_URL) == [], (
+        "Убедитесь, что неизменившиеся файлы карты сайта не перезаписываются."
+    )
+
+    last = posts[-1]
+    last.title = "Новый заголовок"
+    last.save()
+    # Меняются файл с постом, а также lastmod его категории и автора.
+    assert set(sitemaps.refresh_sitemaps(BASE_URL)) == {
+        f"posts-{(last.pk - 1) // 2}",
+        "categories-0",
+        f"authors-{(user.pk - 1) // 2}",
+    }
+
+    last.delete()
+    sitemaps.refresh_sitemaps(BASE_URL)
+    assert f"/posts/{last.pk}/" not in "".join(
+        read(sitemap_root, path.name)
+        for path in sitemap_root.glob("posts-*.xml")
+    )
+
+
+def test_build_sitemaps_command(blend_posts, sitemap_root):
+    blend_posts(1)
+    call_command(
+        "build_sitemaps", base_url="https://example.com/", stdout=StringIO()
+    )
+    assert "https://example.com/sitemaps/posts-0.xml" in read(
+        sitemap_root, "sitemap.xml"
+    )
+
+
+def test_request_host_does_not_rebuild(client, blend_posts, sitemap_root):
+    blend_posts(1)
+    client.get("/sitemap.xml")
+    shard = sitemap_root / "posts-0.xml"
+    written = shard.stat().st_mtime_ns
+    cache.clear()
+    response = client.get("/sitemap.xml", HTTP_HOST="127.0.0.1")
+    index = b"".join(response.streaming_content).decode()
+    assert f"{BASE_URL}/sitemaps/posts-0.xml" in index
+    assert shard.stat().st_mtime_ns == written, (
+        "Убедитесь, что адреса карты сайта строятся от настройки"
+        " BLOG_SITEMAP_BASE_URL и запрос через другой домен не"
+        " перезаписывает файлы."
+    )
+
+
+def test_build_sitemaps_requires_base_url(settings, blend_posts):
+    del settings.BLOG_SITEMAP_BASE_URL
+    with pytest.raises(CommandError):
+        call_command("build_sitemaps", stdout=StringIO())
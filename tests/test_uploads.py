@@ -0,0 +1,114 @@
+from io import BytesIO
+
+import pytest
+from blog.models import Post
+from blog.uploads import (
+    BoundedImageUploadHandler,
+    RejectedUpload,
+    inspect_image_header,
+)
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.BLOG_IMAGE_WORKERS = 0
+
+
+def _png(size=(50, 50)):
+    buffer = BytesIO()
+    Image.new("RGB", size, (10, 20, 30)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def _create_post(user_client, category, content, name="photo.png"):
+    return user_client.post(
+        "/posts/create/",
+        data={
+            "title": "Пост с картинкой",
+            "text": "Текст",
+            "pub_date": timezone.now().strftime("%Y-%m-%dT%H:%M"),
+            "category": category.pk,
+            "image": SimpleUploadedFile(name, content, "image/png"),
+        },
+    )
+
+
+def _stream(handler, content, field_name="image", chunk_size=1024):
+    handler.new_file(field_name, "photo.png", "image/png", None)
+    passed = 0
+    for start in range(0, len(content), chunk_size):
+        chunk = handler.receive_data_chunk(
+            content[start:start + chunk_size], start
+        )
+        passed += len(chunk or b"")
+    return passed, handler.file_complete(len(content))
+
+
+def test_header_inspection():
+    assert inspect_image_header(_png()) == (None, True)
+    assert inspect_image_header(_png()[:8]) == (None, False)
+    error, done = inspect_image_header(b"not an image", complete=True)
+    assert error and done
+
+
+def test_handler_rejects_pixel_bomb_from_header(settings):
+    settings.BLOG_IMAGE_MAX_PIXELS = 100 * 100
+    content = _png((400, 400))
+    passed, upload = _stream(
+        BoundedImageUploadHandler(), content, chunk_size=64
+    )
+    assert isinstance(upload, RejectedUpload), (
+        "Убедитесь, что обработчик загрузки отклоняет изображение"
+        " со слишком большим числом пикселей."
+    )
+    assert passed < len(content), (
+        "Убедитесь, что изображение отклоняется по заголовку,"
+        " до передачи всего файла."
+    )
+
+
+def test_handler_rejects_oversized_file(settings):
+    settings.BLOG_IMAGE_MAX_UPLOAD_SIZE = 1024
+    content = _png() + b"\0" * 4096
+    passed, upload = _stream(BoundedImageUploadHandler(), content)
+    assert isinstance(upload, RejectedUpload)
+    assert passed <= 1024
+
+
+def test_handler_passes_valid_image_and_other_fields():
+    content = _png()
+    passed, upload = _stream(BoundedImageUploadHandler(), content)
+    assert upload is None and passed == len(content)
+    passed, upload = _stream(
+        BoundedImageUploadHandler(), b"x" * 4096, field_name="attachment"
+    )
+    assert upload is None and passed == 4096
+
+
+def test_create_post_rejects_large_image(
+    settings, user_client, published_category
+):
+    settings.BLOG_IMAGE_MAX_PIXELS = 100 * 100
+    response = _create_post(user_client, published_category, _png((400, 400)))
+    assert response.status_code == 200
+    assert "image" in response.context["form"].errors, (
+        "Убедитесь, что форма поста выводит ошибку для слишком большого"
+        " изображения."
+    )
+    assert not Post.objects.exists()
+
+
+def test_create_post_accepts_image(
+    user_client, published_category, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        response = _create_post(user_client, published_category, _png())
+    assert response.status_code == 302
+    post = Post.objects.get()
+    assert post.image and post.image_renditions